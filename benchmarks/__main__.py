@@ -0,0 +1,88 @@
+"""Run the nox benchmark suite.
+
+    python -m benchmarks --filter hash --output results.json
+    python -m benchmarks --baseline benchmarks/baseline.json --threshold 0.15
+"""
+from __future__ import annotations
+
+import importlib
+import sys
+
+import click
+
+from benchmarks import harness
+
+SUITES = {'micro': 'benchmarks.micro', 'integration': 'benchmarks.integration'}
+
+
+def _format(value: float) -> str:
+    return f"{value:,.1f}" if value < 1e6 else f"{value:,.0f}"
+
+
+def _size_label(size: int) -> str:
+    for unit, shift in (('GiB', 30), ('MiB', 20), ('KiB', 10)):
+        if size >= 1 << shift:
+            return f"{size / (1 << shift):g}{unit}"
+    return f"{size}B"
+
+
+@click.command()
+@click.option('--suite', 'suites', multiple=True, type=click.Choice(sorted(SUITES)), help='Suites to run (default: micro)')
+@click.option('--filter', 'pattern', default=None, help='Only run benchmarks whose name contains this text')
+@click.option('--min-time', default=1.0, show_default=True, help='Seconds to spend measuring each benchmark')
+@click.option('--output', type=click.Path(dir_okay=False), help='Save the results as JSON')
+@click.option('--baseline', type=click.Path(exists=True, dir_okay=False), help='Results JSON to compare against')
+@click.option('--threshold', default=0.10, show_default=True, help='Allowed throughput drop versus the baseline (0.10 = 10%)')
+@click.option('--save-baseline', type=click.Path(dir_okay=False), help='Also store these results as a new baseline')
+@click.option('--list', 'list_only', is_flag=True, help='List the benchmarks without running them')
+def main(suites, pattern, min_time, output, baseline, threshold, save_baseline, list_only):
+    """Measure throughput and latency percentiles of the nox domains."""
+    # The integration suite starts local services, so it only runs when asked for
+    for suite in suites or ('micro',):
+        importlib.import_module(SUITES[suite])
+    if list_only:
+        for benchmark in harness.benchmarks(pattern):
+            click.echo(benchmark.name)
+        return
+
+    click.echo(f"{'benchmark':<44} {'ops/s':>14} {'MB/s':>10} {'p50 us':>10} {'p99 us':>10}")
+
+    def report(name, result):
+        if 'skipped' in result:
+            click.echo(f"{name:<44} skipped: {result['skipped']}")
+            return
+        mb_per_sec = _format(result['mb_per_sec']) if 'mb_per_sec' in result else '-'
+        click.echo(
+            f"{name:<44} {_format(result['ops_per_sec']):>14} {mb_per_sec:>10} "
+            f"{result['p50_us']:>10.1f} {result['p99_us']:>10.1f}",
+        )
+
+    document = harness.run(pattern, min_time, report)
+    sizes, rows = harness.throughput_table(document['results'], 'hash.')
+    if rows:
+        click.echo(f"\n{'hash MB/s':<20}" + ''.join(f"{_size_label(size):>10}" for size in sizes))
+        for algorithm, row in rows.items():
+            click.echo(f"{algorithm:<20}" + ''.join(f"{_format(row[size]) if size in row else '-':>10}" for size in sizes))
+
+    for path in (output, save_baseline):
+        if path:
+            harness.save(document, path)
+            click.echo(f"Results saved to {path}")
+
+    if baseline:
+        rows = harness.compare(document, harness.load(baseline), threshold)
+        click.echo(f"\n{'benchmark':<44} {'baseline ops/s':>16} {'ops/s':>14} {'change':>8}")
+        for row in rows:
+            flag = '  REGRESSION' if row['regressed'] else ''
+            click.echo(
+                f"{row['name']:<44} {_format(row['baseline_ops_per_sec']):>16} "
+                f"{_format(row['ops_per_sec']):>14} {row['change']:>+8.1%}{flag}",
+            )
+        regressions = [row for row in rows if row['regressed']]
+        if regressions:
+            click.echo(f"\n{len(regressions)} benchmark(s) regressed by more than {threshold:.0%}.", err=True)
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from collections.abc import Iterator
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+
+
+Setup = Callable[[], Callable[[], Any]]
+
+
+class Skip(Exception):
+    """Raised by a setup function when a benchmark cannot run here."""
+
+
+@dataclass
+class Benchmark:
+    """One measurable operation.
+
+    ``setup`` runs once, outside the timed region, and returns the callable
+    that is timed; ``bytes_per_op`` turns operations per second into MB/s.
+    """
+    name: str
+    setup: Setup
+    bytes_per_op: int = 0
+    params: dict[str, Any] = field(default_factory=dict)
+
+
+_registry: list[Benchmark] = []
+
+
+def register(name: str, bytes_per_op: int = 0, **params: Any) -> Callable[[Setup], Setup]:
+    """Decorator adding a setup function to the suite."""
+    def decorator(setup: Setup) -> Setup:
+        _registry.append(Benchmark(name, setup, bytes_per_op, params))
+        return setup
+    return decorator
+
+
+def benchmarks(pattern: str | None = None) -> Iterator[Benchmark]:
+    """Registered benchmarks whose name contains ``pattern``."""
+    for benchmark in _registry:
+        if not pattern or pattern in benchmark.name:
+            yield benchmark
+
+
+def _percentile(samples: list[float], percent: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(percent / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure(func: Callable[[], Any], bytes_per_op: int = 0, min_time: float = 1.0, sample_time: float = 0.002) -> dict[str, Any]:
+    """Time ``func`` for at least ``min_time`` seconds.
+
+    Fast operations are called in batches so one sample lasts about
+    ``sample_time``; latencies are per call, derived from each batch.
+    """
+    func()  # Warm up caches and lazy imports
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= sample_time or number >= 1 << 20:
+            break
+        number *= 2
+
+    samples = [elapsed / number]
+    deadline = time.perf_counter() + min_time
+    while time.perf_counter() < deadline or len(samples) < 5:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+
+    mean = statistics.fmean(samples)
+    result = {
+        'ops_per_sec': 1 / mean,
+        'mean_us': mean * 1e6,
+        'p50_us': _percentile(samples, 50) * 1e6,
+        'p90_us': _percentile(samples, 90) * 1e6,
+        'p99_us': _percentile(samples, 99) * 1e6,
+        'samples': len(samples),
+        'calls_per_sample': number,
+    }
+    if bytes_per_op:
+        result['mb_per_sec'] = bytes_per_op / mean / 1e6
+    return result
+
+
+def metadata() -> dict[str, Any]:
+    """Machine and interpreter details stored next to the results."""
+    try:
+        from importlib import metadata as importlib_metadata
+        version = importlib_metadata.version('nox-cli')
+    except Exception:
+        version = 'unknown'
+    return {
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'python': sys.version.split()[0],
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'nox_version': version,
+    }
+
+
+def run(
+    pattern: str | None = None, min_time: float = 1.0,
+    report: Callable[[str, dict[str, Any]], None] | None = None,
+) -> dict[str, Any]:
+    """Run the matching benchmarks and return the results document."""
+    results: dict[str, Any] = {}
+    for benchmark in benchmarks(pattern):
+        try:
+            func = benchmark.setup()
+        except Skip as e:
+            result = {'skipped': str(e)}
+        else:
+            result = measure(func, benchmark.bytes_per_op, min_time)
+        result.update(benchmark.params)
+        results[benchmark.name] = result
+        if report:
+            report(benchmark.name, result)
+    return {'meta': metadata(), 'results': results}
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], threshold: float) -> list[dict[str, Any]]:
+    """Compare throughput against a baseline document.
+
+    Returns one row per benchmark present in both; ``regressed`` is set
+    when throughput dropped by more than ``threshold`` (0.1 = 10%).
+    """
+    rows = []
+    for name, result in current['results'].items():
+        before = baseline.get('results', {}).get(name)
+        if not before or 'ops_per_sec' not in before or 'ops_per_sec' not in result:
+            continue
+        change = result['ops_per_sec'] / before['ops_per_sec'] - 1
+        rows.append({
+            'name': name,
+            'baseline_ops_per_sec': before['ops_per_sec'],
+            'ops_per_sec': result['ops_per_sec'],
+            'change': change,
+            'regressed': change < -threshold,
+        })
+    return rows
+
+
+def throughput_table(results: dict[str, Any], prefix: str) -> tuple[list[Any], dict[Any, dict[Any, float]]]:
+    """MB/s of the ``prefix`` benchmarks by ``algorithm`` and ``size`` parameters.
+
+    Returns the sorted sizes (the columns) and one row per algorithm.
+    """
+    rows: dict[Any, dict[Any, float]] = {}
+    for name, result in results.items():
+        if name.startswith(prefix) and 'mb_per_sec' in result and 'algorithm' in result and 'size' in result:
+            rows.setdefault(result['algorithm'], {})[result['size']] = result['mb_per_sec']
+    sizes = sorted({size for row in rows.values() for size in row})
+    return sizes, rows
+
+
+def load(path: str) -> dict[str, Any]:
+    with open(path) as file:
+        return json.load(file)
+
+
+def save(document: dict[str, Any], path: str) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as file:
+        json.dump(document, file, indent=2, sort_keys=True)
+        file.write('\n')
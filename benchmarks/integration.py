@@ -0,0 +1,164 @@
+"""End-to-end benchmarks of the I/O-bound commands against local stand-ins.
+
+Commands go through the real CLI: ``warm`` benchmarks call it in-process the
+way ``nox batch`` and the daemon do, so pooled clients are reused between
+calls; ``cold`` benchmarks start a fresh ``python -m nox.main`` per call and
+include interpreter startup, imports and client construction.
+
+Run with ``python -m benchmarks --suite integration``.
+"""
+from __future__ import annotations
+
+import io
+import os
+import subprocess
+import sys
+
+from benchmarks import standins
+from benchmarks.harness import register
+from benchmarks.micro import payload_file
+from nox.utils.invoke import run_command
+
+OBJECT_SIZE = 1 << 20
+
+
+def _warm(argv: list[str]):
+    """Callable running ``nox ARGV`` in-process, checked once before timing."""
+    def run() -> bytes:
+        stdout, stderr = io.BytesIO(), io.BytesIO()
+        code = run_command(argv, io.BytesIO(), stdout, stderr)
+        if code != 0:
+            raise RuntimeError(f"nox {' '.join(argv)} exited with {code}: {stderr.getvalue().decode()}")
+        return stdout.getvalue()
+
+    output = run()
+    if output.startswith(b'Error') or b'\nError' in output:
+        raise RuntimeError(f"nox {' '.join(argv)} failed: {output.decode()}")
+    return run
+
+
+def _cold(argv: list[str]):
+    """Callable running ``nox ARGV`` in a new interpreter."""
+    command = [sys.executable, '-m', 'nox.main', *argv]
+
+    def run() -> None:
+        subprocess.run(command, check=True, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL)
+
+    run()
+    return run
+
+
+# S3 and Secrets Manager (moto)
+
+BUCKET = 'nox-bench'
+
+
+def _s3_bucket() -> None:
+    standins.aws()
+    import boto3
+
+    s3 = boto3.client('s3')
+    if BUCKET not in [bucket['Name'] for bucket in s3.list_buckets()['Buckets']]:
+        s3.create_bucket(Bucket=BUCKET)
+        for i in range(100):
+            s3.put_object(Bucket=BUCKET, Key=f"objects/{i:03d}.txt", Body=b'x' * 1024)
+        s3.upload_file(payload_file(OBJECT_SIZE), BUCKET, 'payload.bin')
+
+
+@register('s3.list[warm-100-objects]', entrypoint='warm')
+def _s3_list():
+    _s3_bucket()
+    return _warm(['s3', 'list', '--bucket', BUCKET])
+
+
+@register('s3.list[cold-100-objects]', entrypoint='cold')
+def _s3_list_cold():
+    _s3_bucket()
+    return _cold(['s3', 'list', '--bucket', BUCKET])
+
+
+@register('s3.upload[warm-1MiB]', OBJECT_SIZE, entrypoint='warm')
+def _s3_upload():
+    _s3_bucket()
+    return _warm(['s3', 'upload', '--bucket', BUCKET, '--file', payload_file(OBJECT_SIZE), '--object', 'upload.bin'])
+
+
+@register('s3.download[warm-1MiB]', OBJECT_SIZE, entrypoint='warm')
+def _s3_download():
+    _s3_bucket()
+    output = os.path.join(standins._workdir, 'download.bin')
+    return _warm(['s3', 'download', '--bucket', BUCKET, '--file', 'payload.bin', '--output', output])
+
+
+@register('secrets.get[warm]', entrypoint='warm')
+def _secrets_get():
+    env = standins.aws()
+    import boto3
+
+    client = boto3.client('secretsmanager')
+    try:
+        client.create_secret(Name='nox-bench', SecretString='s3cr3t')
+    except client.exceptions.ResourceExistsException:
+        pass
+    return _warm(['secrets', 'get', '--name', 'nox-bench', '--region', env['AWS_DEFAULT_REGION']])
+
+
+# Redis (redis-server)
+
+def _redis_argv(*argv: str) -> list[str]:
+    return ['redis', '--host', '127.0.0.1', '--port', str(standins.redis_server()), *argv]
+
+
+@register('redis.set-key[warm]', entrypoint='warm')
+def _redis_set():
+    return _warm(_redis_argv('set-key', '--key', 'bench', '--value', 'x' * 100))
+
+
+@register('redis.get-key[warm]', entrypoint='warm')
+def _redis_get():
+    _warm(_redis_argv('set-key', '--key', 'bench', '--value', 'x' * 100))
+    return _warm(_redis_argv('get-key', '--key', 'bench'))
+
+
+@register('redis.get-key[cold]', entrypoint='cold')
+def _redis_get_cold():
+    _warm(_redis_argv('set-key', '--key', 'bench', '--value', 'x' * 100))
+    return _cold(_redis_argv('get-key', '--key', 'bench'))
+
+
+# SQL databases (SQLite, PostgreSQL)
+
+for _engine, _database in (('sqlite', standins.sqlite_database), ('postgres', standins.postgres_database)):
+    register(f"db.query[{_engine}-warm-1-row]", entrypoint='warm', engine=_engine)(
+        lambda database=_database: _warm(['db', 'query', '--db', database(), '--query', 'SELECT price FROM items WHERE id = 42']),
+    )
+    register(f"db.query[{_engine}-warm-1000-rows]", entrypoint='warm', engine=_engine)(
+        lambda database=_database: _warm(['db', 'query', '--db', database(), '--query', 'SELECT * FROM items']),
+    )
+    register(f"db.query[{_engine}-cold-1-row]", entrypoint='cold', engine=_engine)(
+        lambda database=_database: _cold(['db', 'query', '--db', database(), '--query', 'SELECT price FROM items WHERE id = 42']),
+    )
+
+register('db.list-tables[postgres-warm]', entrypoint='warm', engine='postgres')(
+    lambda: _warm(['db', 'list-tables', '--db', standins.postgres_database()]),
+)
+
+
+# Docker (fake API socket)
+
+@register('docker.list[warm-20-containers]', entrypoint='warm')
+def _docker_list():
+    standins.docker_socket()
+    return _warm(['docker', 'list', '--all'])
+
+
+@register('docker.stop[warm]', entrypoint='warm')
+def _docker_stop():
+    standins.docker_socket()
+    return _warm(['docker', 'stop', '--name', 'bench-0'])
+
+
+@register('docker.list[cold-20-containers]', entrypoint='cold')
+def _docker_list_cold():
+    standins.docker_socket()
+    return _cold(['docker', 'list', '--all'])
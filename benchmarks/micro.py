@@ -0,0 +1,341 @@
+"""CPU-bound microbenchmarks for the nox domain managers.
+
+Everything runs offline: payloads are generated in a temporary directory and
+keys are created locally.
+"""
+from __future__ import annotations
+
+import atexit
+import functools
+import io
+import os
+import shutil
+import tempfile
+
+from benchmarks.harness import register
+from benchmarks.harness import Skip
+
+SIZES = {'1KiB': 1 << 10, '64KiB': 64 << 10, '1MiB': 1 << 20, '16MiB': 16 << 20}
+
+_workdir = tempfile.mkdtemp(prefix='nox-bench-')
+atexit.register(shutil.rmtree, _workdir, ignore_errors=True)
+
+
+def payload_file(size: int) -> str:
+    """Path of a file with ``size`` random bytes, created on first use."""
+    path = os.path.join(_workdir, f"payload-{size}.bin")
+    if not os.path.exists(path):
+        with open(path, 'wb') as file:
+            remaining = size
+            while remaining:
+                chunk = os.urandom(min(remaining, 1 << 20))
+                file.write(chunk)
+                remaining -= len(chunk)
+    return path
+
+
+def _key_file(name: str, data: bytes) -> str:
+    path = os.path.join(_workdir, name)
+    with open(path, 'wb') as file:
+        file.write(data)
+    return path
+
+
+# Hashing
+
+def _hash(algorithm: str, size: int):
+    def setup():
+        from nox.domains.hash_manager import HashManager
+        from nox.domains.hash_manager import new_hash
+
+        try:
+            new_hash(algorithm)
+        except ValueError as e:
+            raise Skip(str(e))
+        manager = HashManager()
+        path = payload_file(size)
+        return lambda: manager.generate_hash(path, algorithm)
+    return setup
+
+
+def _hash_single_pass(algorithms: tuple[str, ...], size: int):
+    def setup():
+        from nox.domains.hash_manager import HashManager
+
+        manager = HashManager()
+        path = payload_file(size)
+        return lambda: manager.generate_hashes(path, algorithms)
+    return setup
+
+
+for _algorithm in ('md5', 'sha256', 'sha512', 'blake2b', 'blake2s', 'sha3_256', 'blake3'):
+    for _label, _size in SIZES.items():
+        register(f"hash.generate_hash[{_algorithm}-{_label}]", _size, algorithm=_algorithm, size=_size)(_hash(_algorithm, _size))
+
+# Compare with the sum of the separate md5 and sha256 runs above
+register('hash.generate_hashes[md5+sha256-16MiB]', SIZES['16MiB'], algorithm='md5+sha256', size=SIZES['16MiB'])(
+    _hash_single_pass(('md5', 'sha256'), SIZES['16MiB']),
+)
+
+
+# Encryption
+
+@functools.cache
+def _fernet_key() -> str:
+    from cryptography.fernet import Fernet
+    return _key_file('fernet.key', Fernet.generate_key())
+
+
+@functools.cache
+def _rsa_keys() -> tuple[str, str]:
+    """Public and private key files; generated once per run."""
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.TraditionalOpenSSL, serialization.NoEncryption(),
+    )
+    public_pem = private.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+    return _key_file('rsa.pub', public_pem), _key_file('rsa.pem', private_pem)
+
+
+def _encryption(method: str, size: int, key=None, prepare: str | None = None):
+    """Setup timing ``EncryptionManager.<method>`` on ``size`` random bytes.
+
+    ``key`` is a function returning a key file, so keys are only generated
+    for benchmarks that run. ``prepare`` names the method producing the
+    input once, outside the timed region, e.g. the encryption whose output
+    is then decrypted.
+    """
+    def setup():
+        from nox.domains.encrypt import EncryptionManager
+
+        data = os.urandom(size)
+        if prepare:
+            source = EncryptionManager(input_file=io.BytesIO(data), key_file=key() if key else None)
+            data = getattr(source, prepare)()
+        manager = EncryptionManager(input_file=io.BytesIO(data), key_file=key() if key else None)
+        operation = getattr(manager, method)
+
+        def run():
+            manager.input_file.seek(0)
+            return operation()
+        return run
+    return setup
+
+
+for _label in ('1KiB', '64KiB', '1MiB', '16MiB'):
+    _size = SIZES[_label]
+    register(f"encrypt.fernet_encrypt[{_label}]", _size, size=_size)(_encryption('encrypt_fernet', _size, _fernet_key))
+    register(f"encrypt.fernet_decrypt[{_label}]", _size, size=_size)(
+        _encryption('decrypt_fernet', _size, _fernet_key, 'encrypt_fernet'),
+    )
+    register(f"encrypt.base64_encode[{_label}]", _size, size=_size)(_encryption('encrypt_base64', _size))
+    register(f"encrypt.base64_decode[{_label}]", _size, size=_size)(_encryption('decrypt_base64', _size, None, 'encrypt_base64'))
+
+
+class _Discard(io.RawIOBase):
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        return len(data)
+
+
+def _stream(size: int, args: tuple = (), decrypt: bool = False, method: str = 'stream', keys=lambda: (_fernet_key(),) * 2):
+    """Setup timing a streaming format, writing to a sink that drops the output.
+
+    ``method`` selects ``EncryptionManager.encrypt_<method>``, called with
+    ``args``, and its decrypt counterpart; ``keys`` returns their
+    encryption and decryption key files.
+    """
+    def setup():
+        from nox.domains.encrypt import EncryptionManager
+
+        encrypt_key, decrypt_key = keys()
+        data = os.urandom(size)
+        if decrypt:
+            encrypted = io.BytesIO()
+            source = EncryptionManager(input_file=io.BytesIO(data), output_file=encrypted, key_file=encrypt_key)
+            getattr(source, f"encrypt_{method}")(*args)
+            data = encrypted.getvalue()
+        manager = EncryptionManager(
+            input_file=io.BytesIO(data), output_file=_Discard(), key_file=decrypt_key if decrypt else encrypt_key,
+        )
+        decrypt_method = getattr(manager, f"decrypt_{method}")
+        encrypt_method = getattr(manager, f"encrypt_{method}")
+        operation = decrypt_method if decrypt else lambda: encrypt_method(*args)
+
+        def run():
+            manager.input_file.seek(0)
+            return operation()
+        return run
+    return setup
+
+
+# Compare with encrypt.fernet_* at the same sizes
+for _label in ('64KiB', '1MiB', '16MiB'):
+    _size = SIZES[_label]
+    for _cipher in ('aes-gcm', 'chacha20'):
+        register(f"encrypt.stream_encrypt[{_cipher}-{_label}]", _size, cipher=_cipher, size=_size)(_stream(_size, (_cipher,)))
+        register(f"encrypt.stream_decrypt[{_cipher}-{_label}]", _size, cipher=_cipher, size=_size)(_stream(_size, (_cipher,), True))
+
+# Compare with encrypt.base64_* at the same sizes; wrapped lines cost a slice per line
+for _label in ('1MiB', '16MiB'):
+    _size = SIZES[_label]
+    for _variant, _args in (('plain', ()), ('wrap76', (False, 76))):
+        register(f"encrypt.base64_stream_encode[{_variant}-{_label}]", _size, variant=_variant, size=_size)(
+            _stream(_size, _args, method='base64_stream', keys=lambda: (None, None)),
+        )
+        register(f"encrypt.base64_stream_decode[{_variant}-{_label}]", _size, variant=_variant, size=_size)(
+            _stream(_size, _args, True, method='base64_stream', keys=lambda: (None, None)),
+        )
+
+
+def _log_lines(size: int) -> bytes:
+    """Compressible payload resembling an application log."""
+    lines = []
+    total = 0
+    for i in range(size // 40 + 1):
+        line = f"2024-09-15T12:{i % 60:02d}:{i % 57:02d} INFO GET /api/items/{i % 9973} 200\n".encode()
+        lines.append(line)
+        total += len(line)
+        if total >= size:
+            break
+    return b''.join(lines)[:size]
+
+
+def _compressed_stream(size: int, codec: str):
+    """Setup timing ``encrypt stream --compress`` on log lines."""
+    def setup():
+        from nox.domains.compress import compressor
+        from nox.domains.encrypt import EncryptionManager
+
+        try:
+            compressor(codec)
+        except ValueError as e:
+            raise Skip(str(e))
+        manager = EncryptionManager(input_file=io.BytesIO(_log_lines(size)), output_file=_Discard(), key_file=_fernet_key())
+
+        def run():
+            manager.input_file.seek(0)
+            return manager.encrypt_stream('aes-gcm', compression=codec)
+        return run
+    return setup
+
+
+# Throughput is per plaintext byte, so compare with encrypt.stream_encrypt[aes-gcm-16MiB]
+for _codec in ('gzip', 'zstd', 'lz4'):
+    register(f"encrypt.stream_encrypt[aes-gcm+{_codec}-16MiB]", SIZES['16MiB'], codec=_codec, size=SIZES['16MiB'])(
+        _compressed_stream(SIZES['16MiB'], _codec),
+    )
+
+# Hybrid RSA: one OAEP operation per input, then the streaming format; the
+# old pure-Python path encrypted at most 245 bytes per call
+for _label in ('1KiB', '1MiB', '16MiB'):
+    _size = SIZES[_label]
+    register(f"encrypt.rsa_encrypt[{_label}]", _size, size=_size)(_stream(_size, ('aes-gcm',), method='rsa_stream', keys=_rsa_keys))
+    register(f"encrypt.rsa_decrypt[{_label}]", _size, size=_size)(
+        _stream(_size, ('aes-gcm',), True, method='rsa_stream', keys=_rsa_keys),
+    )
+
+
+# JWT
+
+CLAIMS = {'sub': 'user-123', 'role': 'admin', 'scope': ['read', 'write'], 'tenant': 'acme'}
+
+
+@register('jwt.generate_token[HS256]', algorithm='HS256')
+def _jwt_generate():
+    from nox.domains.jwt_manager import JWTManager
+
+    manager = JWTManager('benchmark-secret')
+    return lambda: manager.generate_token(dict(CLAIMS))
+
+
+@register('jwt.verify_token[HS256]', algorithm='HS256')
+def _jwt_verify():
+    from nox.domains.jwt_manager import JWTManager
+
+    manager = JWTManager('benchmark-secret')
+    token = manager.generate_token(dict(CLAIMS))
+    return lambda: manager.verify_token(token)
+
+
+@register('jwt.generate_token[RS256]', algorithm='RS256')
+def _jwt_generate_rs256():
+    from nox.domains.jwt_manager import JWTManager
+
+    with open(_rsa_keys()[1]) as file:
+        manager = JWTManager(file.read(), 'RS256')
+    return lambda: manager.generate_token(dict(CLAIMS))
+
+
+def _jwt_sign(algorithm: str):
+    def setup():
+        from nox.domains.jwt_bulk import TokenSigner
+
+        if algorithm == 'HS256':
+            key = 'benchmark-secret'
+        else:
+            with open(_rsa_keys()[1]) as file:
+                key = file.read()
+        signer = TokenSigner(key, algorithm)
+        claims = {**CLAIMS, 'exp': 2_000_000_000}
+        return lambda: signer.sign(claims)
+    return setup
+
+
+for _algorithm in ('HS256', 'RS256'):
+    register(f"jwt.bulk_sign[{_algorithm}]", algorithm=_algorithm)(_jwt_sign(_algorithm))
+
+
+# UUIDs
+
+@register('uuid.generate_uuid1')
+def _uuid1():
+    from nox.domains.uuid_generator import UUIDGenerator
+    return UUIDGenerator.generate_uuid1
+
+
+@register('uuid.generate_uuid4')
+def _uuid4():
+    from nox.domains.uuid_generator import UUIDGenerator
+    return UUIDGenerator.generate_uuid4
+
+
+# Date and time
+
+@register('datetime.get_current_time[UTC]')
+def _current_time():
+    from nox.domains.datetime_manager import DateTimeManager
+
+    manager = DateTimeManager()
+    return lambda: manager.get_current_time('UTC')
+
+
+@register('datetime.convert_time')
+def _convert_time():
+    from nox.domains.datetime_manager import DateTimeManager
+
+    manager = DateTimeManager()
+    return lambda: manager.convert_time('2024-03-10 01:30:00', 'America/New_York', 'Asia/Tokyo')
+
+
+@register('datetime.add_to_date')
+def _add_to_date():
+    from nox.domains.datetime_manager import DateTimeManager
+
+    manager = DateTimeManager()
+    return lambda: manager.add_to_date('2024-01-31', days=3, weeks=1, months=2)
+
+
+@register('datetime.date_difference')
+def _date_difference():
+    from nox.domains.datetime_manager import DateTimeManager
+
+    manager = DateTimeManager()
+    return lambda: manager.date_difference('2024-01-01 08:00', '2024-12-24 17:45')
@@ -0,0 +1,243 @@
+"""Local stand-ins for the services the nox managers talk to.
+
+Each stand-in is started on first use and stopped when the process exits.
+Services that need an external binary (redis-server, PostgreSQL) raise
+``Skip`` when it is not installed, so the rest of the suite still runs.
+"""
+from __future__ import annotations
+
+import atexit
+import functools
+import http.server
+import json
+import os
+import re
+import shutil
+import socket
+import socketserver
+import subprocess
+import tempfile
+import time
+
+from benchmarks.harness import Skip
+
+_workdir = tempfile.mkdtemp(prefix='nox-standins-')
+atexit.register(shutil.rmtree, _workdir, ignore_errors=True)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_port(port: int, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.2):
+                return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+def _stop_process(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+@functools.cache
+def aws() -> dict[str, str]:
+    """In-process moto server emulating S3 and Secrets Manager.
+
+    Returns the environment that points boto3 at it.
+    """
+    try:
+        from moto.server import ThreadedMotoServer
+    except ImportError as e:
+        raise Skip(f"moto[server] is not installed ({e})")
+    import logging
+
+    # Werkzeug logs every request, which would drown the results table
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = ThreadedMotoServer(ip_address='127.0.0.1', port=_free_port(), verbose=False)
+    server.start()
+    atexit.register(server.stop)
+    host, port = server.get_host_and_port()
+    env = {
+        'AWS_ENDPOINT_URL': f"http://{host}:{port}",
+        'AWS_ACCESS_KEY_ID': 'benchmark',
+        'AWS_SECRET_ACCESS_KEY': 'benchmark',
+        'AWS_DEFAULT_REGION': 'us-east-1',
+    }
+    os.environ.update(env)
+    return env
+
+
+@functools.cache
+def redis_server() -> int:
+    """Throwaway redis-server without persistence; returns its port."""
+    binary = shutil.which('redis-server')
+    if not binary:
+        raise Skip('redis-server is not installed')
+    port = _free_port()
+    process = subprocess.Popen(
+        [binary, '--port', str(port), '--bind', '127.0.0.1', '--save', '', '--appendonly', 'no'],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    atexit.register(_stop_process, process)
+    _wait_for_port(port)
+    return port
+
+
+@functools.cache
+def sqlite_database(rows: int = 1000) -> str:
+    """SQLite database with an ``items`` table; returns its SQLAlchemy URL."""
+    import sqlite3
+
+    path = os.path.join(_workdir, 'bench.db')
+    with sqlite3.connect(path) as connection:
+        connection.execute('CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT, price REAL)')
+        connection.executemany(
+            'INSERT INTO items (name, price) VALUES (?, ?)',
+            ((f"item-{i}", i * 0.5) for i in range(rows)),
+        )
+    return f"sqlite:///{path}"
+
+
+@functools.cache
+def postgres_database(rows: int = 1000) -> str:
+    """Local PostgreSQL with an ``items`` table; returns its SQLAlchemy URL.
+
+    Uses NOX_BENCH_POSTGRES_URL when set, otherwise starts a temporary
+    cluster with initdb/pg_ctl on a Unix socket.
+    """
+    try:
+        import psycopg2  # noqa: F401
+    except ImportError:
+        raise Skip('psycopg2 is not installed')
+    url = os.environ.get('NOX_BENCH_POSTGRES_URL')
+    if not url:
+        initdb, pg_ctl = shutil.which('initdb'), shutil.which('pg_ctl')
+        if not (initdb and pg_ctl):
+            raise Skip('initdb/pg_ctl are not installed and NOX_BENCH_POSTGRES_URL is not set')
+        data_dir = os.path.join(_workdir, 'pgdata')
+        subprocess.run([initdb, '-D', data_dir, '-U', 'nox', '--auth=trust'], check=True, capture_output=True)
+        port = _free_port()
+        subprocess.run(
+            [pg_ctl, '-D', data_dir, '-w', '-l', os.path.join(_workdir, 'pg.log'),
+             '-o', f"-p {port} -k {_workdir} -c listen_addresses=''", 'start'],
+            check=True, capture_output=True,
+        )
+        atexit.register(subprocess.run, [pg_ctl, '-D', data_dir, '-m', 'immediate', 'stop'], capture_output=True)
+        url = f"postgresql://nox@/postgres?host={_workdir}&port={port}"
+
+    from sqlalchemy import create_engine
+    from sqlalchemy import text
+
+    engine = create_engine(url)
+    with engine.begin() as connection:
+        connection.execute(text('DROP TABLE IF EXISTS items'))
+        connection.execute(text('CREATE TABLE items (id SERIAL PRIMARY KEY, name TEXT, price REAL)'))
+        connection.execute(
+            text('INSERT INTO items (name, price) VALUES (:name, :price)'),
+            [{'name': f"item-{i}", 'price': i * 0.5} for i in range(rows)],
+        )
+    engine.dispose()
+    return url
+
+
+class _DockerHandler(http.server.BaseHTTPRequestHandler):
+    """Just enough of the Docker Engine API for the nox docker commands."""
+
+    protocol_version = 'HTTP/1.1'
+    containers: dict[str, dict] = {}
+
+    def log_message(self, format, *args):
+        pass
+
+    def address_string(self):
+        return 'docker.sock'
+
+    def _reply(self, status: int, body=None) -> None:
+        data = b'' if body is None else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _route(self, method: str) -> None:
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+        path = re.sub(r'^/v[0-9.]+', '', self.path.split('?', 1)[0])
+        query = self.path.partition('?')[2]
+        if path == '/_ping':
+            self._reply(200, 'OK')
+        elif path == '/version':
+            self._reply(200, {'ApiVersion': '1.44', 'Version': '25.0.0', 'MinAPIVersion': '1.24'})
+        elif path == '/containers/json':
+            show_all = 'all=1' in query or 'all=true' in query
+            self._reply(200, [
+                {'Id': container['Id'], 'Names': [container['Name']], 'State': container['State']['Status']}
+                for container in self.containers.values()
+                if show_all or container['State']['Status'] == 'running'
+            ])
+        elif match := re.fullmatch(r'/containers/([^/]+)(/json|/stop)?', path):
+            container = self._find(match.group(1))
+            if container is None:
+                self._reply(404, {'message': f"No such container: {match.group(1)}"})
+            elif method == 'GET':
+                self._reply(200, container)
+            else:
+                # Stop/remove leave the container in place so repeated calls stay identical
+                self._reply(204)
+        else:
+            self._reply(404, {'message': f"page not found: {path}"})
+
+    def _find(self, name: str) -> dict | None:
+        for container in self.containers.values():
+            if name in (container['Id'], container['Name'].lstrip('/')):
+                return container
+        return None
+
+    def do_GET(self):
+        self._route('GET')
+
+    def do_POST(self):
+        self._route('POST')
+
+    def do_DELETE(self):
+        self._route('DELETE')
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+@functools.cache
+def docker_socket(containers: int = 20) -> str:
+    """Fake Docker API on a Unix socket; returns the DOCKER_HOST value."""
+    import threading
+
+    _DockerHandler.containers = {
+        f"{i:064x}": {
+            'Id': f"{i:064x}", 'Name': f"/bench-{i}", 'Image': 'nginx:latest',
+            'Config': {'Image': 'nginx:latest', 'Labels': {}},
+            'State': {'Status': 'running' if i % 2 == 0 else 'exited', 'Running': i % 2 == 0},
+        }
+        for i in range(containers)
+    }
+    path = os.path.join(_workdir, 'docker.sock')
+    server = _UnixHTTPServer(path, _DockerHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    atexit.register(server.shutdown)
+    docker_host = f"unix://{path}"
+    os.environ['DOCKER_HOST'] = docker_host
+    return docker_host
@@ -0,0 +1,129 @@
+"""Thin client for the nox daemon.
+
+This module is imported on every ``noxc`` call, so it must stay small and
+only depend on the standard library. It forwards argv, the environment and
+the working directory to the daemon, serves stdin on demand and copies the
+command's output back, then exits with the command's status. When no daemon
+is running the command is executed in-process instead.
+"""
+from __future__ import annotations
+
+import json
+import os
+import socket
+import struct
+import sys
+from typing import BinaryIO
+
+from nox.utils.paths import check_private_dir
+from nox.utils.paths import daemon_socket_path
+
+# Frame channels
+ARGS = b'A'     # client -> daemon: JSON request
+STDIN = b'I'    # client -> daemon: stdin data, empty payload means EOF
+READ = b'R'     # daemon -> client: request up to N bytes of stdin
+STDOUT = b'O'   # daemon -> client: stdout data
+STDERR = b'E'   # daemon -> client: stderr data
+EXIT = b'X'     # daemon -> client: exit status
+
+_HEADER = struct.Struct('!cI')
+
+
+def send_frame(sock: socket.socket, channel: bytes, payload: bytes = b'') -> None:
+    """Send one frame: channel byte, payload length and payload."""
+    sock.sendall(_HEADER.pack(channel, len(payload)) + payload)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    """Read exactly ``size`` bytes from the socket."""
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError('nox daemon closed the connection')
+        data += chunk
+    return bytes(data)
+
+
+def recv_frame(sock: socket.socket) -> tuple[bytes, bytes]:
+    """Receive one frame and return its channel and payload."""
+    channel, size = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    return channel, _recv_exact(sock, size) if size else b''
+
+
+def connect(path: str | None = None) -> socket.socket:
+    """Connect to the daemon socket, raising OSError if it is not running.
+
+    PermissionError means the socket directory is not private to the user,
+    so whoever listens there may not be our daemon.
+    """
+    path = path or daemon_socket_path()
+    check_private_dir(os.path.dirname(os.path.abspath(path)))
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def request(sock: socket.socket, payload: dict) -> dict:
+    """Send a control request (status, stop) and return the JSON reply."""
+    send_frame(sock, ARGS, json.dumps(payload).encode())
+    _, reply = recv_frame(sock)
+    return json.loads(reply)
+
+
+def forward(
+    sock: socket.socket, argv: list[str],
+    stdin: BinaryIO, stdout: BinaryIO, stderr: BinaryIO,
+    cwd: str | None = None, env: dict[str, str] | None = None,
+) -> int:
+    """Run ``argv`` on the daemon, relaying stdio, and return the exit status."""
+    header = {
+        'argv': argv,
+        'cwd': cwd or os.getcwd(),
+        'env': dict(os.environ) if env is None else env,
+    }
+    send_frame(sock, ARGS, json.dumps(header).encode())
+    read = getattr(stdin, 'read1', stdin.read)
+    while True:
+        channel, payload = recv_frame(sock)
+        if channel == STDOUT:
+            stdout.write(payload)
+            stdout.flush()
+        elif channel == STDERR:
+            stderr.write(payload)
+            stderr.flush()
+        elif channel == READ:
+            (size,) = struct.unpack('!I', payload)
+            send_frame(sock, STDIN, read(size))
+        elif channel == EXIT:
+            (code,) = struct.unpack('!i', payload)
+            return code
+        else:
+            raise ConnectionError(f"Unexpected frame {channel!r} from nox daemon")
+
+
+def main() -> None:
+    """Entry point of ``noxc``."""
+    argv = sys.argv[1:]
+    try:
+        sock = connect()
+    except PermissionError as e:
+        print(f"noxc: not using the daemon: {e}", file=sys.stderr)
+        sock = None
+    except OSError:
+        sock = None
+    if sock is None:
+        from nox.main import cli
+        cli(args=argv, prog_name='nox')
+        return
+    with sock:
+        code = forward(sock, argv, sys.stdin.buffer, sys.stdout.buffer, sys.stderr.buffer)
+    sys.exit(code)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import json
+import sys
+
+import click
+
+from nox.domains.batch_runner import BatchRunner
+
+
+@click.command()
+@click.option(
+    '--file', 'batch_file', type=click.File('r'), default='-',
+    help='JSONL or script file with one nox command per line (default: stdin)',
+)
+@click.option('--jobs', default=1, type=click.IntRange(min=1), help='Number of entries to run concurrently')
+@click.option('--fail-fast', is_flag=True, help='Stop after the first failing entry')
+def batch(batch_file, jobs, fail_fast):
+    """Run many nox commands in a single process.
+
+    Prints one JSON result line per command and exits with status 1 if any
+    command failed.
+    """
+    runner = BatchRunner(jobs=jobs, fail_fast=fail_fast)
+    failed = False
+    try:
+        for result in runner.run(runner.parse_entries(batch_file)):
+            failed = failed or result['exit_code'] != 0
+            click.echo(json.dumps(result))
+    except ValueError as e:
+        raise click.UsageError(str(e))
+    if failed:
+        sys.exit(1)
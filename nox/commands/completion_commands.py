@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import click
+
+from nox.domains.completion_cache import CompletionCache
+from nox.domains.completion_cache import SOURCES
+
+
+@click.group()
+def completion():
+    """Manage cached completion values (buckets, containers, keys, topics)."""
+    pass
+
+
+@click.command()
+@click.argument('source', type=click.Choice(sorted(SOURCES)))
+@click.option('--scope', default='', help='Value scoping the source, e.g. the bucket for s3-objects')
+def refresh(source, scope):
+    """Query the backend and update the cached values of SOURCE."""
+    try:
+        values = CompletionCache().refresh(source, scope)
+    except Exception as e:
+        raise click.ClickException(f"Refreshing {source} failed: {e}")
+    if values is None:
+        click.echo(f"A refresh of {source} is already running.", err=True)
+        return
+    click.echo(f"Cached {len(values)} values for {source}.")
+
+
+@click.command()
+@click.argument('source', type=click.Choice(sorted(SOURCES)))
+@click.option('--scope', default='', help='Value scoping the source, e.g. the bucket for s3-objects')
+def values(source, scope):
+    """Print the cached values of SOURCE, refreshing them in the background when stale."""
+    for value in CompletionCache().values(source, scope):
+        click.echo(value)
+
+
+completion.add_command(refresh)
+completion.add_command(values)
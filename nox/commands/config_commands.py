@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import json
+
+import click
+
+from nox.config.options import current_config
+
+
+@click.group()
+def config():
+    """Inspect the layered nox configuration."""
+    pass
+
+
+@click.command()
+@click.option('--sources', is_flag=True, help='Also list the config files that were merged')
+def show(sources):
+    """Show the effective settings after merging files, profile and environment."""
+    current = current_config()
+    if sources:
+        for path in current.sources:
+            click.echo(f"# {path}")
+        if current.profile:
+            click.echo(f"# profile: {current.profile}")
+    for key, value in current.flatten().items():
+        click.echo(f"{key} = {json.dumps(value)}")
+
+
+@click.command()
+@click.argument('key')
+def get(key):
+    """Print the effective value of a dotted KEY, e.g. redis.host."""
+    value = current_config().get(key)
+    if value is None:
+        raise click.ClickException(f"{key} is not set")
+    click.echo(value if isinstance(value, str) else json.dumps(value))
+
+
+config.add_command(show)
+config.add_command(get)
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import time
+
+import click
+
+from nox.client import connect
+from nox.client import request
+from nox.utils.paths import check_private_dir
+from nox.utils.paths import daemon_socket_path
+from nox.utils.paths import runtime_dir
+
+
+def _is_running(socket_path: str) -> bool:
+    """Check whether a daemon answers on the socket."""
+    try:
+        with connect(socket_path) as sock:
+            request(sock, {'control': 'status'})
+        return True
+    except (OSError, ValueError):
+        return False
+
+
+def _private_dir(directory: str) -> str:
+    """Create ``directory`` if needed and make sure only this user can use it."""
+    try:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        check_private_dir(directory)
+    except OSError as e:
+        raise click.ClickException(str(e))
+    return directory
+
+
+@click.group()
+def daemon():
+    """Run nox as a warm background daemon (use it through `noxc`)."""
+    pass
+
+
+@click.command()
+@click.option('--socket', 'socket_path', default=None, help='Path of the Unix socket (default: $NOX_DAEMON_SOCKET or the runtime dir)')
+@click.option('--foreground', is_flag=True, help='Run in the foreground instead of detaching')
+def start(socket_path, foreground):
+    """Start the nox daemon."""
+    from nox.utils.daemon import NoxDaemon
+
+    socket_path = socket_path or daemon_socket_path()
+    _private_dir(os.path.dirname(os.path.abspath(socket_path)))
+    if _is_running(socket_path):
+        click.echo(f"nox daemon already running on {socket_path}.")
+        return
+    if foreground:
+        click.echo(f"nox daemon listening on {socket_path}.")
+        NoxDaemon(socket_path).serve()
+        return
+
+    log_path = os.path.join(_private_dir(runtime_dir()), 'daemon.log')
+    with open(log_path, 'ab') as log:
+        subprocess.Popen(
+            [sys.executable, '-m', 'nox.main', 'daemon', 'start', '--foreground', '--socket', socket_path],
+            stdin=subprocess.DEVNULL, stdout=log, stderr=log, start_new_session=True,
+        )
+    # Wait for the daemon to finish preloading and accept connections
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if _is_running(socket_path):
+            click.echo(f"nox daemon started on {socket_path}.")
+            return
+        time.sleep(0.05)
+    raise click.ClickException(f"nox daemon did not start, see {log_path}")
+
+
+@click.command()
+@click.option('--socket', 'socket_path', default=None, help='Path of the Unix socket')
+def stop(socket_path):
+    """Stop the nox daemon."""
+    socket_path = socket_path or daemon_socket_path()
+    try:
+        with connect(socket_path) as sock:
+            request(sock, {'control': 'stop'})
+    except OSError:
+        click.echo('nox daemon is not running.')
+        return
+    click.echo('nox daemon stopped.')
+
+
+@click.command()
+@click.option('--socket', 'socket_path', default=None, help='Path of the Unix socket')
+def status(socket_path):
+    """Show the state of the nox daemon."""
+    socket_path = socket_path or daemon_socket_path()
+    try:
+        with connect(socket_path) as sock:
+            info = request(sock, {'control': 'status'})
+    except OSError:
+        click.echo('nox daemon is not running.')
+        return
+    click.echo(f"PID: {info['pid']}")
+    click.echo(f"Socket: {info['socket']}")
+    click.echo(f"Uptime: {info['uptime']:.0f}s")
+    click.echo(f"Requests served: {info['requests']}")
+    click.echo(f"Cached clients: {', '.join(info['clients']) or 'none'}")
+
+
+# Add commands to the daemon group
+daemon.add_command(start)
+daemon.add_command(stop)
+daemon.add_command(status)
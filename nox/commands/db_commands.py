@@ -2,7 +2,9 @@ from __future__ import annotations
 
 import click
 
+from nox.config.options import setting
 from nox.domains.db_manager import DBManager
+from nox.utils.profiling import span
 
 
 @click.group()
@@ -12,28 +14,39 @@ def db():
 
 
 @click.command()
-@click.option('--db', 'connection_string', required=True, help='Database connection string')
+@click.option(
+    '--db', 'connection_string', required=True, default=setting('db.url'),
+    help='Database connection string (config: db.url)',
+)
 @click.option('--query', required=True, help='SQL query to run')
 def query(connection_string, query):
     """Run a SQL query on the database."""
     manager = DBManager(connection_string)
     results = manager.run_query(query)
-    for row in results:
-        click.echo(row)
+    with span('render', 'render'):
+        for row in results:
+            click.echo(row)
 
 
 @click.command()
-@click.option('--db', 'connection_string', required=True, help='Database connection string')
+@click.option(
+    '--db', 'connection_string', required=True, default=setting('db.url'),
+    help='Database connection string (config: db.url)',
+)
 def list_tables(connection_string):
     """List tables in the database."""
     manager = DBManager(connection_string)
     tables = manager.list_tables()
-    for table in tables:
-        click.echo(table[0])  # Assuming table names are in the first column
+    with span('render', 'render'):
+        for table in tables:
+            click.echo(table[0])  # Assuming table names are in the first column
 
 
 @click.command()
-@click.option('--db', 'connection_string', required=True, help='Database connection string')
+@click.option(
+    '--db', 'connection_string', required=True, default=setting('db.url'),
+    help='Database connection string (config: db.url)',
+)
 @click.option('--migration', required=True, help='Path to the SQL migration file')
 def migrate(connection_string, migration):
     """Run a SQL migration file."""
@@ -42,7 +55,10 @@ def migrate(connection_string, migration):
 
 
 @click.command()
-@click.option('--db', 'connection_string', required=True, help='Database connection string')
+@click.option(
+    '--db', 'connection_string', required=True, default=setting('db.url'),
+    help='Database connection string (config: db.url)',
+)
 @click.option('--output', required=True, help='Path to save the backup')
 def backup(connection_string, output):
     """Backup the database to a file."""
@@ -51,7 +67,10 @@ def backup(connection_string, output):
 
 
 @click.command()
-@click.option('--db', 'connection_string', required=True, help='Database connection string')
+@click.option(
+    '--db', 'connection_string', required=True, default=setting('db.url'),
+    help='Database connection string (config: db.url)',
+)
 @click.option('--input', required=True, help='Path to the backup file')
 def restore(connection_string, input):
     """Restore the database from a backup file."""
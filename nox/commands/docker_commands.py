@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import click
 
+from nox.domains.completion_cache import CachedValues
 from nox.domains.docker_manager import DockerManager
 
 
@@ -42,7 +43,10 @@ def list(all):
 
 
 @click.command()
-@click.option('--name', required=True, help='Name or ID of the container to stop')
+@click.option(
+    '--name', required=True, shell_complete=CachedValues('docker-containers'),
+    help='Name or ID of the container to stop',
+)
 def stop(name):
     """Stop a running Docker container."""
     manager = DockerManager()
@@ -50,7 +54,10 @@ def stop(name):
 
 
 @click.command()
-@click.option('--name', required=True, help='Name or ID of the container to remove')
+@click.option(
+    '--name', required=True, shell_complete=CachedValues('docker-containers'),
+    help='Name or ID of the container to remove',
+)
 def remove(name):
     """Remove a Docker container."""
     manager = DockerManager()
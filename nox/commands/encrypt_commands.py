@@ -1,8 +1,18 @@
 from __future__ import annotations
 
+import io
+import os
+import sys
+
 import click
 
+from nox.domains.compress import CODECS
 from nox.domains.encrypt import EncryptionManager
+from nox.domains.encrypt import STREAM_CHUNK_SIZE
+from nox.domains.encrypt import STREAM_CIPHERS
+from nox.domains.hash_manager import ALGORITHMS
+from nox.utils.files import output_stream
+from nox.utils.units import ByteSize
 
 
 @click.group()
@@ -21,14 +31,23 @@ def encrypt():
     help='Path to the output file',
 )
 @click.option('--key', required=True, help='Path to the encryption key')
-def fernet(text, input, output, key) -> None:
-    """Encrypt text or file using Fernet."""
+@click.option('--compress', type=click.Choice(sorted(CODECS)), help='Compress the data before encrypting it')
+def fernet(text, input, output, key, compress) -> None:
+    """Encrypt text or file using Fernet.
+
+    The output is a standard Fernet token. With --compress, the token is
+    preceded by a NOXZ prefix recording the codec, which nox decrypt fernet
+    reads to decompress automatically.
+    """
     if not text and not input:
         raise click.UsageError('You must provide either --text or --input.')
     manager = EncryptionManager(
         input_text=text, input_file=input, key_file=key,
     )
-    encrypted_data = manager.encrypt_fernet()
+    try:
+        encrypted_data = manager.encrypt_fernet(compress)
+    except ValueError as e:
+        raise click.ClickException(str(e))
     if output:
         output.write(encrypted_data)
     else:
@@ -39,51 +58,413 @@ def fernet(text, input, output, key) -> None:
 
 @click.command()
 @click.option('--text', help='Text to encrypt')
-@click.option('--input', type=click.File('rb'), help='Path to the input file')
-@click.option(
-    '--output', type=click.File('wb'),
-    help='Path to the output file',
-)
-def base64(text: str, input, output) -> None:
-    """Encrypt text or file using Base64."""
-    if not text and not input:
-        raise click.UsageError('You must provide either --text or --input.')
+@click.option('--input', type=click.File('rb'), default='-', help='Path to the input file (default: stdin)')
+@click.option('--output', help='Path to the output file (default: stdout)')
+@click.option('--url-safe', is_flag=True, help='Use the URL-safe alphabet (- and _ instead of + and /)')
+@click.option('--wrap', type=click.IntRange(min=0), default=0, help='Break lines after this many characters (default: 0, no breaks)')
+def base64(text: str, input, output, url_safe, wrap) -> None:
+    """Encode text, a file or stdin of any size using Base64, in constant memory."""
     manager = EncryptionManager(input_text=text, input_file=input)
-    encrypted_data = manager.encrypt_base64()
-    if output:
-        output.write(encrypted_data)
-    else:
-        click.echo(f"Encrypted text: {encrypted_data.decode()}")
+    if text and not output:
+        encoded = io.BytesIO()
+        manager.output_file = encoded
+        manager.encrypt_base64_stream(url_safe, wrap)
+        click.echo(f"Encrypted text: {encoded.getvalue().decode().rstrip()}")
+        return
+    with output_stream(output or '-') as sink:
+        manager.output_file = sink
+        manager.encrypt_base64_stream(url_safe, wrap)
 
 # RSA Encryption Commands
 
 
 @click.command()
 @click.option('--text', help='Text to encrypt')
+@click.option('--input', type=click.File('rb'), default='-', help='Path to the input file (default: stdin)')
+@click.option('--output', default='-', help='Path to the output file (default: stdout)')
+@click.option('--key', required=True, help='Path to the RSA public key (PEM)')
 @click.option(
-    '--input', type=click.File('rb'),
-    help='Path to the input file',
+    '--cipher', type=click.Choice(sorted(STREAM_CIPHERS)), default='aes-gcm', show_default=True,
+    help='AEAD cipher for the payload',
 )
+@click.option('--compress', type=click.Choice(sorted(CODECS)), help='Compress the data before encrypting it')
+def rsa(text: str, input, output, key, cipher, compress) -> None:
+    """Encrypt text or a file of any size for the holder of an RSA private key.
+
+    A random key is wrapped with RSA-OAEP and the data is encrypted with it
+    in the chunked format of nox encrypt stream, so large files go at the
+    speed of the symmetric cipher.
+    """
+    manager = EncryptionManager(input_text=text, input_file=input, key_file=key)
+    try:
+        with output_stream(output) as sink:
+            manager.output_file = sink
+            manager.encrypt_rsa_stream(cipher, compression=compress)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+
+# Streaming AEAD Commands
+
+
+@click.command()
+@click.option('--text', help='Text to encrypt')
+@click.option('--input', type=click.File('rb'), default='-', help='Path to the input file (default: stdin)')
+@click.option('--output', default='-', help='Path to the output file (default: stdout)')
+@click.option('--key', required=True, help='Path to a 32-byte key (see nox encrypt keygen)')
 @click.option(
-    '--output', type=click.File('wb'),
-    help='Path to the output file',
+    '--cipher', type=click.Choice(sorted(STREAM_CIPHERS)), default='aes-gcm', show_default=True,
+    help='AEAD cipher for the chunks',
 )
-@click.option('--key', required=True, help='Path to the RSA public key')
-def rsa(text: str, input, output, key) -> None:
-    """Encrypt text or file using RSA."""
-    if not text and not input:
-        raise click.UsageError('You must provide either --text or --input.')
-    manager = EncryptionManager(
-        input_text=text, input_file=input, key_file=key,
-    )
-    encrypted_data = manager.encrypt_rsa()
-    if output:
-        output.write(encrypted_data)
+@click.option('--chunk-size', type=ByteSize(), default=STREAM_CHUNK_SIZE, help='Plaintext bytes per chunk (default: 1MiB)')
+@click.option('--compress', type=click.Choice(sorted(CODECS)), help='Compress the data before encrypting it')
+def stream(text, input, output, key, cipher, chunk_size, compress) -> None:
+    """Encrypt a file or stdin of any size in constant memory.
+
+    The input is split into authenticated chunks, so decryption detects
+    modified, reordered and truncated data. A file given as --output only
+    appears once encryption has finished. --compress compresses the data
+    on the way to the cipher (zstd on all cores) and records the codec in
+    the header, so decryption needs no option.
+    """
+    manager = EncryptionManager(input_text=text, input_file=input, key_file=key)
+    try:
+        with output_stream(output) as sink:
+            manager.output_file = sink
+            manager.encrypt_stream(cipher, chunk_size, compress)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+
+@click.command()
+@click.option('--output', required=True, help='Path to write the new key to')
+@click.option(
+    '--type', 'key_type', type=click.Choice(['secret', 'ed25519', 'ed448']), default='secret', show_default=True,
+    help='A secret key, or a signing key pair for the sign command',
+)
+def keygen(output, key_type) -> None:
+    """Generate a random key for the stream command (also a valid Fernet key).
+
+    With --type ed25519 or ed448, write a private signing key to OUTPUT
+    and its public key to OUTPUT.pub instead.
+    """
+    if key_type == 'secret':
+        from nox.domains.encrypt import generate_key
+
+        keys = [(output, generate_key(), 0o600)]
     else:
-        click.echo(f"Encrypted text: {encrypted_data.decode()}")
+        from nox.domains.encrypt_sign import generate_signing_key
+
+        private_pem, public_pem = generate_signing_key(key_type)
+        keys = [(f"{output}.pub", public_pem, 0o644), (output, private_pem, 0o600)]
+    for path, _, _ in keys:
+        if os.path.lexists(path):
+            raise click.ClickException(f"{path} already exists.")
+    for path, data, mode in keys:
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, mode)
+        except FileExistsError:
+            raise click.ClickException(f"{path} already exists.")
+        with os.fdopen(fd, 'wb') as file:
+            file.write(data)
+    if key_type == 'secret':
+        click.echo(f"Key written to {output}.")
+    else:
+        click.echo(f"Private key written to {output}, public key to {output}.pub.")
+
+
+# Directory Commands
+
+DIR_METHODS = ['stream', 'rsa', 'fernet', 'base64']
+
+
+def _run_directory(source, output, method, key, decrypt, cipher, chunk_size, suffix, jobs, force, compression=None) -> None:
+    from nox.domains.encrypt_tree import DirectoryCipher
+
+    if method != 'base64' and not key:
+        raise click.UsageError(f"--key is required for {method}.")
+    key_data = None
+    if key:
+        with open(key, 'rb') as file:
+            key_data = file.read()
+    counts = {'written': 0, 'skipped': 0, 'failed': 0}
+    try:
+        cipher_tree = DirectoryCipher(method, key_data, decrypt, cipher, chunk_size, suffix, jobs, force, compression)
+        for path, status, error in cipher_tree.run(source, output):
+            counts[status] += 1
+            if error:
+                click.echo(f"nox: {path}: {error}", err=True)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"{counts['written']} written, {counts['skipped']} up to date, {counts['failed']} failed", err=True)
+    if counts['failed']:
+        sys.exit(1)
+
+
+@click.command('dir')
+@click.argument('source', type=click.Path(exists=True, file_okay=False))
+@click.argument('output', type=click.Path(file_okay=False))
+@click.option('--method', type=click.Choice(DIR_METHODS), default='stream', show_default=True, help='Encryption format')
+@click.option('--key', help='Path to the key (for rsa: the public key to encrypt, the private key to decrypt)')
+@click.option('--suffix', help='File name suffix of encrypted files (default: per method, e.g. .noxs)')
+@click.option('--jobs', '-j', type=click.IntRange(min=1), help='Worker processes (default: all cores)')
+@click.option('--force', is_flag=True, help='Process files whose output is already up to date')
+@click.option(
+    '--cipher', type=click.Choice(sorted(STREAM_CIPHERS)), default='aes-gcm', show_default=True,
+    help='AEAD cipher for the stream and rsa methods',
+)
+@click.option('--chunk-size', type=ByteSize(), default=STREAM_CHUNK_SIZE, help='Plaintext bytes per chunk (default: 1MiB)')
+@click.option('--compress', type=click.Choice(sorted(CODECS)), help='Compress the data before encrypting it')
+def encrypt_dir(source, output, method, key, suffix, jobs, force, cipher, chunk_size, compress) -> None:
+    """Encrypt every file under SOURCE into the same layout under OUTPUT.
+
+    Files are encrypted on all cores and each output appears atomically
+    with the suffix of the method appended. Outputs carry the mtime of
+    their input, so running the command again only encrypts new and
+    changed files.
+    """
+    _run_directory(source, output, method, key, False, cipher, chunk_size, suffix, jobs, force, compress)
+
+
+@click.command()
+@click.argument('paths', nargs=-1, required=True)
+@click.option(
+    '--old-key', 'old_keys', multiple=True, required=True,
+    help='Path to a key the files may be encrypted with (repeatable)',
+)
+@click.option('--new-key', required=True, help='Path to the key to re-encrypt the files with')
+@click.option('--jobs', '-j', type=click.IntRange(min=1), help='Worker processes (default: all cores)')
+@click.option('--checkpoint', help='Journal of finished files for resuming (default: in the nox cache directory)')
+def rotate(paths, old_keys, new_key, jobs, checkpoint) -> None:
+    """Re-encrypt Fernet-encrypted files under PATHS with a new key, in place.
+
+    Each file is decrypted with whichever --old-key fits and replaced
+    atomically by a token for --new-key, keeping its timestamp. Files that
+    already use the new key are left alone. If the rotation is interrupted,
+    running the same command again resumes where it stopped.
+    """
+    from nox.domains.encrypt_rotate import KeyRotation
+
+    keys = []
+    for key_path in (new_key, *old_keys):
+        with open(key_path, 'rb') as file:
+            keys.append(file.read())
+    counts = {'rotated': 0, 'current': 0, 'resumed': 0, 'failed': 0}
+    try:
+        rotation = KeyRotation(keys[0], keys[1:], jobs, checkpoint)
+        for path, status, error in rotation.run(paths):
+            counts[status] += 1
+            if error:
+                click.echo(f"nox: {path}: {error}", err=True)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(
+        f"{counts['rotated']} rotated, {counts['current']} already current, "
+        f"{counts['resumed']} done before, {counts['failed']} failed",
+        err=True,
+    )
+    if counts['failed']:
+        sys.exit(1)
+
+
+# Signing Commands
+
+
+@click.command()
+@click.argument('root', type=click.Path(exists=True, file_okay=False))
+@click.option('--key', required=True, help='Path to an Ed25519 or Ed448 private key (see nox encrypt keygen --type)')
+@click.option('--output', '-o', default='-', help='Signed manifest to write (default: stdout)')
+@click.option(
+    '--algorithm', default='sha256',
+    type=click.Choice([name for name in ALGORITHMS if name != 'md5']),
+    help='Digest algorithm of the manifest',
+)
+@click.option('--jobs', '-j', type=click.IntRange(min=1), help='Worker processes (default: all cores)')
+def sign(root, key, output, algorithm, jobs) -> None:
+    """Sign every file under ROOT with a single signature.
+
+    The files are hashed on all cores and the manifest of their digests is
+    signed, so thousands of files cost one signature. The output is a
+    checksum manifest that nox hash manifest verify and sha256sum -c also
+    read; check it with nox encrypt verify-sig. Nothing is written if a
+    file cannot be read.
+    """
+    from nox.domains.encrypt_sign import SignedManifest
+
+    with open(key, 'rb') as file:
+        pem = file.read()
+    try:
+        document, errors = SignedManifest(root, algorithm, jobs).sign(pem, exclude=[output] if output != '-' else [])
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    for name, error in errors.items():
+        click.echo(f"nox: {name}: {error}", err=True)
+    if errors:
+        raise click.ClickException(f"Not signed: {len(errors)} unreadable files.")
+    with output_stream(output) as sink:
+        sink.write(document)
+
+
+@click.command('verify-sig')
+@click.argument('signature_file', type=click.Path(exists=True, dir_okay=False))
+@click.option('--key', required=True, help="Path to the signer's public key")
+@click.option(
+    '--root', type=click.Path(exists=True, file_okay=False),
+    help='Directory that was signed (default: the directory of SIGNATURE_FILE)',
+)
+@click.option('--jobs', '-j', type=click.IntRange(min=1), help='Worker processes (default: all cores)')
+@click.option('--ignore-extra', is_flag=True, help='Do not fail on files that were not signed')
+def verify_sig(signature_file, key, root, jobs, ignore_extra) -> None:
+    """Check a tree against SIGNATURE_FILE from nox encrypt sign.
+
+    The signature is checked once, then every file is hashed on all cores
+    and compared with the signed digests. Prints one line per changed,
+    missing, extra or unreadable file and exits with status 1 if there is
+    any.
+    """
+    from nox.domains.encrypt_sign import SignedManifest
+
+    with open(key, 'rb') as file:
+        pem = file.read()
+    with open(signature_file, 'rb') as file:
+        document = file.read()
+    root = root or os.path.dirname(os.path.abspath(signature_file))
+    try:
+        report = SignedManifest(root, jobs=jobs).verify(document, pem, exclude=[signature_file])
+    except ValueError as e:
+        raise click.ClickException(f"{signature_file}: {e}")
+    for line in report.lines(ignore_extra):
+        click.echo(line)
+    click.echo(report.summary(), err=True)
+    if report.failed(ignore_extra):
+        sys.exit(1)
 
 
 # Adding Commands to the Group
 encrypt.add_command(fernet)
 encrypt.add_command(base64)
 encrypt.add_command(rsa)
+encrypt.add_command(stream)
+encrypt.add_command(keygen)
+encrypt.add_command(encrypt_dir)
+encrypt.add_command(rotate)
+encrypt.add_command(sign)
+encrypt.add_command(verify_sig)
+
+
+@click.group()
+def decrypt():
+    """Decryption commands."""
+    pass
+
+
+@decrypt.command('stream')
+@click.option('--input', type=click.File('rb'), default='-', help='Path to the encrypted file (default: stdin)')
+@click.option('--output', default='-', help='Path to the output file (default: stdout)')
+@click.option('--key', required=True, help='Path to the key used for encryption')
+def decrypt_stream(input, output, key) -> None:
+    """Decrypt data written by nox encrypt stream, in constant memory.
+
+    Fails if any chunk was modified, reordered, dropped or appended. A file
+    given as --output is only written when the whole input is authentic;
+    stdout may already have received the chunks before the damage.
+    """
+    manager = EncryptionManager(input_file=input, key_file=key)
+    try:
+        with output_stream(output) as sink:
+            manager.output_file = sink
+            manager.decrypt_stream()
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+
+@decrypt.command('rsa')
+@click.option('--input', type=click.File('rb'), default='-', help='Path to the encrypted file (default: stdin)')
+@click.option('--output', default='-', help='Path to the output file (default: stdout)')
+@click.option('--key', required=True, help='Path to the RSA private key (PEM)')
+def decrypt_rsa(input, output, key) -> None:
+    """Decrypt data written by nox encrypt rsa, in constant memory.
+
+    Single-block output of earlier nox versions is accepted too. As with
+    decrypt stream, a file given as --output is only written when the whole
+    input is authentic.
+    """
+    manager = EncryptionManager(input_file=input, key_file=key)
+    try:
+        with output_stream(output) as sink:
+            manager.output_file = sink
+            manager.decrypt_rsa_stream()
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+
+@decrypt.command('fernet')
+@click.option('--text', help='Fernet token to decrypt')
+@click.option('--input', type=click.File('rb'), help='Path to the encrypted file')
+@click.option('--output', help='Path to the output file')
+@click.option('--key', required=True, help='Path to the encryption key')
+def decrypt_fernet(text, input, output, key) -> None:
+    """Decrypt text or a file encrypted with nox encrypt fernet."""
+    from cryptography.fernet import InvalidToken
+
+    if not text and not input:
+        raise click.UsageError('You must provide either --text or --input.')
+    manager = EncryptionManager(input_text=text, input_file=input, key_file=key)
+    try:
+        decrypted_data = manager.decrypt_fernet()
+    except InvalidToken:
+        raise click.ClickException('Decryption failed: wrong key, or the data was modified.')
+    except ValueError as e:
+        raise click.ClickException(f"Decryption failed: {e}")
+    if output:
+        with output_stream(output) as sink:
+            sink.write(decrypted_data)
+    else:
+        click.echo(f"Decrypted text: {decrypted_data.decode(errors='replace')}")
+
+
+@decrypt.command('base64')
+@click.option('--text', help='Base64 text to decode')
+@click.option('--input', type=click.File('rb'), default='-', help='Path to the encoded file (default: stdin)')
+@click.option('--output', help='Path to the output file (default: stdout)')
+@click.option('--url-safe', is_flag=True, help='Decode the URL-safe alphabet (- and _ instead of + and /)')
+def decrypt_base64(text, input, output, url_safe) -> None:
+    """Decode Base64 text, a file or stdin in constant memory.
+
+    Line breaks are ignored and missing padding is accepted. A file given
+    as --output is only written when the whole input is valid.
+    """
+    import binascii
+
+    manager = EncryptionManager(input_text=text, input_file=input)
+    try:
+        if text and not output:
+            decoded = io.BytesIO()
+            manager.output_file = decoded
+            manager.decrypt_base64_stream(url_safe)
+            click.echo(f"Decrypted text: {decoded.getvalue().decode(errors='replace')}")
+            return
+        with output_stream(output or '-') as sink:
+            manager.output_file = sink
+            manager.decrypt_base64_stream(url_safe)
+    except binascii.Error as e:
+        raise click.ClickException(f"Invalid base64 input: {e}")
+
+
+@decrypt.command('dir')
+@click.argument('source', type=click.Path(exists=True, file_okay=False))
+@click.argument('output', type=click.Path(file_okay=False))
+@click.option('--method', type=click.Choice(DIR_METHODS), default='stream', show_default=True, help='Encryption format')
+@click.option('--key', help='Path to the key (for rsa: the public key to encrypt, the private key to decrypt)')
+@click.option('--suffix', help='File name suffix of encrypted files (default: per method, e.g. .noxs)')
+@click.option('--jobs', '-j', type=click.IntRange(min=1), help='Worker processes (default: all cores)')
+@click.option('--force', is_flag=True, help='Process files whose output is already up to date')
+def decrypt_dir(source, output, method, key, suffix, jobs, force) -> None:
+    """Decrypt every file under SOURCE into the same layout under OUTPUT.
+
+    The reverse of nox encrypt dir: only files with the method suffix are
+    decrypted (all files with --suffix ''), the suffix is stripped from the
+    names, files are decrypted on all cores and outputs appear atomically.
+    Files whose output is already up to date are skipped.
+    """
+    _run_directory(source, output, method, key, True, 'aes-gcm', STREAM_CHUNK_SIZE, suffix, jobs, force)
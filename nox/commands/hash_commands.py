@@ -1,8 +1,17 @@
 from __future__ import annotations
 
+import json
+import os
+import sys
+
 import click
 
+from nox.domains.hash_manager import ALGORITHMS
 from nox.domains.hash_manager import HashManager
+from nox.domains.hash_manager import S3_MULTIPART_THRESHOLD
+from nox.domains.hash_manager import S3_PART_SIZE
+from nox.domains.hash_manager import TREE_CHUNK_SIZE
+from nox.utils.units import ByteSize
 
 
 @click.group()
@@ -12,21 +21,112 @@ def hash():
 
 
 @click.command()
+@click.argument('paths', nargs=-1)
 @click.option(
-    '--file', 'file_path', required=True,
-    help='Path to the file to hash',
+    '--file', 'file_paths', multiple=True,
+    help='Path to a file or directory to hash (repeatable)',
 )
 @click.option(
-    '--algorithm', default='md5',
-    type=click.Choice(['md5', 'sha256', 'sha512']),
-    help='Hashing algorithm to use',
+    '--files-from', type=click.File('r'),
+    help='Read paths to hash from a file, one per line ("-" for stdin)',
+)
+@click.option(
+    '--algorithm', 'algorithms', default=['md5'], multiple=True,
+    type=click.Choice(ALGORITHMS),
+    help='Hashing algorithm to use; repeat it to compute several digests in one pass',
+)
+@click.option(
+    '--jobs', '-j', type=click.IntRange(min=1),
+    help='Worker processes for many or large files (default: all cores)',
+)
+@click.option('--tree', is_flag=True, help='Print the Merkle root over --chunk-size chunks, hashed in parallel')
+@click.option(
+    '--chunk-size', type=ByteSize(), default=TREE_CHUNK_SIZE,
+    help='Leaf size for --tree, e.g. 8MiB (default: 8MiB)',
+)
+@click.option('--s3-etag', is_flag=True, help='Print the ETag S3 assigns to the file after an upload')
+@click.option(
+    '--part-size', type=ByteSize(), default=S3_PART_SIZE,
+    help='Multipart part size for --s3-etag (default: 8MiB, as boto3)',
+)
+@click.option(
+    '--multipart-threshold', type=ByteSize(), default=S3_MULTIPART_THRESHOLD,
+    help='Smallest file uploaded in parts for --s3-etag (default: 8MiB, as boto3)',
 )
-def generate(file_path, algorithm):
-    """Generate a hash for a file."""
+def generate(paths, file_paths, files_from, algorithms, jobs, tree, chunk_size, s3_etag, part_size, multipart_threshold):
+    """Generate hashes for files, directories or glob patterns.
+
+    With several files the output matches sha256sum (and md5sum etc.), so
+    it can be checked with ``sha256sum -c``; with several algorithms it
+    matches ``sha256sum --tag``. Directories are hashed recursively and
+    every listing is sorted, so the output is stable.
+
+    --tree and --s3-etag split each file into chunks that are read and
+    hashed on all cores, for single files too large for one core.
+    """
     manager = HashManager()
-    file_hash = manager.generate_hash(file_path, algorithm)
-    if file_hash:
-        click.echo(f"{algorithm.upper()} hash for {file_path}: {file_hash}")
+    algorithms = tuple(dict.fromkeys(algorithms))
+    if tree and s3_etag:
+        raise click.UsageError('--tree and --s3-etag cannot be combined.')
+    if (tree or s3_etag) and len(algorithms) > 1:
+        raise click.UsageError('--tree and --s3-etag take a single --algorithm.')
+    if not (tree or s3_etag) and len(file_paths) == 1 and not paths and not files_from and not os.path.isdir(file_paths[0]):
+        if len(algorithms) == 1:
+            file_hash = manager.generate_hash(file_paths[0], algorithms[0])
+            if file_hash:
+                click.echo(f"{algorithms[0].upper()} hash for {file_paths[0]}: {file_hash}")
+            return
+        try:
+            file_hashes = manager.generate_hashes(file_paths[0], algorithms)
+        except (OSError, ValueError) as e:
+            raise click.ClickException(f"{file_paths[0]}: {e}")
+        for algorithm, file_hash in file_hashes.items():
+            click.echo(f"{algorithm.upper()} hash for {file_paths[0]}: {file_hash}")
+        return
+
+    targets = [*file_paths, *paths]
+    if files_from:
+        targets.extend(line.rstrip('\n') for line in files_from if line.strip())
+    if not targets:
+        raise click.UsageError('Give at least one path, --file or --files-from.')
+    if tree or s3_etag:
+        _generate_chunked(manager, targets, algorithms[0], jobs, tree, chunk_size, part_size, multipart_threshold)
+        return
+    failed = False
+    try:
+        for file_path, digests, error in manager.hash_files(targets, algorithms, jobs):
+            if error:
+                failed = True
+                click.echo(f"nox: {file_path}: {error}", err=True)
+            elif len(algorithms) == 1:
+                click.echo(manager.checksum_line(digests[0], file_path))
+            else:
+                for algorithm, digest in zip(algorithms, digests):
+                    click.echo(manager.tagged_line(algorithm, digest, file_path))
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    if failed:
+        sys.exit(1)
+
+
+def _generate_chunked(manager, targets, algorithm, jobs, tree, chunk_size, part_size, multipart_threshold):
+    """Tree hashes or S3 ETags; files are done one by one, each with parallel chunks."""
+    failed = False
+    for file_path in manager.expand_paths(targets):
+        try:
+            if tree:
+                digest = manager.tree_hash(file_path, algorithm, chunk_size, jobs)
+            else:
+                digest = manager.s3_etag(file_path, part_size, multipart_threshold, jobs)
+        except OSError as e:
+            failed = True
+            click.echo(f"nox: {file_path}: {e.strerror or e}", err=True)
+            continue
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        click.echo(manager.checksum_line(digest, file_path))
+    if failed:
+        sys.exit(1)
 
 
 @click.command()
@@ -40,7 +140,7 @@ def generate(file_path, algorithm):
 )
 @click.option(
     '--algorithm', default='md5',
-    type=click.Choice(['md5', 'sha256', 'sha512']),
+    type=click.Choice(ALGORITHMS),
     help='Hashing algorithm to use',
 )
 def verify(file_path, expected_hash, algorithm):
@@ -52,6 +152,166 @@ def verify(file_path, expected_hash, algorithm):
         click.echo(f"Hash does not match for {file_path}.")
 
 
+@click.group()
+def manifest():
+    """Create and verify checksum manifests of directory trees."""
+    pass
+
+
+@manifest.command('create')
+@click.argument('root', type=click.Path(exists=True, file_okay=False))
+@click.option('--output', '-o', default='-', help='Manifest file to write (default: stdout)')
+@click.option(
+    '--algorithm', default='sha256',
+    type=click.Choice(ALGORITHMS),
+    help='Hashing algorithm to use',
+)
+@click.option('--jobs', '-j', type=click.IntRange(min=1), help='Worker processes (default: all cores)')
+@click.option('--paranoid', is_flag=True, help='Rehash every file instead of trusting the stat cache')
+def manifest_create(root, output, algorithm, jobs, paranoid):
+    """Write a manifest of every file under ROOT.
+
+    Files whose device, inode, size and mtime are unchanged since the last
+    create or verify of ROOT are not read again unless --paranoid is given.
+    """
+    from nox.domains.hash_manifest import HashManifest
+
+    checksums = HashManifest(root, algorithm, jobs, paranoid)
+    try:
+        digests, errors = checksums.create(exclude=[output] if output != '-' else [])
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    for name, error in errors.items():
+        click.echo(f"nox: {name}: {error}", err=True)
+    lines = ''.join(f"{line}\n" for line in checksums.format(digests))
+    if output == '-':
+        click.echo(lines, nl=False)
+    else:
+        tmp_path = f"{output}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as file:
+            file.write(lines)
+        os.replace(tmp_path, output)
+    if errors:
+        sys.exit(1)
+
+
+@manifest.command('verify')
+@click.argument('manifest_file', type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    '--root', type=click.Path(exists=True, file_okay=False),
+    help='Directory the manifest describes (default: its own directory)',
+)
+@click.option('--jobs', '-j', type=click.IntRange(min=1), help='Worker processes (default: all cores)')
+@click.option('--paranoid', is_flag=True, help='Rehash every file instead of trusting the stat cache')
+@click.option('--ignore-extra', is_flag=True, help='Do not fail on files missing from the manifest')
+def manifest_verify(manifest_file, root, jobs, paranoid, ignore_extra):
+    """Check a tree against MANIFEST_FILE.
+
+    Prints one line per changed, missing, extra or unreadable file and exits
+    with status 1 if there is any.
+    """
+    from nox.domains.hash_manifest import HashManifest
+
+    with open(manifest_file) as file:
+        try:
+            algorithm, expected = HashManifest.parse(file)
+        except ValueError as e:
+            raise click.ClickException(f"{manifest_file}: {e}")
+    root = root or os.path.dirname(os.path.abspath(manifest_file))
+    checksums = HashManifest(root, algorithm or 'sha256', jobs, paranoid)
+    try:
+        report = checksums.verify(expected, exclude=[manifest_file])
+    except ValueError as e:
+        raise click.ClickException(f"{manifest_file}: {e}")
+    for line in report.lines(ignore_extra):
+        click.echo(line)
+    click.echo(report.summary(), err=True)
+    if report.failed(ignore_extra):
+        sys.exit(1)
+
+
+@click.command()
+@click.argument('paths', nargs=-1, required=True)
+@click.option(
+    '--algorithm', default='sha256',
+    type=click.Choice(ALGORITHMS),
+    help='Hashing algorithm used to confirm duplicates',
+)
+@click.option('--jobs', '-j', type=click.IntRange(min=1), help='Parallel workers (default: all cores)')
+@click.option('--min-size', type=ByteSize(), default=1, help='Ignore files smaller than this (default: 1 byte)')
+@click.option(
+    '--action', type=click.Choice(['report', 'hardlink']), default='report',
+    help='Only report duplicates, or replace copies with hard links to the first path',
+)
+def dedupe(paths, algorithm, jobs, min_size, action):
+    """Find files with identical content under PATHS.
+
+    Prints a JSON document with one group per set of identical files,
+    largest waste first. With --action hardlink every copy is replaced by a
+    hard link to the first path of its group.
+    """
+    from nox.domains.hash_dedupe import DuplicateFinder
+
+    finder = DuplicateFinder(algorithm, jobs, min_size)
+    try:
+        groups = finder.find(paths)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    errors = dict(finder.errors)
+    if action == 'hardlink':
+        for group in groups:
+            group['linked'], group_errors = finder.hardlink(group)
+            errors.update(group_errors)
+    click.echo(json.dumps(
+        {
+            'algorithm': algorithm,
+            'files': finder.scanned,
+            'groups': groups,
+            'wasted': sum(group['wasted'] for group in groups),
+            'errors': errors,
+        },
+        indent=2,
+    ))
+    if errors:
+        sys.exit(1)
+
+
+@click.command()
+@click.argument('root', type=click.Path(exists=True, file_okay=False))
+@click.option(
+    '--algorithm', default='sha256',
+    type=click.Choice(ALGORITHMS),
+    help='Hashing algorithm to use',
+)
+@click.option(
+    '--debounce', type=click.FloatRange(min=0), default=0.5, show_default=True,
+    help='Seconds a file must stay quiet before it is hashed again',
+)
+@click.option('--jobs', '-j', type=click.IntRange(min=1), help='Worker processes for the baseline (default: all cores)')
+def watch(root, algorithm, debounce, jobs):
+    """Watch ROOT and print a JSON line for every file whose content changes.
+
+    Linux only. Each line has the event (created, modified or deleted), the
+    path, the old and new digests and a UTC timestamp.
+    """
+    from nox.domains.hash_watch import IntegrityWatcher
+
+    watcher = IntegrityWatcher(root, algorithm, debounce, jobs=jobs)
+    try:
+        watcher.start()
+        click.echo(f"Watching {len(watcher.baseline)} files under {root}.", err=True)
+        watcher.run(lambda event: click.echo(json.dumps(event)))
+    except (OSError, ValueError) as e:
+        raise click.ClickException(str(e))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+
 # Add commands to the hash group
 hash.add_command(generate)
 hash.add_command(verify)
+hash.add_command(manifest)
+hash.add_command(dedupe)
+hash.add_command(watch)
@@ -1,8 +1,13 @@
 from __future__ import annotations
 
+import contextlib
+import json
+
 import click
 
+from nox.domains.jwt_bulk import ALGORITHMS
 from nox.domains.jwt_manager import JWTManager
+from nox.utils.files import output_stream
 
 
 @click.group()
@@ -56,6 +61,63 @@ def verify(token: str, key: str) -> None:
         click.echo(f"Token verification failed: {str(e)}")
 
 
+@click.command()
+@click.option('--env', required=True, help='Environment (e.g., prod, dev)')
+@click.option('--key', required=True, help='Path to the key file (a private key for RS, ES, PS and EdDSA)')
+@click.option('--claims', help='JSON Lines file with one claims object per token ("-" for stdin)')
+@click.option('--template', help='Claims JSON file to mint --count tokens from')
+@click.option('--count', type=click.IntRange(min=0), help='Number of tokens to mint from --template')
+@click.option(
+    '--expires-in', default=3600,
+    help='Expiration time in seconds(default: 3600)',
+)
+@click.option('--algorithm', type=click.Choice(ALGORITHMS), default='HS256', show_default=True, help='Signing algorithm')
+@click.option('--output', '-o', default='-', help='File to write the tokens to, one per line (default: stdout)')
+@click.option('--jobs', '-j', type=click.IntRange(min=1), help='Worker processes (default: all cores)')
+def bulk(
+    env: str, key: str, claims: str | None, template: str | None, count: int | None,
+    expires_in: int, algorithm: str, output: str, jobs: int | None,
+) -> None:
+    """Mint many JWTs, one per line of --claims or --count from --template.
+
+    The key is parsed once per worker and tokens are signed on all cores,
+    then written in input order. Every token gets the env claim and an
+    expiration. In a --template, {n} is replaced by the number of the
+    token, starting at 0.
+    """
+    from nox.domains.jwt_bulk import BulkMinter
+    from nox.domains.jwt_bulk import template_lines
+
+    if (claims is None) == (template is None):
+        raise click.UsageError('Give either --claims or --template.')
+    if (template is None) != (count is None):
+        raise click.UsageError('--template and --count go together.')
+
+    with open(key) as key_file:
+        secret = key_file.read().strip()
+    try:
+        minter = BulkMinter(secret, algorithm, expires_in, {'env': env}, jobs)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+    if template is not None:
+        with open(template) as file:
+            text = file.read()
+        try:
+            json.loads(text.replace('{n}', '0'))
+        except ValueError as e:
+            raise click.ClickException(f"{template}: {e}")
+        source = contextlib.nullcontext(template_lines(text, count))
+    else:
+        source = click.open_file(claims)
+    try:
+        with source as lines, output_stream(output) as sink:
+            sink.writelines(f"{token}\n".encode() for token in minter.mint(lines))
+    except ValueError as e:
+        raise click.ClickException(f"{claims or template}: {e}")
+
+
 # Adding Commands to the Group
 jwt.add_command(generate)
 jwt.add_command(verify)
+jwt.add_command(bulk)
@@ -2,39 +2,50 @@ from __future__ import annotations
 
 import click
 
+from nox.config.options import setting
+from nox.domains.completion_cache import CachedValues
 from nox.domains.kafka_manager import KafkaManager
 
-# Initialize Kafka manager
-kafka_manager = KafkaManager()
+# Topic names are cached per --bootstrap-servers value
+_topics = CachedValues('kafka-topics', 'bootstrap_servers', '--bootstrap-servers')
 
 
 @click.group()
-def kafka():
+@click.option(
+    '--bootstrap-servers', default=setting('kafka.bootstrap_servers', 'localhost:9092'),
+    help='Comma-separated list of Kafka brokers (config: kafka.bootstrap_servers)',
+)
+@click.pass_context
+def kafka(ctx, bootstrap_servers):
     """Kafka management commands."""
-    pass
+    # Producer and admin client are only created once a command needs them
+    ctx.obj = KafkaManager(bootstrap_servers=bootstrap_servers)
 
 
 @click.command()
-@click.option('--topic', required=True, help='Kafka topic to produce the message to')
+@click.option('--topic', required=True, shell_complete=_topics, help='Kafka topic to produce the message to')
 @click.option('--message', required=True, help='Message to produce to the topic')
-def produce(topic, message):
+@click.pass_obj
+def produce(kafka_manager, topic, message):
     """Produce a message to a Kafka topic."""
     result = kafka_manager.produce_message(topic, message)
     click.echo(result)
 
 
 @click.command()
-@click.option('--topic', required=True, help='Kafka topic to consume messages from')
+@click.option('--topic', required=True, shell_complete=_topics, help='Kafka topic to consume messages from')
 @click.option('--group-id', required=True, help='Consumer group ID')
 @click.option('--auto-offset-reset', default='earliest', type=click.Choice(['earliest', 'latest']), help='Offset reset policy')
-def consume(topic, group_id, auto_offset_reset):
+@click.pass_obj
+def consume(kafka_manager, topic, group_id, auto_offset_reset):
     """Consume messages from a Kafka topic."""
     messages = kafka_manager.consume_messages(topic, group_id, auto_offset_reset)
     click.echo('\n'.join(messages))
 
 
 @click.command()
-def list_topics():
+@click.pass_obj
+def list_topics(kafka_manager):
     """List all Kafka topics."""
     topics = kafka_manager.list_topics()
     click.echo('\n'.join(topics))
@@ -44,15 +55,17 @@ def list_topics():
 @click.option('--name', required=True, help='Name of the topic to create')
 @click.option('--partitions', default=1, help='Number of partitions for the topic')
 @click.option('--replication-factor', default=1, help='Replication factor for the topic')
-def create_topic(name, partitions, replication_factor):
+@click.pass_obj
+def create_topic(kafka_manager, name, partitions, replication_factor):
     """Create a new Kafka topic."""
     result = kafka_manager.create_topic(name, partitions, replication_factor)
     click.echo(result)
 
 
 @click.command()
-@click.option('--name', required=True, help='Name of the topic to delete')
-def delete_topic(name):
+@click.option('--name', required=True, shell_complete=_topics, help='Name of the topic to delete')
+@click.pass_obj
+def delete_topic(kafka_manager, name):
     """Delete a Kafka topic."""
     result = kafka_manager.delete_topic(name)
     click.echo(result)
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import click
+
+from nox.plugins.manifest import PluginManifest
+from nox.plugins.manifest import time_plugin
+
+
+@click.group()
+def plugins():
+    """Manage nox plugins."""
+    pass
+
+
+@click.command()
+@click.option('--timings', is_flag=True, help="Import every plugin and show its load time")
+@click.option('--refresh', is_flag=True, help='Rescan installed packages instead of using the cached manifest')
+def list(timings, refresh):
+    """List installed plugins and the commands they provide."""
+    manifest = PluginManifest().plugins(refresh=refresh)
+    if not manifest:
+        click.echo('No plugins installed.')
+        return
+    for plugin in manifest:
+        source = f"{plugin['dist']} {plugin['version']}".strip() or plugin['value']
+        line = f"{plugin['name']:<20} {source:<30} {', '.join(plugin['commands']) or '-'}"
+        error = plugin['error']
+        if timings:
+            elapsed, error = time_plugin(plugin)
+            line = f"{line:<80} {elapsed:>9.1f} ms"
+        click.echo(line)
+        if error:
+            click.echo(f"  error: {error}", err=True)
+
+
+plugins.add_command(list, name='list')
@@ -2,38 +2,51 @@ from __future__ import annotations
 
 import click
 
+from nox.config.options import setting
+from nox.domains.completion_cache import CachedValues
 from nox.domains.redis_manager import RedisManager
 
-# Initialize Redis manager
-redis_manager = RedisManager()
-
 
 @click.group()
-def redis():
+@click.option('--host', default=setting('redis.host', 'localhost'), help='Redis server host (config: redis.host)')
+@click.option('--port', type=int, default=setting('redis.port', 6379), help='Redis server port (config: redis.port)')
+@click.option('--db', type=int, default=setting('redis.db', 0), help='Redis database number (config: redis.db)')
+@click.pass_context
+def redis(ctx, host, port, db):
     """Redis management commands."""
-    pass
+    # The client itself is only created once a command talks to Redis
+    ctx.obj = RedisManager(host=host, port=port, db=db)
 
 
 @click.command()
 @click.option('--key', required=True, help='Key to set in Redis')
 @click.option('--value', required=True, help='Value to set for the key')
-def set_key(key, value):
+@click.pass_obj
+def set_key(redis_manager, key, value):
     """Set a key in Redis."""
     result = redis_manager.set_key(key, value)
     click.echo(result)
 
 
 @click.command()
-@click.option('--key', required=True, help='Key to get from Redis')
-def get_key(key):
+@click.option(
+    '--key', required=True, shell_complete=CachedValues('redis-keys', 'host', '--host'),
+    help='Key to get from Redis',
+)
+@click.pass_obj
+def get_key(redis_manager, key):
     """Get a key from Redis."""
     result = redis_manager.get_key(key)
     click.echo(result)
 
 
 @click.command()
-@click.option('--key', required=True, help='Key to delete from Redis')
-def delete_key(key):
+@click.option(
+    '--key', required=True, shell_complete=CachedValues('redis-keys', 'host', '--host'),
+    help='Key to delete from Redis',
+)
+@click.pass_obj
+def delete_key(redis_manager, key):
     """Delete a key from Redis."""
     result = redis_manager.delete_key(key)
     click.echo(result)
@@ -41,21 +54,24 @@ def delete_key(key):
 
 @click.command()
 @click.option('--pattern', default='*', help='Pattern to match keys (default: *)')
-def list_keys(pattern):
+@click.pass_obj
+def list_keys(redis_manager, pattern):
     """List keys in Redis."""
     result = redis_manager.list_keys(pattern)
     click.echo('\n'.join(result))
 
 
 @click.command()
-def flush_db():
+@click.pass_obj
+def flush_db(redis_manager):
     """Flush the current Redis database."""
     result = redis_manager.flush_database()
     click.echo(result)
 
 
 @click.command()
-def info():
+@click.pass_obj
+def info(redis_manager):
     """Get Redis server information."""
     result = redis_manager.info()
     click.echo(result)
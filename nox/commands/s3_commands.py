@@ -1,8 +1,15 @@
 from __future__ import annotations
 
+import os
+import sys
+
 import click
+from botocore.exceptions import ClientError
 
+from nox.domains.completion_cache import CachedValues
 from nox.domains.s3_manager import S3Manager
+from nox.utils.profiling import span
+from nox.utils.units import ByteSize
 
 
 @click.group()
@@ -12,20 +19,21 @@ def s3():
 
 
 @click.command()
-@click.option('--bucket', required=True, help='Name of the S3 bucket')
+@click.option('--bucket', required=True, shell_complete=CachedValues('s3-buckets'), help='Name of the S3 bucket')
 def list(bucket):
     """List objects in an S3 bucket."""
     manager = S3Manager()
     objects = manager.list_objects(bucket)
-    if objects:
-        for obj in objects:
-            click.echo(f"{obj['Key']} ({obj['Size']} bytes)")
-    else:
-        click.echo(f"No objects found in bucket {bucket}.")
+    with span('render', 'render'):
+        if objects:
+            for obj in objects:
+                click.echo(f"{obj['Key']} ({obj['Size']} bytes)")
+        else:
+            click.echo(f"No objects found in bucket {bucket}.")
 
 
 @click.command()
-@click.option('--bucket', required=True, help='Name of the S3 bucket')
+@click.option('--bucket', required=True, shell_complete=CachedValues('s3-buckets'), help='Name of the S3 bucket')
 @click.option(
     '--file', 'file_path', required=True,
     help='Path to the file to upload',
@@ -41,9 +49,10 @@ def upload(bucket, file_path, object_name):
 
 
 @click.command()
-@click.option('--bucket', required=True, help='Name of the S3 bucket')
+@click.option('--bucket', required=True, shell_complete=CachedValues('s3-buckets'), help='Name of the S3 bucket')
 @click.option(
     '--file', 'object_name', required=True,
+    shell_complete=CachedValues('s3-objects', 'bucket', '--bucket'),
     help='S3 object name to download',
 )
 @click.option(
@@ -57,9 +66,10 @@ def download(bucket, object_name, output):
 
 
 @click.command()
-@click.option('--bucket', required=True, help='Name of the S3 bucket')
+@click.option('--bucket', required=True, shell_complete=CachedValues('s3-buckets'), help='Name of the S3 bucket')
 @click.option(
     '--file', 'object_name', required=True,
+    shell_complete=CachedValues('s3-objects', 'bucket', '--bucket'),
     help='S3 object name to delete',
 )
 def delete(bucket, object_name):
@@ -68,8 +78,42 @@ def delete(bucket, object_name):
     manager.delete_object(bucket, object_name)
 
 
+@click.command()
+@click.option('--bucket', required=True, shell_complete=CachedValues('s3-buckets'), help='Name of the S3 bucket')
+@click.option(
+    '--file', 'file_path', required=True,
+    help='Local file to compare',
+)
+@click.option(
+    '--object', 'object_name', default=None,
+    shell_complete=CachedValues('s3-objects', 'bucket', '--bucket'),
+    help='S3 object name (defaults to file name)',
+)
+@click.option(
+    '--part-size', type=ByteSize(), default=None,
+    help='Part size of a multipart upload (default: read from S3)',
+)
+def verify(bucket, file_path, object_name, part_size):
+    """Check that an object matches a local file without downloading it.
+
+    Compares the object's ETag with one computed locally; this does not
+    work for objects encrypted with SSE-KMS or SSE-C.
+    """
+    manager = S3Manager()
+    try:
+        matches, local, remote = manager.verify_upload(bucket, file_path, object_name, part_size)
+    except (ClientError, OSError) as e:
+        raise click.ClickException(str(e))
+    if matches:
+        click.echo(f"{file_path} matches s3://{bucket}/{object_name or os.path.basename(file_path)} (ETag {remote}).")
+    else:
+        click.echo(f"{file_path} does not match: local ETag {local}, S3 ETag {remote}.")
+        sys.exit(1)
+
+
 # Add commands to the s3 group
 s3.add_command(list, name='list')
 s3.add_command(upload, name='upload')
 s3.add_command(download, name='download')
 s3.add_command(delete, name='delete')
+s3.add_command(verify, name='verify')
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import click
 
+from nox.config.options import setting
 from nox.domains.secret_manager import SecretsManager
 
 
@@ -14,7 +15,7 @@ def secrets():
 @click.command()
 @click.option('--name', required=True, help='Name of the secret')
 @click.option('--value', required=True, help='Value of the secret')
-@click.option('--region', default='us-west-2', help='AWS region')
+@click.option('--region', default=setting('aws.region', 'us-west-2'), help='AWS region (config: aws.region)')
 def store(name, value, region):
     """Store a secret."""
     manager = SecretsManager(region_name=region)
@@ -23,7 +24,7 @@ def store(name, value, region):
 
 @click.command()
 @click.option('--name', required=True, help='Name of the secret')
-@click.option('--region', default='us-west-2', help='AWS region')
+@click.option('--region', default=setting('aws.region', 'us-west-2'), help='AWS region (config: aws.region)')
 def get(name, region):
     """Retrieve a secret."""
     manager = SecretsManager(region_name=region)
@@ -33,7 +34,7 @@ def get(name, region):
 
 
 @click.command()
-@click.option('--region', default='us-west-2', help='AWS region')
+@click.option('--region', default=setting('aws.region', 'us-west-2'), help='AWS region (config: aws.region)')
 def list(region):
     """List all secrets."""
     manager = SecretsManager(region_name=region)
@@ -42,7 +43,7 @@ def list(region):
 
 @click.command()
 @click.option('--name', required=True, help='Name of the secret to delete')
-@click.option('--region', default='us-west-2', help='AWS region')
+@click.option('--region', default=setting('aws.region', 'us-west-2'), help='AWS region (config: aws.region)')
 def delete(name, region):
     """Delete a secret."""
     manager = SecretsManager(region_name=region)
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import datetime
+import marshal
+import os
+import zlib
+from typing import Any
+
+from nox.utils.paths import cache_dir
+
+SYSTEM_CONFIG = '/etc/nox/config.toml'
+USER_CONFIG = '~/.nox.toml'
+PROJECT_CONFIG = '.nox.toml'
+
+# Bump when the layout of the compiled cache changes
+_CACHE_VERSION = 1
+
+
+def _plain(value: Any) -> Any:
+    """Convert TOML values into types marshal can store."""
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    return value
+
+
+def _merge(base: dict[str, Any], override: dict[str, Any]) -> dict[str, Any]:
+    """Recursively merge ``override`` into a copy of ``base``."""
+    merged = dict(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+class Config:
+    """Merged nox settings for one profile.
+
+    Values are looked up by dotted key (``redis.host``). An environment
+    variable named after the key (``NOX_REDIS_HOST``) overrides the files.
+    """
+
+    def __init__(self, values: dict[str, Any], sources: list[str], profile: str | None = None) -> None:
+        self.values = values
+        self.sources = sources
+        self.profile = profile
+
+    @staticmethod
+    def env_name(key: str) -> str:
+        """Environment variable overriding a dotted key."""
+        return 'NOX_' + key.replace('.', '_').replace('-', '_').upper()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return a setting, giving environment variables precedence over the files."""
+        env_value = os.environ.get(self.env_name(key))
+        if env_value is not None:
+            return env_value
+        value: Any = self.values
+        for part in key.split('.'):
+            if not isinstance(value, dict) or part not in value:
+                return default
+            value = value[part]
+        return value
+
+    def flatten(self) -> dict[str, Any]:
+        """Every file setting as a dotted key, with environment overrides applied."""
+        flat: dict[str, Any] = {}
+
+        def walk(values: dict[str, Any], prefix: str) -> None:
+            for key, value in values.items():
+                if isinstance(value, dict):
+                    walk(value, f"{prefix}{key}.")
+                else:
+                    flat[f"{prefix}{key}"] = value
+
+        walk(self.values, '')
+        return {key: self.get(key) for key in sorted(flat)}
+
+
+class ConfigLoader:
+    """Load layered configuration from the system, user and project files.
+
+    Files are merged in that order; a top-level ``[profiles.NAME]`` table in
+    any file is merged on top when profile NAME is selected. Parsing TOML on
+    every start would cost more than most commands, so the merged result is
+    compiled to a marshal file in the cache directory and reused for as long
+    as the mtime and size of every source file are unchanged.
+    """
+
+    def __init__(self, cwd: str | None = None, cache_path: str | None = None) -> None:
+        self.cwd = cwd or os.getcwd()
+        self.cache_path = cache_path
+
+    def find_sources(self) -> list[str]:
+        """Existing config files, lowest precedence first."""
+        user = os.path.expanduser(USER_CONFIG)
+        candidates = [os.environ.get('NOX_SYSTEM_CONFIG') or SYSTEM_CONFIG, user]
+        directory = self.cwd
+        while True:
+            project = os.path.join(directory, PROJECT_CONFIG)
+            if project != user and os.path.isfile(project):
+                candidates.append(project)
+                break
+            parent = os.path.dirname(directory)
+            if parent == directory:
+                break
+            directory = parent
+        return [path for path in candidates if os.path.isfile(path)]
+
+    @staticmethod
+    def _stamp(sources: list[str]) -> tuple:
+        stamps = []
+        for path in sources:
+            stat = os.stat(path)
+            stamps.append((path, stat.st_mtime_ns, stat.st_size))
+        return (_CACHE_VERSION, tuple(stamps))
+
+    def _cache_file(self, sources: list[str]) -> str:
+        if self.cache_path:
+            return self.cache_path
+        # One compiled file per set of sources, so switching projects does not thrash
+        digest = zlib.crc32('\0'.join(sources).encode())
+        return os.path.join(cache_dir(), 'config', f"{digest:08x}.marshal")
+
+    @staticmethod
+    def parse(path: str) -> dict[str, Any]:
+        """Parse one TOML file."""
+        import tomllib
+
+        try:
+            with open(path, 'rb') as file:
+                return _plain(tomllib.load(file))
+        except tomllib.TOMLDecodeError as e:
+            raise ValueError(f"Invalid config file {path}: {e}")
+
+    def compile(self, sources: list[str]) -> dict[str, Any]:
+        """Merge the source files, ignoring the compiled cache."""
+        merged: dict[str, Any] = {}
+        for path in sources:
+            merged = _merge(merged, self.parse(path))
+        return merged
+
+    def merged(self, sources: list[str]) -> dict[str, Any]:
+        """Merged file contents, from the compiled cache when it is current."""
+        stamp = self._stamp(sources)
+        cache_file = self._cache_file(sources)
+        try:
+            with open(cache_file, 'rb') as file:
+                cached_stamp, merged = marshal.load(file)
+            if cached_stamp == stamp:
+                return merged
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+        merged = self.compile(sources)
+        try:
+            os.makedirs(os.path.dirname(cache_file), mode=0o700, exist_ok=True)
+            tmp_path = f"{cache_file}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as file:
+                marshal.dump((stamp, merged), file)
+            os.replace(tmp_path, cache_file)
+        except OSError:
+            pass
+        return merged
+
+    def load(self, profile: str | None = None) -> Config:
+        """Load the configuration, applying ``profile`` (or the files' default profile)."""
+        sources = self.find_sources()
+        merged = self.merged(sources) if sources else {}
+        profiles = merged.pop('profiles', {})
+        profile = profile or os.environ.get('NOX_CONFIG_PROFILE') or merged.pop('profile', None)
+        merged.pop('profile', None)
+        if profile:
+            if profile not in profiles:
+                raise ValueError(f"Unknown config profile: {profile}")
+            merged = _merge(merged, profiles[profile])
+        return Config(merged, sources, profile)
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+
+import click
+
+from nox.config.loader import Config
+from nox.config.loader import ConfigLoader
+
+
+def current_config() -> Config:
+    """Configuration of the running invocation, loaded once per command line."""
+    ctx = click.get_current_context(silent=True)
+    if ctx is None:
+        return _load(None)
+    root = ctx.find_root()
+    config = root.meta.get('nox.config')
+    if config is None:
+        config = root.meta['nox.config'] = _load(root.params.get('config_profile'))
+    return config
+
+
+def _load(profile: str | None) -> Config:
+    try:
+        return ConfigLoader().load(profile)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+
+def setting(key: str, default: Any = None) -> Callable[[], Any]:
+    """Option default read from the config files or environment.
+
+    Pass it as ``default=`` so an explicit command line value still wins;
+    the files are only read when the option is left out.
+    """
+    def resolve() -> Any:
+        return current_config().get(key, default)
+
+    return resolve
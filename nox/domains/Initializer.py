@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 import os
-import subprocess
+from importlib import metadata
 
 import click
 
+from nox.domains.completion_generator import CompletionGenerator
+
 
 class NoxInitializer:
     def __init__(self, shell: str) -> None:
@@ -32,16 +34,34 @@ class NoxInitializer:
                 f"~/.config/fish/completions/nox.{self.shell}",
             )
 
-        command = f'env _NOX_COMPLETE={self.shell}_source nox > {
-            self.completion_script_path
-        }'
-        subprocess.run(command, shell=True, check=True)
+        # Render a fully static script so TAB never has to start Python
+        from nox.main import cli
+        script = CompletionGenerator(cli).render(self.shell, stamp=self.get_install_stamp())
+        os.makedirs(os.path.dirname(self.completion_script_path), exist_ok=True)
+        with open(self.completion_script_path, 'w') as file:
+            file.write(script)
         click.echo(
             f"Auto-completion script generated at:{
                 self.completion_script_path
             }",
         )
 
+    @staticmethod
+    def get_install_stamp() -> str | None:
+        """Path of a file that only exists for the installed nox version.
+
+        The generated script checks it on shell start-up and regenerates
+        itself when nox is upgraded or reinstalled.
+        """
+        try:
+            dist = metadata.distribution('nox-cli')
+        except metadata.PackageNotFoundError:
+            return None
+        for file in dist.files or []:
+            if file.name == 'METADATA' and file.parent.name.endswith('.dist-info'):
+                return str(dist.locate_file(file))
+        return None
+
     def update_rc_file(self) -> None:
         """Update the rc file to source the completion script."""
         source_command = f"source {self.completion_script_path}"
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import io
+import json
+import shlex
+import time
+from collections.abc import Iterable
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+from nox.utils.invoke import run_command
+
+
+@dataclass
+class BatchEntry:
+    index: int
+    argv: list[str]
+    id: Any = None
+    stdin: str = ''
+    wait: bool = False
+
+
+class BatchRunner:
+    """Run many nox command lines inside one interpreter.
+
+    Every entry goes through the regular CLI, and the managers fetch their
+    clients from nox.utils.clients, so connections opened by one entry are
+    reused by all the following ones.
+    """
+
+    def __init__(self, jobs: int = 1, fail_fast: bool = False) -> None:
+        self.jobs = max(1, jobs)
+        self.fail_fast = fail_fast
+
+    @staticmethod
+    def parse_entries(lines: Iterable[str]) -> Iterator[BatchEntry]:
+        """Parse batch lines into entries.
+
+        A line is either a JSON array of arguments, a JSON object with an
+        ``argv`` list or ``cmd`` string (plus optional ``id``, ``stdin`` and
+        ``wait``), or a plain shell-style command line. A leading ``nox`` is
+        ignored, as are blank lines and ``#`` comments.
+        """
+        index = 0
+        for line_no, line in enumerate(lines, start=1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            entry: dict[str, Any]
+            if line[0] in '[{':
+                try:
+                    data = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"Line {line_no}: invalid JSON: {e}")
+                entry = {'argv': data} if isinstance(data, list) else dict(data)
+            else:
+                entry = {'cmd': line}
+            if 'cmd' in entry:
+                entry['argv'] = shlex.split(entry.pop('cmd'))
+            argv = [str(arg) for arg in entry.get('argv') or []]
+            if argv[:1] == ['nox']:
+                argv = argv[1:]
+            if not argv:
+                raise ValueError(f"Line {line_no}: no command given")
+            yield BatchEntry(
+                index=index, argv=argv, id=entry.get('id'),
+                stdin=entry.get('stdin', ''), wait=bool(entry.get('wait', False)),
+            )
+            index += 1
+
+    @staticmethod
+    def run_entry(entry: BatchEntry) -> dict[str, Any]:
+        """Run one entry and return its structured result."""
+        stdout, stderr = io.BytesIO(), io.BytesIO()
+        start = time.perf_counter()
+        code = run_command(entry.argv, io.BytesIO(entry.stdin.encode()), stdout, stderr)
+        return {
+            'index': entry.index,
+            'id': entry.id,
+            'argv': entry.argv,
+            'exit_code': code,
+            'duration_ms': round((time.perf_counter() - start) * 1000, 3),
+            'stdout': stdout.getvalue().decode('utf-8', 'backslashreplace'),
+            'stderr': stderr.getvalue().decode('utf-8', 'backslashreplace'),
+        }
+
+    def _segments(self, entries: Iterable[BatchEntry]) -> Iterator[list[BatchEntry]]:
+        """Split entries into groups that may run concurrently.
+
+        An entry with ``wait`` starts a new group, so it only runs once
+        everything before it has finished.
+        """
+        segment: list[BatchEntry] = []
+        for entry in entries:
+            if entry.wait and segment:
+                yield segment
+                segment = []
+            segment.append(entry)
+            # Bound the number of queued entries for very long batches
+            if len(segment) >= self.jobs * 64:
+                yield segment
+                segment = []
+        if segment:
+            yield segment
+
+    def run(self, entries: Iterable[BatchEntry]) -> Iterator[dict[str, Any]]:
+        """Run the entries and yield their results in input order."""
+        if self.jobs == 1:
+            for entry in entries:
+                result = self.run_entry(entry)
+                yield result
+                if self.fail_fast and result['exit_code'] != 0:
+                    return
+            return
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            for segment in self._segments(entries):
+                failed = False
+                for result in executor.map(self.run_entry, segment):
+                    yield result
+                    failed = failed or result['exit_code'] != 0
+                if self.fail_fast and failed:
+                    return
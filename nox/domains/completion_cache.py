@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from typing import Any
+
+from nox.utils.paths import cache_dir
+
+
+def _s3_buckets(scope: str) -> list[str]:
+    from nox.domains.s3_manager import S3Manager
+    return S3Manager().list_buckets()
+
+
+def _s3_objects(scope: str) -> list[str]:
+    from nox.domains.s3_manager import S3Manager
+    return [obj['Key'] for obj in S3Manager().list_objects(scope)] if scope else []
+
+
+def _docker_containers(scope: str) -> list[str]:
+    from nox.domains.docker_manager import DockerManager
+    return DockerManager().container_names(all_containers=True)
+
+
+def _db_tables(scope: str) -> list[str]:
+    from nox.domains.db_manager import DBManager
+    return [row[0] for row in DBManager(scope).list_tables()] if scope else []
+
+
+def _redis_keys(scope: str) -> list[str]:
+    from nox.domains.redis_manager import RedisManager
+    from nox.config.options import current_config
+
+    config = current_config()
+    host = scope or config.get('redis.host', 'localhost')
+    return RedisManager(host=host, port=int(config.get('redis.port', 6379)), db=int(config.get('redis.db', 0))).scan_keys()
+
+
+def _kafka_topics(scope: str) -> list[str]:
+    from nox.domains.kafka_manager import KafkaManager
+    from nox.config.options import current_config
+
+    return KafkaManager(scope or current_config().get('kafka.bootstrap_servers', 'localhost:9092')).topic_names()
+
+
+# Completion sources: name -> (TTL in seconds, fetcher taking the scope value)
+SOURCES: dict[str, tuple[int, Callable[[str], list[str]]]] = {
+    's3-buckets': (300, _s3_buckets),
+    's3-objects': (60, _s3_objects),
+    'docker-containers': (30, _docker_containers),
+    'db-tables': (300, _db_tables),
+    'redis-keys': (30, _redis_keys),
+    'kafka-topics': (120, _kafka_topics),
+}
+
+# Lock files older than this belong to a refresh that died
+_LOCK_TIMEOUT = 60
+
+
+def _crc_table() -> list[int]:
+    table = []
+    for i in range(256):
+        crc = i << 24
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x04C11DB7) if crc & 0x80000000 else crc << 1
+        table.append(crc & 0xFFFFFFFF)
+    return table
+
+
+_CRC_TABLE = _crc_table()
+
+
+def posix_cksum(data: bytes) -> int:
+    """Checksum computed by POSIX ``cksum``, so shell scripts can find scoped cache files."""
+    crc = 0
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFFFFFF) ^ _CRC_TABLE[(crc >> 24) ^ byte]
+    length = len(data)
+    while length:
+        crc = ((crc << 8) & 0xFFFFFFFF) ^ _CRC_TABLE[(crc >> 24) ^ (length & 0xFF)]
+        length >>= 8
+    return ~crc & 0xFFFFFFFF
+
+
+class CompletionCache:
+    """On-disk cache of live completion values (buckets, containers, keys, ...).
+
+    Each source/scope pair is stored in its own text file: the first line is
+    the expiry time as a Unix timestamp, every following line is one value.
+    Scoped files (objects of a bucket, tables of a database) are named after
+    the ``cksum`` of the scope so connection strings never end up in file
+    names. The generated shell scripts read these files directly and start a
+    background refresh when they have expired.
+    """
+
+    def __init__(self, root: str | None = None) -> None:
+        self.root = root or os.path.join(cache_dir(), 'completion')
+
+    def path(self, source: str, scope: str = '') -> str:
+        """Path of the cache file for a source and scope."""
+        name = f"{source}.{posix_cksum(scope.encode())}" if scope else source
+        return os.path.join(self.root, f"{name}.txt")
+
+    def read(self, source: str, scope: str = '') -> tuple[float, list[str]] | None:
+        """Return the expiry time and cached values, or None if nothing is cached."""
+        try:
+            with open(self.path(source, scope)) as file:
+                lines = file.read().splitlines()
+        except OSError:
+            return None
+        try:
+            return float(lines[0]), lines[1:]
+        except (IndexError, ValueError):
+            return None
+
+    def write(self, source: str, scope: str, values: list[str]) -> None:
+        """Atomically store values for a source and scope."""
+        ttl = SOURCES[source][0]
+        os.makedirs(self.root, mode=0o700, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'w') as file:
+                file.write(f"{int(time.time() + ttl)}\n")
+                for value in values:
+                    if '\n' not in value:
+                        file.write(f"{value}\n")
+            os.replace(tmp_path, self.path(source, scope))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def refresh(self, source: str, scope: str = '') -> list[str] | None:
+        """Query the backend and update the cache.
+
+        Returns None without querying if another refresh of the same file is
+        already running.
+        """
+        if source not in SOURCES:
+            raise ValueError(f"Unknown completion source: {source}")
+        os.makedirs(self.root, mode=0o700, exist_ok=True)
+        lock_path = self.path(source, scope) + '.lock'
+        try:
+            lock_fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) < _LOCK_TIMEOUT:
+                    return None
+                os.unlink(lock_path)
+            except OSError:
+                return None
+            return self.refresh(source, scope)
+        try:
+            try:
+                values = SOURCES[source][1](scope)
+            except Exception:
+                # Cache the failure too, so every TAB does not retry an unreachable backend
+                self.write(source, scope, [])
+                raise
+            self.write(source, scope, values)
+            return values
+        finally:
+            os.close(lock_fd)
+            os.unlink(lock_path)
+
+    def refresh_in_background(self, source: str, scope: str = '') -> None:
+        """Start a detached ``nox completion refresh`` process."""
+        args = [sys.executable, '-m', 'nox.main', 'completion', 'refresh', source]
+        if scope:
+            args += ['--scope', scope]
+        subprocess.Popen(
+            args, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL, start_new_session=True,
+        )
+
+    def values(self, source: str, scope: str = '') -> list[str]:
+        """Serve cached values, scheduling a background refresh when they are stale."""
+        cached = self.read(source, scope)
+        if cached is None or cached[0] < time.time():
+            if not os.path.exists(self.path(source, scope) + '.lock'):
+                self.refresh_in_background(source, scope)
+        return cached[1] if cached else []
+
+
+class CachedValues:
+    """``shell_complete`` callback serving an option's values from the completion cache.
+
+    ``scope_param`` names the parameter whose value scopes the source, e.g.
+    the bucket for object names. The static script generator reads
+    ``source`` and ``scope_option`` to emit the equivalent shell code.
+    """
+
+    def __init__(self, source: str, scope_param: str | None = None, scope_option: str | None = None) -> None:
+        self.source = source
+        self.scope_param = scope_param
+        self.scope_option = scope_option
+
+    def __call__(self, ctx: Any, param: Any, incomplete: str) -> list[str]:
+        from click.core import ParameterSource
+
+        scope = ''
+        if self.scope_param:
+            # Group-level options (redis --host) live on the parent context
+            lookup = ctx
+            while lookup is not None and self.scope_param not in lookup.params:
+                lookup = lookup.parent
+            # Only values typed on the command line scope the cache, like in the shell scripts
+            if lookup is not None and lookup.get_parameter_source(self.scope_param) == ParameterSource.COMMANDLINE:
+                scope = str(lookup.params[self.scope_param])
+        return [value for value in CompletionCache().values(self.source, scope) if value.startswith(incomplete)]
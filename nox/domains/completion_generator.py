@@ -0,0 +1,368 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from dataclasses import field
+
+import click
+
+from nox.domains.completion_cache import CachedValues
+
+
+@dataclass
+class CompletionOption:
+    names: list[str]
+    help: str = ''
+    takes_value: bool = True
+    choices: list[str] = field(default_factory=list)
+    files: bool = False
+    source: str | None = None
+    scope: str | None = None
+
+
+@dataclass
+class CompletionNode:
+    path: str
+    help: str = ''
+    commands: dict[str, str] = field(default_factory=dict)
+    options: list[CompletionOption] = field(default_factory=list)
+
+
+def _sh_quote(value: str) -> str:
+    """Quote a value for bash/zsh single-quoted strings."""
+    return "'" + value.replace("'", "'\\''") + "'"
+
+
+def _fish_quote(value: str) -> str:
+    """Quote a value for fish single-quoted strings."""
+    return "'" + value.replace('\\', '\\\\').replace("'", "\\'") + "'"
+
+
+class CompletionGenerator:
+    """Render static bash, zsh and fish completion scripts from a click command tree.
+
+    The scripts contain every subcommand, option and choice value, so the
+    shell can complete without starting a Python process.
+    """
+
+    def __init__(self, cli: click.Command, prog_names: tuple[str, ...] = ('nox', 'noxc')) -> None:
+        self.cli = cli
+        self.prog_names = prog_names
+        self.nodes = self.collect()
+
+    def collect(self) -> list[CompletionNode]:
+        """Walk the command tree, importing lazily loaded commands."""
+        nodes: list[CompletionNode] = []
+
+        def walk(command: click.Command, path: str, ctx: click.Context) -> None:
+            node = CompletionNode(path=path, help=command.get_short_help_str(limit=80))
+            for param in command.get_params(ctx):
+                if not isinstance(param, click.Option) or param.hidden:
+                    continue
+                param_type = param.type
+                cached = getattr(param, '_custom_shell_complete', None)
+                if not isinstance(cached, CachedValues):
+                    cached = None
+                node.options.append(CompletionOption(
+                    names=[*param.opts, *param.secondary_opts],
+                    help=param.help or '',
+                    takes_value=not (param.is_flag or param.count),
+                    choices=list(param_type.choices) if isinstance(param_type, click.Choice) else [],
+                    files=isinstance(param_type, (click.Path, click.File)),
+                    source=cached.source if cached else None,
+                    scope=cached.scope_option if cached else None,
+                ))
+            nodes.append(node)
+            if not isinstance(command, click.Group):
+                return
+            for name in command.list_commands(ctx):
+                sub = command.get_command(ctx, name)
+                if sub is None or sub.hidden:
+                    continue
+                node.commands[name] = sub.get_short_help_str(limit=80)
+                walk(sub, f"{path} {name}".strip(), click.Context(sub, info_name=name, parent=ctx))
+
+        walk(self.cli, '', click.Context(self.cli, info_name=self.prog_names[0]))
+        return nodes
+
+    def _stale_guard(self, shell: str, stamp: str | None) -> list[str]:
+        """Lines that regenerate the script once the installed nox changes."""
+        if not stamp:
+            return []
+        if shell == 'fish':
+            return [
+                '# Regenerate these completions when the installed nox changes',
+                f"if not test -e {_fish_quote(stamp)}",
+                f"    command nox init --shell {shell} >/dev/null 2>&1 &",
+                'end',
+                '',
+            ]
+        return [
+            '# Regenerate these completions when the installed nox changes',
+            f"if [ ! -e {_sh_quote(stamp)} ]; then",
+            f"    (command nox init --shell {shell} >/dev/null 2>&1 &)",
+            'fi',
+            '',
+        ]
+
+    def _path_cases(self) -> str:
+        """Case labels of every command path below the root."""
+        return '|'.join(_sh_quote(node.path) for node in self.nodes if node.path)
+
+    def _value_cases(self, shell: str) -> list[str]:
+        """Case branches completing the value of the previous option."""
+        lines = []
+        for node in self.nodes:
+            for option in node.options:
+                if not option.takes_value:
+                    continue
+                labels = '|'.join(_sh_quote(f"{node.path}|{name}") for name in option.names)
+                if option.source:
+                    action = f"_nox_cached {option.source} {_sh_quote(option.scope or '')}"
+                elif option.choices:
+                    words = ' '.join(option.choices)
+                    if shell == 'bash':
+                        action = f"COMPREPLY=($(compgen -W {_sh_quote(words)} -- \"$cur\"))"
+                    else:
+                        action = f"compadd -- {words}"
+                elif option.files:
+                    action = 'COMPREPLY=($(compgen -f -- "$cur"))' if shell == 'bash' else '_files'
+                else:
+                    action = 'COMPREPLY=()' if shell == 'bash' else ':'
+                lines.append(f"        {labels}) {action}; return ;;")
+        return lines
+
+    def _word_cases(self, kind: str) -> list[str]:
+        """Case branches listing subcommands or options for a command path."""
+        lines = []
+        for node in self.nodes:
+            if kind == 'commands':
+                words = list(node.commands)
+            else:
+                words = [name for option in node.options for name in option.names]
+            if words:
+                lines.append(f"        {_sh_quote(node.path)}) candidates={_sh_quote(' '.join(words))} ;;")
+        return lines
+
+    def render_bash(self, stamp: str | None = None) -> str:
+        """Render the bash completion script."""
+        lines = [
+            '# nox bash completion, generated by `nox init --shell bash`',
+            *self._stale_guard('bash', stamp),
+            '# Serve live values from the `nox completion` cache, refreshing it in the background',
+            '_nox_cached() {',
+            '    local source="$1" scope_opt="$2" scope="" file line expiry=0 i',
+            '    local -a tokens=() values=()',
+            '    if [[ -n "$scope_opt" ]]; then',
+            '        # COMP_WORDS splits at ":" and "=", so find the scope in the raw line',
+            '        read -r -a tokens <<< "$COMP_LINE"',
+            '        for ((i = 1; i + 1 < ${#tokens[@]}; i++)); do',
+            '            [[ "${tokens[i]}" == "$scope_opt" ]] && scope="${tokens[i+1]}"',
+            '        done',
+            '    fi',
+            '    file="${XDG_CACHE_HOME:-$HOME/.cache}/nox/completion/$source"',
+            '    if [[ -n "$scope" ]]; then',
+            '        line=$(printf %s "$scope" | cksum)',
+            '        file="$file.${line%% *}"',
+            '    fi',
+            '    file="$file.txt"',
+            '    if [[ -r "$file" ]]; then',
+            '        {',
+            '            read -r expiry',
+            '            while IFS= read -r line; do',
+            '                [[ "$line" == "$cur"* ]] && values+=("$line")',
+            '            done',
+            '        } < "$file"',
+            '    fi',
+            '    if (( expiry < ${EPOCHSECONDS:-$(date +%s)} )) && [[ ! -e "$file.lock" ]]; then',
+            '        (command nox completion refresh "$source" ${scope:+--scope "$scope"} >/dev/null 2>&1 &)',
+            '    fi',
+            '    COMPREPLY=("${values[@]}")',
+            '}',
+            '',
+            '_nox_complete() {',
+            '    local cur prev word key cmdpath="" candidates=""',
+            '    local i',
+            '    cur="${COMP_WORDS[COMP_CWORD]}"',
+            '    prev="${COMP_WORDS[COMP_CWORD-1]}"',
+            '    for ((i = 1; i < COMP_CWORD; i++)); do',
+            '        word="${COMP_WORDS[i]}"',
+            '        key="${cmdpath:+$cmdpath }$word"',
+            '        case "$key" in',
+            f"            {self._path_cases()}) cmdpath=\"$key\" ;;",
+            '        esac',
+            '    done',
+            '    case "$cmdpath|$prev" in',
+            *self._value_cases('bash'),
+            '    esac',
+            '    if [[ "$cur" == -* ]]; then',
+            '        case "$cmdpath" in',
+            *self._word_cases('options'),
+            '        esac',
+            '    else',
+            '        case "$cmdpath" in',
+            *self._word_cases('commands'),
+            '        esac',
+            '    fi',
+            '    COMPREPLY=($(compgen -W "$candidates" -- "$cur"))',
+            '}',
+            f"complete -o default -F _nox_complete {' '.join(self.prog_names)}",
+            '',
+        ]
+        return '\n'.join(lines)
+
+    def render_zsh(self, stamp: str | None = None) -> str:
+        """Render the zsh completion script."""
+        lines = [
+            f"#compdef {' '.join(self.prog_names)}",
+            '# nox zsh completion, generated by `nox init --shell zsh`',
+            *self._stale_guard('zsh', stamp),
+            '# Serve live values from the `nox completion` cache, refreshing it in the background',
+            '_nox_cached() {',
+            '    local source="$1" scope_opt="$2" scope="" file expiry=0',
+            '    local -a lines',
+            '    local -i i',
+            '    if [[ -n "$scope_opt" ]]; then',
+            '        for ((i = 2; i < CURRENT - 1; i++)); do',
+            '            [[ "${words[i]}" == "$scope_opt" ]] && scope="${(Q)words[i+1]}"',
+            '        done',
+            '    fi',
+            '    file="${XDG_CACHE_HOME:-$HOME/.cache}/nox/completion/$source"',
+            '    [[ -n "$scope" ]] && file="$file.${$(printf %s "$scope" | cksum)%% *}"',
+            '    file="$file.txt"',
+            '    if [[ -r "$file" ]]; then',
+            '        lines=("${(@f)$(<"$file")}")',
+            '        expiry="${lines[1]}"',
+            '        compadd -- "${(@)lines[2,-1]}"',
+            '    fi',
+            '    zmodload -F zsh/datetime p:EPOCHSECONDS 2>/dev/null',
+            '    if (( expiry < ${EPOCHSECONDS:-$(date +%s)} )) && [[ ! -e "$file.lock" ]]; then',
+            '        (command nox completion refresh "$source" ${scope:+--scope "$scope"} >/dev/null 2>&1 &)',
+            '    fi',
+            '}',
+            '',
+            '_nox_complete() {',
+            '    local cur prev word key cmdpath="" candidates=""',
+            '    local -i i',
+            '    cur="${words[CURRENT]}"',
+            '    prev="${words[CURRENT-1]}"',
+            '    for ((i = 2; i < CURRENT; i++)); do',
+            '        word="${words[i]}"',
+            '        key="${cmdpath:+$cmdpath }$word"',
+            '        case "$key" in',
+            f"            {self._path_cases()}) cmdpath=\"$key\" ;;",
+            '        esac',
+            '    done',
+            '    case "$cmdpath|$prev" in',
+            *self._value_cases('zsh'),
+            '    esac',
+            '    if [[ "$cur" == -* ]]; then',
+            '        case "$cmdpath" in',
+            *self._word_cases('options'),
+            '        esac',
+            '    else',
+            '        case "$cmdpath" in',
+            *self._word_cases('commands'),
+            '        esac',
+            '    fi',
+            '    [[ -n "$candidates" ]] && compadd -- ${=candidates} || _files',
+            '}',
+            '(( $+functions[compdef] )) || { autoload -Uz compinit && compinit; }',
+            f"compdef _nox_complete {' '.join(self.prog_names)}",
+            '',
+        ]
+        return '\n'.join(lines)
+
+    def render_fish(self, stamp: str | None = None) -> str:
+        """Render the fish completion script."""
+        paths = ' '.join(_fish_quote(node.path) for node in self.nodes if node.path)
+        lines = [
+            '# nox fish completion, generated by `nox init --shell fish`',
+            *self._stale_guard('fish', stamp),
+            f"set -g __nox_command_paths {paths}",
+            '',
+            '# Serve live values from the `nox completion` cache, refreshing it in the background',
+            'function __nox_cached',
+            '    set -l source $argv[1]',
+            '    set -l scope ""',
+            '    if test -n "$argv[2]"',
+            '        set -l tokens (commandline -opc)',
+            '        for i in (seq (math (count $tokens) - 1))',
+            '            if test "$tokens[$i]" = "$argv[2]"',
+            '                set scope $tokens[(math $i + 1)]',
+            '            end',
+            '        end',
+            '    end',
+            '    set -l dir $HOME/.cache',
+            '    set -q XDG_CACHE_HOME; and set dir $XDG_CACHE_HOME',
+            '    set -l file $dir/nox/completion/$source',
+            '    if test -n "$scope"',
+            '        set file $file.(printf %s $scope | cksum | string split -f1 " ")',
+            '    end',
+            '    set file $file.txt',
+            '    set -l expiry 0',
+            '    if test -r $file',
+            '        set -l lines (cat $file)',
+            '        set expiry $lines[1]',
+            '        if test (count $lines) -gt 1',
+            '            printf "%s\\n" $lines[2..-1]',
+            '        end',
+            '    end',
+            '    if test "$expiry" -lt (date +%s); and not test -e $file.lock',
+            '        if test -n "$scope"',
+            '            command nox completion refresh $source --scope $scope >/dev/null 2>&1 &',
+            '        else',
+            '            command nox completion refresh $source >/dev/null 2>&1 &',
+            '        end',
+            '        disown 2>/dev/null',
+            '    end',
+            'end',
+            '',
+            'function __nox_command_path',
+            '    set -l cmdpath ""',
+            '    for token in (commandline -opc)[2..-1]',
+            '        set -l key (string trim -- "$cmdpath $token")',
+            '        if contains -- $key $__nox_command_paths',
+            '            set cmdpath $key',
+            '        end',
+            '    end',
+            '    echo $cmdpath',
+            'end',
+            '',
+        ]
+        for prog in self.prog_names:
+            lines.append(f"complete -c {prog} -f")
+            for node in self.nodes:
+                condition = _fish_quote(f"test (__nox_command_path) = {_fish_quote(node.path)}")
+                for name, help_text in node.commands.items():
+                    lines.append(f"complete -c {prog} -n {condition} -a {_fish_quote(name)} -d {_fish_quote(help_text)}")
+                for option in node.options:
+                    flags = []
+                    for name in option.names:
+                        if name.startswith('--'):
+                            flags.append(f"-l {name[2:]}")
+                        elif len(name) == 2:
+                            flags.append(f"-s {name[1]}")
+                        else:
+                            flags.append(f"-o {name[1:]}")
+                    extra = ''
+                    if option.takes_value:
+                        extra = ' -r'
+                        if option.source:
+                            call = f"__nox_cached {option.source} {_fish_quote(option.scope or '')}"
+                            extra += f" -a {_fish_quote(f'({call})')}"
+                        elif option.choices:
+                            extra += f" -a {_fish_quote(' '.join(option.choices))}"
+                        elif option.files:
+                            extra += ' -F'
+                    lines.append(
+                        f"complete -c {prog} -n {condition} {' '.join(flags)}{extra} -d {_fish_quote(option.help)}",
+                    )
+        lines.append('')
+        return '\n'.join(lines)
+
+    def render(self, shell: str, stamp: str | None = None) -> str:
+        """Render the completion script for ``shell``."""
+        renderers = {'bash': self.render_bash, 'zsh': self.render_zsh, 'fish': self.render_fish}
+        if shell not in renderers:
+            raise ValueError(f"Unsupported shell: {shell}")
+        return renderers[shell](stamp)
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import io
+import zlib
+from typing import Any
+from typing import BinaryIO
+
+# Codec ids stored in ciphertext headers; 0 means uncompressed
+CODECS = {'gzip': 1, 'zstd': 2, 'lz4': 3}
+CODEC_NAMES = {codec_id: name for name, codec_id in CODECS.items()}
+# Packages of the optional codecs, installed with ``pip install nox-cli[<codec>]``
+_PACKAGES = {'zstd': 'zstandard', 'lz4': 'lz4'}
+# Input read per step when compressing, and most output produced per step when decompressing
+BLOCK_SIZE = 1 << 20
+
+
+def _import(codec: str) -> Any:
+    try:
+        if codec == 'zstd':
+            import zstandard
+            return zstandard
+        import lz4.frame
+        return lz4.frame
+    except ImportError:
+        raise ValueError(f"{codec} compression needs the {_PACKAGES[codec]} package (pip install nox-cli[{codec}])")
+
+
+class _LZ4Compressor:
+    """LZ4 frame compressor with the compress/flush interface of zlib."""
+
+    def __init__(self, lz4_frame: Any) -> None:
+        self.compressor = lz4_frame.LZ4FrameCompressor()
+        self.header = self.compressor.begin()
+
+    def compress(self, data: bytes) -> bytes:
+        header, self.header = self.header, b''
+        return header + self.compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self.compress(b'') + self.compressor.flush()
+
+
+def compressor(codec: str) -> Any:
+    """Incremental compressor with ``compress(data)`` and ``flush()``.
+
+    zstd compresses on all cores; gzip and lz4 run on one.
+    """
+    if codec == 'gzip':
+        return zlib.compressobj(6, zlib.DEFLATED, 31)
+    if codec == 'zstd':
+        return _import(codec).ZstdCompressor(level=3, threads=-1).compressobj()
+    if codec == 'lz4':
+        return _LZ4Compressor(_import(codec))
+    raise ValueError(f"Unknown compression {codec}")
+
+
+class CompressingReader:
+    """Readable file returning the compressed form of ``source``.
+
+    ``size`` counts the uncompressed bytes read so far.
+    """
+
+    def __init__(self, source: BinaryIO, codec: str) -> None:
+        self.source = source
+        self.compressor = compressor(codec)
+        self.buffer = bytearray()
+        self.size = 0
+        self.eof = False
+
+    def read(self, size: int) -> bytes:
+        while len(self.buffer) < size and not self.eof:
+            block = self.source.read(BLOCK_SIZE)
+            if block:
+                self.size += len(block)
+                self.buffer += self.compressor.compress(block)
+            else:
+                self.buffer += self.compressor.flush()
+                self.eof = True
+        data = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        return data
+
+
+class _CountingSink:
+    def __init__(self, sink: BinaryIO) -> None:
+        self.sink = sink
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self.sink.write(data)
+        self.size += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+
+class DecompressingWriter:
+    """Writable file that decompresses into ``sink``.
+
+    Output is produced in steps of at most BLOCK_SIZE, so highly compressed
+    input does not blow up memory. ``close`` must be called after the last
+    write; ``size`` then holds the decompressed size.
+    """
+
+    def __init__(self, sink: BinaryIO, codec: str) -> None:
+        self.codec = codec
+        self.output = _CountingSink(sink)
+        # Exceptions the codec raises for corrupt data, reported as ValueError
+        self.errors: tuple[type[Exception], ...]
+        if codec == 'gzip':
+            self.decompressor = zlib.decompressobj(31)
+            self.errors = (zlib.error,)
+        elif codec == 'zstd':
+            zstandard = _import(codec)
+            self.decompressor = zstandard.ZstdDecompressor().stream_writer(
+                self.output, write_size=BLOCK_SIZE, closefd=False,
+            )
+            self.errors = (zstandard.ZstdError,)
+        elif codec == 'lz4':
+            self.decompressor = _import(codec).LZ4FrameDecompressor()
+            self.errors = (RuntimeError,)
+        else:
+            raise ValueError(f"Unknown compression {codec}")
+
+    @property
+    def size(self) -> int:
+        return self.output.size
+
+    def write(self, data: bytes) -> int:
+        try:
+            self._write(data)
+        except self.errors as e:
+            raise ValueError(f"Compressed data is corrupt ({self.codec}: {e})")
+        return len(data)
+
+    def _write(self, data: bytes) -> None:
+        if self.codec == 'zstd':
+            self.decompressor.write(data)
+        elif self.codec == 'gzip':
+            pending = data
+            while pending:
+                self.output.write(self.decompressor.decompress(pending, BLOCK_SIZE))
+                pending = self.decompressor.unconsumed_tail
+        else:
+            self.output.write(self.decompressor.decompress(data, max_length=BLOCK_SIZE))
+            while not self.decompressor.needs_input and not self.decompressor.eof:
+                self.output.write(self.decompressor.decompress(b'', max_length=BLOCK_SIZE))
+
+    def close(self) -> None:
+        try:
+            if self.codec == 'zstd':
+                self.decompressor.flush()
+            elif self.codec == 'gzip':
+                self.output.write(self.decompressor.flush())
+        except self.errors as e:
+            raise ValueError(f"Compressed data is corrupt ({self.codec}: {e})")
+
+
+def compress_bytes(data: bytes, codec: str) -> bytes:
+    compressed = compressor(codec)
+    return compressed.compress(data) + compressed.flush()
+
+
+def decompress_bytes(data: bytes, codec: str) -> bytes:
+    output = io.BytesIO()
+    writer = DecompressingWriter(output, codec)
+    writer.write(data)
+    writer.close()
+    return output.getvalue()
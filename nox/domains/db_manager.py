@@ -4,16 +4,23 @@ from sqlalchemy import create_engine
 from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
 
+from nox.utils.clients import get_client
+from nox.utils.profiling import span
+
 
 class DBManager:
     def __init__(self, connection_string: str):
-        self.connection_string = connection_string
-        self.engine = create_engine(self.connection_string)
+        with span('DBManager.__init__', 'init'):
+            self.connection_string = connection_string
+            self.engine = get_client(
+                'sqlalchemy', lambda: create_engine(self.connection_string),
+                self.connection_string,
+            )
 
     def run_query(self, query: str) -> list:
         """Run a SQL query on the database."""
         try:
-            with self.engine.connect() as connection:
+            with span('DBManager.run_query', 'backend'), self.engine.connect() as connection:
                 result = connection.execute(text(query))
                 # Check if the query returns rows
                 if result.returns_rows:
@@ -3,10 +3,12 @@ from __future__ import annotations
 import docker
 from docker.errors import DockerException
 
+from nox.utils.clients import get_client
+
 
 class DockerManager:
     def __init__(self):
-        self.client = docker.from_env()
+        self.client = get_client('docker', docker.from_env)
 
     def build_image(self, path: str, tag: str) -> None:
         """Build a Docker image from a specified path."""
@@ -36,6 +38,14 @@ class DockerManager:
         for container in containers:
             print(f"ID: {container.id}, Name: {container.name}, Status: {container.status}")
 
+    def container_names(self, all_containers: bool = False) -> list[str]:
+        """Return the names of the Docker containers."""
+        try:
+            return [container.name for container in self.client.containers.list(all=all_containers)]
+        except DockerException as e:
+            print(f"Error listing containers: {e}")
+            return []
+
     def stop_container(self, name: str) -> None:
         """Stop a running Docker container."""
         try:
@@ -1,9 +1,390 @@
 from __future__ import annotations
 
 import base64
+import binascii
+import functools
+import io
+import os
+import struct
+import sys
+from typing import BinaryIO
 
-import rsa
+from cryptography.exceptions import InvalidTag
 from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import padding
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.ciphers.aead import ChaCha20Poly1305
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+from nox.domains.compress import CODEC_NAMES
+from nox.domains.compress import CODECS
+from nox.domains.compress import compress_bytes
+from nox.domains.compress import CompressingReader
+from nox.domains.compress import decompress_bytes
+from nox.domains.compress import DecompressingWriter
+
+# Segmented streaming AEAD format ("NOXS"):
+#   header  magic(4) version(1) cipher(1) compression(2) chunk_size(4) salt(16)
+#   chunks  AEAD(chunk) with nonce = counter(11, big endian) || last(1)
+# Each file gets its own key, HKDF(master key, salt), so counters never
+# repeat under one key. The header is the associated data of every chunk,
+# the counter detects reordering and the last-chunk flag truncation.
+# Compressed streams (compression != 0) are version 2, so that version 1
+# readers, which ignored the field, refuse them instead of writing out
+# compressed data; uncompressed streams are still written as version 1.
+STREAM_MAGIC = b'NOXS'
+STREAM_VERSION = 1
+STREAM_VERSIONS = (1, 2)
+STREAM_CHUNK_SIZE = 1 << 20
+STREAM_CIPHERS = {'aes-gcm': 1, 'chacha20': 2}
+_STREAM_HEADER = struct.Struct('>4sBBHI16s')
+_TAG_SIZE = 16
+_AEADS = {1: AESGCM, 2: ChaCha20Poly1305}
+
+# Hybrid RSA format ("NOXR"):
+#   header  magic(4) version(1) reserved(1) wrapped_size(2) wrapped_key
+#   body    NOXS stream under the random 32-byte data key
+# The data key is wrapped with RSA-OAEP (SHA-256). A modified wrapped key
+# either fails to unwrap or yields a key that fails the first chunk.
+HYBRID_MAGIC = b'NOXR'
+HYBRID_VERSION = 1
+_HYBRID_HEADER = struct.Struct('>4sBBH')
+_OAEP = padding.OAEP(mgf=padding.MGF1(algorithm=hashes.SHA256()), algorithm=hashes.SHA256(), label=None)
+
+# Prefix of compressed Fernet output: magic(4) and the codec id as one ASCII
+# digit, in front of the token of the compressed data. Uncompressed output is
+# a plain token, which always starts with gAAAAA and so never looks like it
+COMPRESSED_MAGIC = b'NOXZ'
+
+# Input bytes per base64 block: a multiple of 3, so blocks encode without
+# padding and concatenate to the encoding of the whole input
+BASE64_BLOCK_SIZE = 3 << 18
+_URLSAFE_ENCODE = bytes.maketrans(b'+/', b'-_')
+_URLSAFE_DECODE = bytes.maketrans(b'-_', b'+/')
+_WHITESPACE = b' \t\n\r\x0b\x0c'
+
+
+def _master_key(key: bytes) -> bytes:
+    """32-byte master key from a key file: raw, or urlsafe base64 as written by Fernet."""
+    if len(key) == 32:
+        return key
+    try:
+        decoded = base64.urlsafe_b64decode(key.strip())
+    except (binascii.Error, ValueError):
+        decoded = b''
+    if len(decoded) != 32:
+        raise ValueError('Key must be 32 raw bytes or 32 bytes in urlsafe base64 (a Fernet key)')
+    return decoded
+
+
+def _stream_aead(key: bytes, cipher_id: int, salt: bytes):
+    info = b'nox-stream-v1' + bytes([cipher_id])
+    file_key = HKDF(algorithm=hashes.SHA256(), length=32, salt=salt, info=info).derive(_master_key(key))
+    return _AEADS[cipher_id](file_key)
+
+
+def _nonce(counter: int, last: bool) -> bytes:
+    return counter.to_bytes(11, 'big') + (b'\x01' if last else b'\x00')
+
+
+def _read_full(source: BinaryIO, size: int) -> bytes:
+    """Read ``size`` bytes, or fewer only at the end of the stream (pipes return short reads)."""
+    data = source.read(size)
+    if not data or len(data) == size:
+        return data
+    parts = [data]
+    remaining = size - len(data)
+    while remaining:
+        part = source.read(remaining)
+        if not part:
+            break
+        parts.append(part)
+        remaining -= len(part)
+    return b''.join(parts)
+
+
+def encrypt_stream(
+    source: BinaryIO, sink: BinaryIO, key: bytes, cipher: str = 'aes-gcm', chunk_size: int = STREAM_CHUNK_SIZE,
+    compression: str | None = None,
+) -> int:
+    """Encrypt ``source`` into ``sink`` holding at most two chunks in memory.
+
+    With ``compression`` (a name from compress.CODECS) the data is
+    compressed block by block on its way to the cipher and the codec is
+    recorded in the header. Returns the number of plaintext bytes.
+    """
+    if not 0 < chunk_size < 1 << 32:
+        raise ValueError('Chunk size must be between 1 byte and 4 GiB')
+    cipher_id = STREAM_CIPHERS[cipher]
+    compression_id = CODECS[compression] if compression else 0
+    if compression:
+        source = CompressingReader(source, compression)
+    version = 2 if compression_id else STREAM_VERSION
+    header = _STREAM_HEADER.pack(STREAM_MAGIC, version, cipher_id, compression_id, chunk_size, os.urandom(16))
+    aead = _stream_aead(key, cipher_id, header[-16:])
+    sink.write(header)
+    total = 0
+    counter = 0
+    chunk = _read_full(source, chunk_size)
+    while True:
+        # Read ahead one chunk to know whether this one is the last
+        following = _read_full(source, chunk_size) if len(chunk) == chunk_size else b''
+        sink.write(aead.encrypt(_nonce(counter, not following), chunk, header))
+        total += len(chunk)
+        if not following:
+            return source.size if isinstance(source, CompressingReader) else total
+        chunk = following
+        counter += 1
+
+
+def decrypt_stream(source: BinaryIO, sink: BinaryIO, key: bytes) -> int:
+    """Decrypt a stream written by ``encrypt_stream``; returns the plaintext size.
+
+    Compressed streams are decompressed as they are read. Raises ValueError when the data was modified, truncated, extended or
+    reordered, or the key is wrong. Chunks before the damage have already
+    been written to ``sink`` by then, so callers should discard the output.
+    """
+    header = _read_full(source, _STREAM_HEADER.size)
+    if len(header) < _STREAM_HEADER.size:
+        raise ValueError('Input is too short to be a nox encrypted stream')
+    magic, version, cipher_id, compression_id, chunk_size, salt = _STREAM_HEADER.unpack(header)
+    if magic != STREAM_MAGIC:
+        raise ValueError('Input is not a nox encrypted stream')
+    if version not in STREAM_VERSIONS or cipher_id not in _AEADS:
+        raise ValueError(f"Unsupported stream version {version} or cipher {cipher_id}")
+    if (version == 1 and compression_id) or (version == 2 and compression_id not in CODEC_NAMES):
+        raise ValueError(f"Unsupported stream compression {compression_id}")
+    aead = _stream_aead(key, cipher_id, salt)
+    # Set up after the first chunk has authenticated the header, so a modified codec id fails authentication
+    output: BinaryIO | DecompressingWriter | None = None
+    total = 0
+    counter = 0
+    chunk = _read_full(source, chunk_size + _TAG_SIZE)
+    while True:
+        following = _read_full(source, chunk_size + _TAG_SIZE) if len(chunk) == chunk_size + _TAG_SIZE else b''
+        try:
+            plaintext = aead.decrypt(_nonce(counter, not following), chunk, header)
+        except InvalidTag:
+            raise ValueError(
+                f"Chunk {counter} failed authentication: wrong key, or the data was modified, "
+                'reordered, truncated or extended',
+            )
+        if output is None:
+            output = DecompressingWriter(sink, CODEC_NAMES[compression_id]) if compression_id else sink
+        output.write(plaintext)
+        total += len(plaintext)
+        if not following:
+            if isinstance(output, DecompressingWriter):
+                output.close()
+                return output.size
+            return total
+        chunk = following
+        counter += 1
+
+
+def _wrap(encoded: bytes, width: int, column: int) -> tuple[bytes, int]:
+    """Break ``encoded`` into lines of ``width``, the current line having ``column`` characters already."""
+    first = width - column
+    if len(encoded) < first:
+        return encoded, column + len(encoded)
+    lines = [encoded[:first]]
+    lines.extend(encoded[start:start + width] for start in range(first, len(encoded), width))
+    column = (len(encoded) - first) % width
+    wrapped = b'\n'.join(lines)
+    return (wrapped, column) if column else (wrapped + b'\n', 0)
+
+
+def base64_encode_stream(
+    source: BinaryIO, sink: BinaryIO, url_safe: bool = False, wrap: int = 0, block_size: int = BASE64_BLOCK_SIZE,
+) -> int:
+    """Base64 encode ``source`` into ``sink`` one block at a time; returns the input size.
+
+    ``url_safe`` uses ``-`` and ``_`` instead of ``+`` and ``/``. With
+    ``wrap`` the output is broken into lines of that many characters and
+    ends with a newline, like ``base64 -w``.
+    """
+    if block_size <= 0 or block_size % 3:
+        raise ValueError('Block size must be a positive multiple of 3')
+    total = 0
+    column = 0
+    while True:
+        block = _read_full(source, block_size)
+        if not block:
+            break
+        total += len(block)
+        encoded = binascii.b2a_base64(block, newline=False)
+        if url_safe:
+            encoded = encoded.translate(_URLSAFE_ENCODE)
+        if wrap:
+            encoded, column = _wrap(encoded, wrap, column)
+        sink.write(encoded)
+        if len(block) < block_size:
+            break
+    if column:
+        sink.write(b'\n')
+    return total
+
+
+def _a2b_base64(text: bytes) -> bytes:
+    if sys.version_info >= (3, 11):
+        # Checks the alphabet and padding without b64decode's slower regex
+        return binascii.a2b_base64(text, strict_mode=True)
+    return base64.b64decode(text, validate=True)
+
+
+def base64_decode_stream(source: BinaryIO, sink: BinaryIO, url_safe: bool = False, block_size: int = 1 << 20) -> int:
+    """Decode base64 from ``source`` into ``sink`` one block at a time; returns the output size.
+
+    Whitespace is skipped, so wrapped input decodes too, and missing
+    padding at the end is accepted. Other characters outside the alphabet
+    and data after the padding raise binascii.Error.
+    """
+    total = 0
+    pending = b''
+    padded = False
+    while True:
+        raw = source.read(block_size)
+        text = raw
+        if url_safe or any(char in raw for char in _WHITESPACE):
+            text = raw.translate(_URLSAFE_DECODE if url_safe else None, _WHITESPACE)
+        text = pending + text
+        if raw:
+            # Decode whole 4-character groups; the rest waits for the next block
+            cut = len(text) - len(text) % 4
+            text, pending = text[:cut], text[cut:]
+        else:
+            text += b'=' * (-len(text) % 4)
+        if padded and text:
+            raise binascii.Error('Excess data after padding')
+        data = _a2b_base64(text)
+        padded = padded or text.endswith(b'=')
+        sink.write(data)
+        total += len(data)
+        if not raw:
+            return total
+
+
+@functools.lru_cache(maxsize=8)
+def load_public_key(pem: bytes) -> rsa.RSAPublicKey:
+    """RSA public key from PEM (SubjectPublicKeyInfo or PKCS#1)."""
+    try:
+        key = serialization.load_pem_public_key(pem)
+    except ValueError:
+        raise ValueError('Key is not a PEM encoded public key')
+    if not isinstance(key, rsa.RSAPublicKey):
+        raise ValueError('Key is not an RSA public key')
+    return key
+
+
+@functools.lru_cache(maxsize=8)
+def load_private_key(pem: bytes) -> rsa.RSAPrivateKey:
+    """RSA private key from PEM (PKCS#1 or PKCS#8).
+
+    Parsing validates the key, which takes milliseconds, so parsed keys
+    are cached by their PEM for callers that decrypt many inputs.
+    """
+    try:
+        key = serialization.load_pem_private_key(pem, password=None)
+    except (TypeError, ValueError):
+        raise ValueError('Key is not an unencrypted PEM encoded private key')
+    if not isinstance(key, rsa.RSAPrivateKey):
+        raise ValueError('Key is not an RSA private key')
+    return key
+
+
+def encrypt_hybrid(
+    source: BinaryIO, sink: BinaryIO, public_pem: bytes, cipher: str = 'aes-gcm', chunk_size: int = STREAM_CHUNK_SIZE,
+    compression: str | None = None,
+) -> int:
+    """Encrypt ``source`` for the holder of an RSA private key, in bounded memory.
+
+    RSA only wraps a random data key; the payload is an ``encrypt_stream``
+    under that key, so its size is unlimited. Returns the plaintext size.
+    """
+    public_key = load_public_key(public_pem)
+    data_key = os.urandom(32)
+    wrapped = public_key.encrypt(data_key, _OAEP)
+    sink.write(_HYBRID_HEADER.pack(HYBRID_MAGIC, HYBRID_VERSION, 0, len(wrapped)) + wrapped)
+    return encrypt_stream(source, sink, data_key, cipher, chunk_size, compression)
+
+
+def decrypt_hybrid(source: BinaryIO, sink: BinaryIO, private_pem: bytes) -> int:
+    """Decrypt data written by ``encrypt_hybrid``; returns the plaintext size.
+
+    Also accepts the single PKCS#1 v1.5 block earlier versions wrote. As
+    with ``decrypt_stream``, output written before a ValueError must be
+    discarded.
+    """
+    private_key = load_private_key(private_pem)
+    header = _read_full(source, _HYBRID_HEADER.size)
+    if len(header) < _HYBRID_HEADER.size:
+        raise ValueError('Input is too short to be RSA encrypted data')
+    magic, version, _, wrapped_size = _HYBRID_HEADER.unpack(header)
+    if magic != HYBRID_MAGIC:
+        # Output of earlier versions: exactly one RSA block, holding the whole input
+        data = header + _read_full(source, private_key.key_size // 8 - len(header))
+        if len(data) != private_key.key_size // 8 or source.read(1):
+            raise ValueError('Input is not RSA encrypted data for this key')
+        try:
+            plaintext = private_key.decrypt(data, padding.PKCS1v15())
+        except ValueError:
+            raise ValueError('Decryption failed: wrong private key or modified input')
+        sink.write(plaintext)
+        return len(plaintext)
+    if version != HYBRID_VERSION:
+        raise ValueError(f"Unsupported RSA format version {version}")
+    wrapped = _read_full(source, wrapped_size)
+    if len(wrapped) < wrapped_size:
+        raise ValueError('Input is too short to be RSA encrypted data')
+    try:
+        data_key = private_key.decrypt(wrapped, _OAEP)
+    except ValueError:
+        raise ValueError('Could not unwrap the data key: wrong private key or modified header')
+    return decrypt_stream(source, sink, data_key)
+
+
+def fernet_encrypt(fernet: Fernet, data: bytes, compression: str | None = None) -> bytes:
+    """Fernet token of ``data``, compressed behind a codec prefix if ``compression`` is given.
+
+    Without compression the result is a plain Fernet token, readable by any
+    Fernet implementation.
+    """
+    if not compression:
+        return fernet.encrypt(data)
+    prefix = COMPRESSED_MAGIC + str(CODECS[compression]).encode()
+    return prefix + fernet.encrypt(compress_bytes(data, compression))
+
+
+def split_compressed(data: bytes) -> tuple[str | None, bytes]:
+    """Codec name (None for a plain token) and Fernet token of ``fernet_encrypt`` output.
+
+    Raises ValueError for an unknown codec.
+    """
+    if not data.startswith(COMPRESSED_MAGIC):
+        return None, data
+    codec_id = data[len(COMPRESSED_MAGIC):len(COMPRESSED_MAGIC) + 1]
+    if not codec_id.isdigit() or int(codec_id) not in CODEC_NAMES:
+        raise ValueError(f"Unsupported compression {codec_id.decode(errors='replace')!r}")
+    return CODEC_NAMES[int(codec_id)], data[len(COMPRESSED_MAGIC) + 1:]
+
+
+def fernet_decrypt(fernet: Fernet, data: bytes) -> bytes:
+    """Plaintext of ``fernet_encrypt`` output, decompressed if it has a codec prefix.
+
+    Raises InvalidToken for a wrong key or a modified token, and ValueError
+    for an unknown codec or data that does not decompress.
+    """
+    compression, token = split_compressed(data.strip())
+    plaintext = fernet.decrypt(token)
+    return decompress_bytes(plaintext, compression) if compression else plaintext
+
+
+def generate_key() -> bytes:
+    """New random master key, in the same format as Fernet keys."""
+    return base64.urlsafe_b64encode(os.urandom(32))
 
 
 class EncryptionManager:
@@ -19,21 +400,26 @@ class EncryptionManager:
             with open(key_file, 'rb') as file:
                 self.key = file.read()
 
-    def encrypt_fernet(self) -> bytes:
-        fernet = Fernet(self.key)
-        encrypted_data = fernet.encrypt(
-            self.input_text.encode(
-            ),
-        ) if self.input_text else fernet.encrypt(self.input_file.read())
-        return encrypted_data
+    def encrypt_fernet(self, compression: str | None = None) -> bytes:
+        data = self.input_text.encode() if self.input_text else self.input_file.read()
+        return fernet_encrypt(Fernet(self.key), data, compression)
 
     def decrypt_fernet(self) -> bytes:
-        fernet = Fernet(self.key)
-        decrypted_data = fernet.decrypt(
-            self.input_text.encode(
-            ),
-        ) if self.input_text else fernet.decrypt(self.input_file.read())
-        return decrypted_data
+        data = self.input_text.encode() if self.input_text else self.input_file.read()
+        return fernet_decrypt(Fernet(self.key), data)
+
+    def _source(self) -> BinaryIO:
+        return io.BytesIO(self.input_text.encode()) if self.input_text else self.input_file
+
+    def encrypt_stream(
+        self, cipher: str = 'aes-gcm', chunk_size: int = STREAM_CHUNK_SIZE, compression: str | None = None,
+    ) -> int:
+        """Encrypt the input into ``output_file`` in the streaming format, in bounded memory."""
+        return encrypt_stream(self._source(), self.output_file, self.key, cipher, chunk_size, compression)
+
+    def decrypt_stream(self) -> int:
+        """Decrypt streaming-format input into ``output_file``."""
+        return decrypt_stream(self.input_file, self.output_file, self.key)
 
     def encrypt_base64(self) -> bytes:
         encrypted_data = base64.b64encode(
@@ -49,24 +435,31 @@ class EncryptionManager:
         ) if self.input_text else base64.b64decode(self.input_file.read())
         return decrypted_data
 
+    def encrypt_base64_stream(self, url_safe: bool = False, wrap: int = 0) -> int:
+        """Base64 encode the input into ``output_file`` in constant memory."""
+        return base64_encode_stream(self._source(), self.output_file, url_safe, wrap)
+
+    def decrypt_base64_stream(self, url_safe: bool = False) -> int:
+        """Decode base64 input into ``output_file`` in constant memory."""
+        return base64_decode_stream(self._source(), self.output_file, url_safe)
+
     def encrypt_rsa(self) -> bytes:
-        public_key = rsa.PublicKey.load_pkcs1_openssl_pem(self.key)
-        encrypted_data = rsa.encrypt(
-            self.input_text.encode(
-            ), public_key,
-        ) if self.input_text else rsa.encrypt(
-            self.input_file.read(),
-            public_key,
-        )
-        return encrypted_data
+        """Hybrid RSA encryption of the input, returned in memory."""
+        encrypted = io.BytesIO()
+        encrypt_hybrid(self._source(), encrypted, self.key)
+        return encrypted.getvalue()
 
     def decrypt_rsa(self) -> bytes:
-        private_key = rsa.PrivateKey.load_pkcs1(self.key)
-        decrypted_data = rsa.decrypt(
-            self.input_text.encode(
-            ), private_key,
-        ) if self.input_text else rsa.decrypt(
-            self.input_file.read(),
-            private_key,
-        )
-        return decrypted_data
+        decrypted = io.BytesIO()
+        decrypt_hybrid(self._source(), decrypted, self.key)
+        return decrypted.getvalue()
+
+    def encrypt_rsa_stream(
+        self, cipher: str = 'aes-gcm', chunk_size: int = STREAM_CHUNK_SIZE, compression: str | None = None,
+    ) -> int:
+        """Hybrid RSA encryption of the input into ``output_file``, in bounded memory."""
+        return encrypt_hybrid(self._source(), self.output_file, self.key, cipher, chunk_size, compression)
+
+    def decrypt_rsa_stream(self) -> int:
+        """Decrypt hybrid RSA input into ``output_file``."""
+        return decrypt_hybrid(self.input_file, self.output_file, self.key)
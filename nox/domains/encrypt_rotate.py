@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from collections.abc import Iterable
+from collections.abc import Iterator
+
+from cryptography.fernet import Fernet
+from cryptography.fernet import InvalidToken
+from cryptography.fernet import MultiFernet
+
+from nox.domains.encrypt import split_compressed
+from nox.domains.hash_manager import HashManager
+from nox.domains.hash_manager import PARALLEL_MIN_BYTES
+from nox.utils.files import atomic_write
+from nox.utils.paths import cache_dir
+from nox.utils.pool import process_pool
+from nox.utils.pool import worker_count
+
+# Below this many files, the pool costs more than the per-file syscalls it spreads
+PARALLEL_MIN_FILES = 256
+
+# Keys of the current process, set once by _init_worker
+_new: Fernet | None = None
+_multi: MultiFernet | None = None
+
+
+def _init_worker(new_key: bytes, old_keys: tuple[bytes, ...]) -> None:
+    global _new, _multi
+    _new = Fernet(new_key)
+    _multi = MultiFernet([_new, *(Fernet(key) for key in old_keys)])
+
+
+class _Changed(Exception):
+    pass
+
+
+def _stat_key(stat: os.stat_result) -> list[int]:
+    return [stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns]
+
+
+def _rotate_file(file_path: str) -> tuple[str, str, str | None, list[int] | None]:
+    """Worker: re-encrypt one token file in place; returns (path, status, error, stat key)."""
+    assert _new is not None and _multi is not None
+    try:
+        with open(file_path, 'rb') as file:
+            before = os.fstat(file.fileno())
+            data = file.read()
+        output = data.strip()
+        try:
+            # Compressed output keeps its codec prefix in front of the token
+            token = split_compressed(output)[1]
+        except ValueError as e:
+            return file_path, 'failed', str(e), None
+        prefix = output[:len(output) - len(token)]
+        try:
+            _new.decrypt(token)
+            return file_path, 'current', None, _stat_key(before)
+        except InvalidToken:
+            pass
+        try:
+            # Keeps the token's timestamp, so TTL checks behave as before
+            rotated = _multi.rotate(token)
+        except InvalidToken:
+            return file_path, 'failed', 'not a Fernet token for any of the keys', None
+        # The old token is gone once the old key is retired, so the new one
+        # must be on disk before the checkpoint records the file as done
+        with atomic_write(file_path, durable=True) as file:
+            file.write(prefix + rotated + data[len(data.rstrip()):])
+            if _stat_key(os.stat(file_path)) != _stat_key(before):
+                raise _Changed
+        return file_path, 'rotated', None, _stat_key(os.stat(file_path))
+    except _Changed:
+        return file_path, 'failed', 'changed during rotation', None
+    except OSError as e:
+        return file_path, 'failed', e.strerror or str(e), None
+
+
+class KeyRotation:
+    """Re-encrypt Fernet token files from old keys to a new one, in place.
+
+    Files are read and replaced atomically on ``jobs`` worker processes
+    (all cores by default) that each parse the keys once. Files already
+    encrypted with the new key are left alone, so running a rotation again
+    is harmless. Finished files are also recorded in a checkpoint journal,
+    so an interrupted rotation resumes without reading them again; the
+    journal is removed once a rotation completes without errors.
+    """
+
+    def __init__(
+        self, new_key: bytes, old_keys: Iterable[bytes], jobs: int | None = None, checkpoint_path: str | None = None,
+    ) -> None:
+        self.new_key = new_key
+        self.old_keys = tuple(old_keys)
+        self.jobs = jobs
+        self.checkpoint_path = checkpoint_path
+        # Parse the keys here too, so a bad key fails before any file is touched
+        _init_worker(new_key, self.old_keys)
+
+    def default_checkpoint(self, paths: list[str]) -> str:
+        """Journal path for rotating ``paths`` to the new key."""
+        digest = hashlib.sha256(self.new_key.strip())
+        for path in paths:
+            digest.update(os.path.abspath(path).encode(errors='surrogateescape') + b'\0')
+        return os.path.join(cache_dir(), 'rotate', f"{digest.hexdigest()[:16]}.jsonl")
+
+    @staticmethod
+    def load_checkpoint(path: str) -> dict[str, list[int]]:
+        """Finished files by path; a line cut short by a crash is ignored."""
+        done: dict[str, list[int]] = {}
+        try:
+            with open(path) as file:
+                for line in file:
+                    try:
+                        file_path, stat_key = json.loads(line)
+                    except ValueError:
+                        continue
+                    done[file_path] = stat_key
+        except FileNotFoundError:
+            pass
+        return done
+
+    def run(self, paths: Iterable[str]) -> Iterator[tuple[str, str, str | None]]:
+        """Rotate the files under ``paths``, yielding ``(path, status, error)``.
+
+        ``status`` is 'resumed' for files the checkpoint lists as done
+        (yielded first), then 'rotated', 'current' or 'failed' in order.
+        """
+        paths = list(paths)
+        files = HashManager.expand_paths(paths)
+        checkpoint_path = self.checkpoint_path or self.default_checkpoint(paths)
+        done = self.load_checkpoint(checkpoint_path)
+        pending: list[str] = []
+        total = 0
+        failed = False
+        for file_path in files:
+            try:
+                stat = os.stat(file_path)
+            except OSError as e:
+                failed = True
+                yield file_path, 'failed', e.strerror or str(e)
+                continue
+            if done.get(os.path.abspath(file_path)) == _stat_key(stat):
+                yield file_path, 'resumed', None
+                continue
+            pending.append(file_path)
+            total += stat.st_size
+
+        os.makedirs(os.path.dirname(os.path.abspath(checkpoint_path)), mode=0o700, exist_ok=True)
+        with open(checkpoint_path, 'a') as journal:
+            for file_path, status, error, stat_key in self._process(pending, total):
+                if stat_key is not None:
+                    journal.write(json.dumps([os.path.abspath(file_path), stat_key]) + '\n')
+                    journal.flush()
+                failed = failed or status == 'failed'
+                yield file_path, status, error
+        if not failed:
+            os.unlink(checkpoint_path)
+
+    def _process(self, files: list[str], total: int) -> Iterator[tuple[str, str, str | None, list[int] | None]]:
+        jobs = min(worker_count(self.jobs), len(files))
+        if jobs < 2 or (total < PARALLEL_MIN_BYTES and len(files) < PARALLEL_MIN_FILES):
+            for file_path in files:
+                yield _rotate_file(file_path)
+            return
+        # Batch small files so the per-task IPC does not dominate
+        chunksize = max(1, min(64, len(files) // (jobs * 8)))
+        executor = process_pool(jobs, _init_worker, (self.new_key, self.old_keys))
+        try:
+            yield from executor.map(_rotate_file, files, chunksize=chunksize)
+        finally:
+            # Drop queued work when the caller stops early
+            executor.shutdown(cancel_futures=True)
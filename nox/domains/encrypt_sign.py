@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import re
+from collections.abc import Iterable
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed448
+from cryptography.hazmat.primitives.asymmetric import ed25519
+
+from nox.domains.hash_manifest import HashManifest
+from nox.domains.hash_manifest import ManifestReport
+
+# Private key classes by the scheme name recorded in signatures
+SCHEMES = {'ed25519': ed25519.Ed25519PrivateKey, 'ed448': ed448.Ed448PrivateKey}
+_PUBLIC_KEYS = {'ed25519': ed25519.Ed25519PublicKey, 'ed448': ed448.Ed448PublicKey}
+# First line of a signed manifest; the signature covers every byte after it
+_SIGNATURE_LINE = re.compile(rb'# nox-signature (?P<scheme>[a-z0-9]+) (?P<signature>[A-Za-z0-9+/=]+)\r?\n')
+
+
+def generate_signing_key(scheme: str = 'ed25519') -> tuple[bytes, bytes]:
+    """New key pair as (PKCS#8 private PEM, SubjectPublicKeyInfo public PEM)."""
+    key = SCHEMES[scheme].generate()
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption(),
+    )
+    public_pem = key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+    return private_pem, public_pem
+
+
+def _scheme(key: object, classes: dict[str, type]) -> str | None:
+    return next((scheme for scheme, cls in classes.items() if isinstance(key, cls)), None)
+
+
+def load_signing_key(pem: bytes) -> tuple[str, ed25519.Ed25519PrivateKey | ed448.Ed448PrivateKey]:
+    """Scheme name and private key from an unencrypted PEM."""
+    try:
+        key = serialization.load_pem_private_key(pem, password=None)
+    except (TypeError, ValueError):
+        raise ValueError('Key is not an unencrypted PEM encoded private key')
+    scheme = _scheme(key, SCHEMES)
+    if scheme is None:
+        raise ValueError('Key is not an Ed25519 or Ed448 private key')
+    return scheme, key  # type: ignore[return-value]
+
+
+def load_verify_key(pem: bytes) -> tuple[str, ed25519.Ed25519PublicKey | ed448.Ed448PublicKey]:
+    """Scheme name and public key from a PEM."""
+    try:
+        key = serialization.load_pem_public_key(pem)
+    except ValueError:
+        raise ValueError('Key is not a PEM encoded public key')
+    scheme = _scheme(key, _PUBLIC_KEYS)
+    if scheme is None:
+        raise ValueError('Key is not an Ed25519 or Ed448 public key')
+    return scheme, key  # type: ignore[return-value]
+
+
+class SignedManifest:
+    """Detached signature over the checksum manifest of a directory tree.
+
+    The tree is hashed on ``jobs`` worker processes and only the manifest
+    is signed, so signing or verifying thousands of files costs a single
+    signature operation plus the hashing. The output is a regular tagged
+    manifest (see ``HashManifest``) preceded by a ``# nox-signature`` line,
+    which ``nox hash manifest verify`` and ``sha256sum -c`` skip as a
+    comment. Every file is read again rather than trusting the digest
+    cache, since its stat key proves nothing about the content.
+    """
+
+    def __init__(self, root: str, algorithm: str = 'sha256', jobs: int | None = None) -> None:
+        self.root = root
+        self.algorithm = algorithm
+        self.jobs = jobs
+
+    def manifest(self, algorithm: str | None = None) -> HashManifest:
+        return HashManifest(self.root, algorithm or self.algorithm, self.jobs, paranoid=True)
+
+    def sign(self, private_pem: bytes, exclude: Iterable[str] = ()) -> tuple[bytes, dict[str, str]]:
+        """Signed manifest of the tree, and errors for unreadable files.
+
+        Nothing should be published if any file could not be read.
+        """
+        scheme, key = load_signing_key(private_pem)
+        manifest = self.manifest()
+        digests, errors = manifest.create(exclude)
+        body = ''.join(f"{line}\n" for line in manifest.format(digests)).encode(errors='surrogateescape')
+        signature = base64.b64encode(key.sign(body)).decode()
+        return f"# nox-signature {scheme} {signature}\n".encode() + body, errors
+
+    @staticmethod
+    def open(document: bytes, public_pem: bytes) -> tuple[str | None, dict[str, str]]:
+        """Check the signature of a signed manifest and parse the manifest.
+
+        Returns the digest algorithm and the digests by relative path;
+        raises ValueError if the signature is missing or does not match.
+        """
+        scheme, key = load_verify_key(public_pem)
+        match = _SIGNATURE_LINE.match(document)
+        if match is None:
+            raise ValueError('Not a signed manifest')
+        if match.group('scheme').decode() != scheme:
+            raise ValueError(f"Signed with {match.group('scheme').decode()}, but the key is {scheme}")
+        body = document[match.end():]
+        try:
+            key.verify(base64.b64decode(match.group('signature'), validate=True), body)
+        except (InvalidSignature, binascii.Error):
+            raise ValueError('Signature does not match (wrong key, or the manifest was modified)')
+        return HashManifest.parse(body.decode(errors='surrogateescape').splitlines())
+
+    def verify(self, document: bytes, public_pem: bytes, exclude: Iterable[str] = ()) -> ManifestReport:
+        """Check the signature, then compare the tree against the signed digests."""
+        algorithm, expected = self.open(document, public_pem)
+        return self.manifest(algorithm).verify(expected, exclude)
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import os
+from collections.abc import Callable
+from collections.abc import Iterator
+from typing import BinaryIO
+
+from cryptography.fernet import Fernet
+from cryptography.fernet import InvalidToken
+
+from nox.domains.encrypt import _master_key
+from nox.domains.encrypt import base64_decode_stream
+from nox.domains.encrypt import base64_encode_stream
+from nox.domains.encrypt import decrypt_hybrid
+from nox.domains.encrypt import decrypt_stream
+from nox.domains.encrypt import encrypt_hybrid
+from nox.domains.encrypt import encrypt_stream
+from nox.domains.encrypt import fernet_decrypt
+from nox.domains.encrypt import fernet_encrypt
+from nox.domains.encrypt import load_private_key
+from nox.domains.encrypt import load_public_key
+from nox.domains.encrypt import STREAM_CHUNK_SIZE
+from nox.domains.hash_manager import PARALLEL_MIN_BYTES
+from nox.utils.files import atomic_write
+from nox.utils.pool import process_pool
+from nox.utils.pool import worker_count
+
+# Suffix added to encrypted files, and stripped again on decryption
+SUFFIXES = {'stream': '.noxs', 'rsa': '.noxr', 'fernet': '.fernet', 'base64': '.b64'}
+
+# Codec of the current process, set once by _init_worker
+_codec: Callable[[BinaryIO, BinaryIO], object] | None = None
+
+
+def _make_codec(
+    method: str, decrypt: bool, key: bytes | None, cipher: str, chunk_size: int, compression: str | None = None,
+) -> Callable[[BinaryIO, BinaryIO], object]:
+    """Function copying a source file to a sink through ``method``, with the key already parsed."""
+    if method == 'stream':
+        assert key is not None
+        _master_key(key)
+        if decrypt:
+            return lambda source, sink: decrypt_stream(source, sink, key)
+        return lambda source, sink: encrypt_stream(source, sink, key, cipher, chunk_size, compression)
+    if method == 'rsa':
+        assert key is not None
+        if decrypt:
+            load_private_key(key)
+            return lambda source, sink: decrypt_hybrid(source, sink, key)
+        load_public_key(key)
+        return lambda source, sink: encrypt_hybrid(source, sink, key, cipher, chunk_size, compression)
+    if method == 'fernet':
+        # Fernet tokens cannot be streamed, so each file is held in memory
+        fernet = Fernet(key)
+        if decrypt:
+            return lambda source, sink: sink.write(fernet_decrypt(fernet, source.read()))
+        return lambda source, sink: sink.write(fernet_encrypt(fernet, source.read(), compression))
+    if compression:
+        raise ValueError(f"The {method} method does not support compression")
+    if method == 'base64':
+        if decrypt:
+            return lambda source, sink: base64_decode_stream(source, sink)
+        return lambda source, sink: base64_encode_stream(source, sink)
+    raise ValueError(f"Unknown method {method}")
+
+
+def _init_worker(
+    method: str, decrypt: bool, key: bytes | None, cipher: str, chunk_size: int, compression: str | None,
+) -> None:
+    global _codec
+    _codec = _make_codec(method, decrypt, key, cipher, chunk_size, compression)
+
+
+def _process_file(task: tuple[str, str]) -> tuple[str, str | None]:
+    """Worker: write the transformed ``source`` to ``target``; returns (source, error)."""
+    source_path, target_path = task
+    assert _codec is not None
+    try:
+        stat = os.stat(source_path)
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        with open(source_path, 'rb') as source, atomic_write(target_path, stat.st_mode & 0o777) as sink:
+            _codec(source, sink)
+        # The copied mtime marks the output as up to date with this version of the input
+        os.utime(target_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    except OSError as e:
+        return source_path, e.strerror or str(e)
+    except InvalidToken:
+        return source_path, 'wrong key, or the data was modified'
+    except ValueError as e:
+        return source_path, str(e)
+    return source_path, None
+
+
+class DirectoryCipher:
+    """Encrypt or decrypt every file under a directory into a mirror tree.
+
+    Files are processed on ``jobs`` worker processes (all cores by default)
+    that each parse the key once. Every output is written atomically and
+    given the mtime of its input, so a later run skips files whose output
+    already matches, and an interrupted run resumes where it stopped.
+    """
+
+    def __init__(
+        self, method: str, key: bytes | None = None, decrypt: bool = False, cipher: str = 'aes-gcm',
+        chunk_size: int = STREAM_CHUNK_SIZE, suffix: str | None = None, jobs: int | None = None, force: bool = False,
+        compression: str | None = None,
+    ) -> None:
+        self.method = method
+        self.key = key
+        self.decrypt = decrypt
+        self.cipher = cipher
+        self.chunk_size = chunk_size
+        self.suffix = SUFFIXES[method] if suffix is None else suffix
+        self.jobs = jobs
+        self.force = force
+        self.compression = compression
+        # Parse the key here too, so a bad key fails before any file is touched
+        _make_codec(method, decrypt, key, cipher, chunk_size, compression)
+
+    def target(self, relative_path: str) -> str:
+        """Output path, relative to the output root, for an input path."""
+        if not self.decrypt:
+            return relative_path + self.suffix
+        if self.suffix and relative_path.endswith(self.suffix):
+            return relative_path[:-len(self.suffix)]
+        return relative_path
+
+    def files(self, source_root: str, output_root: str) -> Iterator[str]:
+        """Sorted paths of the files under ``source_root``, skipping ``output_root`` if it is inside.
+
+        With a suffix, encryption skips files that carry it and decryption
+        skips files that do not, so outputs written into the source tree
+        are not processed again.
+        """
+        output_real = os.path.realpath(output_root)
+        for path, dirs, files in os.walk(source_root):
+            dirs[:] = sorted(name for name in dirs if os.path.realpath(os.path.join(path, name)) != output_real)
+            for name in sorted(files):
+                if not self.suffix or name.endswith(self.suffix) == self.decrypt:
+                    yield os.path.join(path, name)
+
+    @staticmethod
+    def up_to_date(stat: os.stat_result, target_path: str) -> bool:
+        try:
+            return os.stat(target_path).st_mtime_ns == stat.st_mtime_ns
+        except OSError:
+            return False
+
+    def run(self, source_root: str, output_root: str) -> Iterator[tuple[str, str, str | None]]:
+        """Process the tree, yielding ``(input path, status, error)``.
+
+        ``status`` is 'skipped' for outputs that are already up to date
+        (yielded while scanning), then 'written' or 'failed' in input order.
+        """
+        if os.path.realpath(source_root) == os.path.realpath(output_root) and not self.suffix:
+            raise ValueError('Writing into the input directory needs a suffix')
+        tasks: list[tuple[str, str]] = []
+        total = 0
+        for source_path in self.files(source_root, output_root):
+            target_path = os.path.join(output_root, self.target(os.path.relpath(source_path, source_root)))
+            try:
+                stat = os.stat(source_path)
+            except OSError as e:
+                yield source_path, 'failed', e.strerror or str(e)
+                continue
+            if not self.force and self.up_to_date(stat, target_path):
+                yield source_path, 'skipped', None
+                continue
+            tasks.append((source_path, target_path))
+            total += stat.st_size
+        for source_path, error in self._process(tasks, total):
+            yield source_path, 'failed' if error else 'written', error
+
+    def _process(self, tasks: list[tuple[str, str]], total: int) -> Iterator[tuple[str, str | None]]:
+        initargs = (self.method, self.decrypt, self.key, self.cipher, self.chunk_size, self.compression)
+        jobs = min(worker_count(self.jobs), len(tasks))
+        if jobs < 2 or total < PARALLEL_MIN_BYTES:
+            _init_worker(*initargs)
+            for task in tasks:
+                yield _process_file(task)
+            return
+        # Batch small files so the per-task IPC does not dominate
+        chunksize = max(1, min(64, len(tasks) // (jobs * 8)))
+        executor = process_pool(jobs, _init_worker, initargs)
+        try:
+            yield from executor.map(_process_file, tasks, chunksize=chunksize)
+        finally:
+            # Drop queued work when the caller stops early
+            executor.shutdown(cancel_futures=True)
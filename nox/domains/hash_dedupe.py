@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import os
+import stat as stat_module
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from nox.domains.hash_manager import HashManager
+from nox.domains.hash_manager import new_hash
+
+# Bytes read from each end of a file for the partial hash
+EDGE_SIZE = 4 << 10
+
+
+def _partial_digest(file_path: str, size: int, algorithm: str) -> tuple[str, bool]:
+    """Digest of the first and last EDGE_SIZE bytes, and whether that was the whole file."""
+    hash_func = new_hash(algorithm)
+    fd = os.open(file_path, os.O_RDONLY)
+    try:
+        if size <= 2 * EDGE_SIZE:
+            hash_func.update(os.pread(fd, size, 0))
+            return hash_func.hexdigest(), True
+        hash_func.update(os.pread(fd, EDGE_SIZE, 0))
+        hash_func.update(os.pread(fd, EDGE_SIZE, size - EDGE_SIZE))
+        return hash_func.hexdigest(), False
+    finally:
+        os.close(fd)
+
+
+class DuplicateFinder:
+    """Find files with identical content.
+
+    Candidates are narrowed in three steps, each much cheaper than the next
+    one: files are grouped by size, then by a hash of their first and last
+    few KiB (read on a thread pool, as it is mostly seeks), and only files
+    that still collide are hashed in full on HashManager's process pool.
+    Files that are already hard links of each other count once.
+    """
+
+    def __init__(self, algorithm: str = 'sha256', jobs: int | None = None, min_size: int = 1) -> None:
+        self.algorithm = algorithm
+        self.jobs = jobs
+        self.min_size = min_size
+        self.manager = HashManager()
+        self.stats: dict[str, os.stat_result] = {}
+        self.errors: dict[str, str] = {}
+        self.scanned = 0
+
+    def by_size(self, paths: Iterable[str]) -> dict[int, list[str]]:
+        """Regular files under ``paths`` grouped by size, for sizes shared by several inodes."""
+        sizes: dict[int, list[str]] = {}
+        inodes: set[tuple[int, int]] = set()
+        for file_path in self.manager.expand_paths(paths):
+            try:
+                stat = os.lstat(file_path)
+            except OSError as e:
+                self.errors[file_path] = e.strerror or str(e)
+                continue
+            if not stat_module.S_ISREG(stat.st_mode) or stat.st_size < self.min_size:
+                continue
+            if (stat.st_dev, stat.st_ino) in inodes:
+                continue
+            inodes.add((stat.st_dev, stat.st_ino))
+            self.scanned += 1
+            self.stats[file_path] = stat
+            sizes.setdefault(stat.st_size, []).append(file_path)
+        return {size: files for size, files in sizes.items() if len(files) > 1}
+
+    def _partial_groups(self, sizes: dict[int, list[str]]) -> tuple[list[list[str]], list[tuple[str, list[str]]]]:
+        """Split size groups by partial digest.
+
+        Returns groups that still need a full hash, and groups of small files
+        whose partial digest already covered everything.
+        """
+        candidates = [(file_path, size) for size, files in sizes.items() for file_path in files]
+
+        def partial(candidate: tuple[str, int]) -> tuple[str, bool] | None:
+            try:
+                return _partial_digest(candidate[0], candidate[1], self.algorithm)
+            except OSError as e:
+                self.errors[candidate[0]] = e.strerror or str(e)
+                return None
+
+        groups: dict[tuple[int, str], list[str]] = {}
+        complete: set[tuple[int, str]] = set()
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            for (file_path, size), result in zip(candidates, executor.map(partial, candidates)):
+                if result is None:
+                    continue
+                digest, is_complete = result
+                groups.setdefault((size, digest), []).append(file_path)
+                if is_complete:
+                    complete.add((size, digest))
+        pending = [files for key, files in groups.items() if len(files) > 1 and key not in complete]
+        final = [(key[1], files) for key, files in groups.items() if len(files) > 1 and key in complete]
+        return pending, final
+
+    def find(self, paths: Iterable[str]) -> list[dict[str, Any]]:
+        """Groups of identical files, largest waste first.
+
+        Each group has the ``size`` and full ``digest`` shared by its sorted
+        ``paths``; ``wasted`` is the space all but one copy take up.
+        """
+        new_hash(self.algorithm)
+        pending, final = self._partial_groups(self.by_size(paths))
+        groups = list(final)
+        files = [file_path for group in pending for file_path in group]
+        full: dict[tuple[int, str], list[str]] = {}
+        for file_path, digest, error in self.manager.hash_files(files, self.algorithm, self.jobs, expand=False):
+            if error:
+                self.errors[file_path] = error
+            else:
+                full.setdefault((self.stats[file_path].st_size, digest), []).append(file_path)
+        groups.extend((digest, group) for (_, digest), group in full.items() if len(group) > 1)
+
+        result = []
+        for digest, group in groups:
+            size = self.stats[group[0]].st_size
+            result.append({'size': size, 'digest': digest, 'wasted': size * (len(group) - 1), 'paths': sorted(group)})
+        result.sort(key=lambda group: (-group['wasted'], group['paths'][0]))
+        return result
+
+    def _unchanged(self, file_path: str) -> bool:
+        before = self.stats.get(file_path)
+        try:
+            now = os.lstat(file_path)
+        except OSError:
+            return False
+        return before is not None and (now.st_dev, now.st_ino, now.st_size, now.st_mtime_ns) == \
+            (before.st_dev, before.st_ino, before.st_size, before.st_mtime_ns)
+
+    def hardlink(self, group: dict[str, Any]) -> tuple[list[str], dict[str, str]]:
+        """Replace every copy in ``group`` with a hard link to its first path.
+
+        Each replacement is atomic. A file that changed since it was hashed
+        or lives on another filesystem is left alone and reported.
+        """
+        original, *copies = group['paths']
+        linked: list[str] = []
+        errors: dict[str, str] = {}
+        if not self._unchanged(original):
+            return linked, {original: 'changed since it was hashed'}
+        for file_path in copies:
+            try:
+                if not self._unchanged(file_path):
+                    errors[file_path] = 'changed since it was hashed'
+                    continue
+                tmp_path = os.path.join(os.path.dirname(file_path), f".{os.path.basename(file_path)}.{os.getpid()}.nox-link")
+                os.link(original, tmp_path)
+                try:
+                    os.replace(tmp_path, file_path)
+                except OSError:
+                    os.unlink(tmp_path)
+                    raise
+            except OSError as e:
+                errors[file_path] = e.strerror or str(e)
+                continue
+            linked.append(file_path)
+        return linked, errors
@@ -1,17 +1,128 @@
 from __future__ import annotations
 
+import glob
 import hashlib
+import mmap
+import os
+import threading
+from collections.abc import Iterable
+from collections.abc import Iterator
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from nox.utils.pool import process_pool
+from nox.utils.pool import worker_count
+
+# Read size for regular files; the buffer is allocated once per thread
+BUFFER_SIZE = 1 << 20
+# Files at least this large are hashed from a memory map instead
+MMAP_THRESHOLD = 64 << 20
+# Below this many bytes in total, starting worker processes costs more than it saves
+PARALLEL_MIN_BYTES = 32 << 20
+
+# Leaf size of tree hashes
+TREE_CHUNK_SIZE = 8 << 20
+# boto3's default multipart threshold and part size, which S3Manager.upload_file uses
+S3_MULTIPART_THRESHOLD = 8 << 20
+S3_PART_SIZE = 8 << 20
+# S3 limits on multipart uploads
+_S3_MIN_PART_SIZE = 5 << 20
+_S3_MAX_PART_SIZE = 5 << 30
+_S3_MAX_PARTS = 10000
+
+# Algorithms offered by the CLI; blake3 needs the optional blake3 package
+ALGORITHMS = ('md5', 'sha256', 'sha512', 'blake2b', 'blake2s', 'sha3_256', 'sha3_512', 'blake3')
+# Names used by the coreutils tagged format (``sha256sum --tag``, ``b2sum --tag``)
+_TAGS = {'blake2b': 'BLAKE2b', 'blake2s': 'BLAKE2s', 'sha3_256': 'SHA3-256', 'sha3_512': 'SHA3-512'}
+
+_local = threading.local()
+
+
+def new_hash(algorithm: str):
+    """hashlib-style hash object for ``algorithm``."""
+    if algorithm == 'blake3':
+        try:
+            import blake3
+        except ImportError:
+            raise ValueError('blake3 is not installed (pip install nox-cli[blake3])')
+        # Large updates are hashed on several threads
+        return blake3.blake3(max_threads=blake3.blake3.AUTO)
+    return hashlib.new(algorithm)
+
+
+def _digest_file(file_path: str, algorithms: tuple[str, ...]) -> tuple[str, ...]:
+    """Digests of one file for every algorithm, reading it only once."""
+    hash_funcs = [new_hash(algorithm) for algorithm in algorithms]
+    with open(file_path, 'rb', buffering=0) as f:
+        size = os.fstat(f.fileno()).st_size
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if hasattr(mapped, 'madvise'):
+                    mapped.madvise(mmap.MADV_SEQUENTIAL)
+                with memoryview(mapped) as view:
+                    # Slices keep Ctrl-C responsive and stay in cache across the algorithms
+                    for offset in range(0, size, BUFFER_SIZE * 16):
+                        with view[offset:offset + BUFFER_SIZE * 16] as chunk:
+                            for hash_func in hash_funcs:
+                                hash_func.update(chunk)
+            return tuple(hash_func.hexdigest() for hash_func in hash_funcs)
+        buffer = getattr(_local, 'buffer', None)
+        if buffer is None:
+            buffer = _local.buffer = memoryview(bytearray(BUFFER_SIZE))
+        while True:
+            read = f.readinto(buffer)
+            if not read:
+                break
+            chunk = buffer[:read]
+            for hash_func in hash_funcs:
+                hash_func.update(chunk)
+    return tuple(hash_func.hexdigest() for hash_func in hash_funcs)
+
+
+def _digest_bytes(algorithm: str, data: bytes) -> bytes:
+    hash_func = new_hash(algorithm)
+    hash_func.update(data)
+    return hash_func.digest()
+
+
+def _chunk_digest(fd: int, offset: int, length: int, algorithm: str, prefix: bytes = b'') -> bytes:
+    """Digest of ``length`` bytes at ``offset``, read with pread so threads can share ``fd``."""
+    hash_func = new_hash(algorithm)
+    hash_func.update(prefix)
+    buffer = getattr(_local, 'buffer', None)
+    if buffer is None:
+        buffer = _local.buffer = memoryview(bytearray(BUFFER_SIZE))
+    end = offset + length
+    while offset < end:
+        want = min(BUFFER_SIZE, end - offset)
+        if hasattr(os, 'preadv'):
+            read = os.preadv(fd, [buffer[:want]], offset)
+            data = buffer[:read]
+        else:
+            data = os.pread(fd, want, offset)
+            read = len(data)
+        if not read:
+            raise OSError(f"File shrank while it was hashed (at byte {offset})")
+        hash_func.update(data)
+        offset += read
+    return hash_func.digest()
+
+
+def _hash_entry(entry: tuple[str, tuple[str, ...]]) -> tuple[str, tuple[str, ...] | None, str | None]:
+    """Pool worker: (path, digests, error) for one file."""
+    file_path, algorithms = entry
+    try:
+        return file_path, _digest_file(file_path, algorithms), None
+    except OSError as e:
+        return file_path, None, e.strerror or str(e)
 
 
 class HashManager:
     def generate_hash(self, file_path: str, algorithm: str = 'md5') -> str:
         """Generate a hash for the given file using the specified algorithm."""
-        hash_func = getattr(hashlib, algorithm)()
         try:
-            with open(file_path, 'rb') as f:
-                for chunk in iter(lambda: f.read(4096), b''):
-                    hash_func.update(chunk)
-            return hash_func.hexdigest()
+            return _digest_file(file_path, (algorithm,))[0]
         except FileNotFoundError:
             print(f"Error: File {file_path} not found.")
             return ''
@@ -26,3 +137,171 @@ class HashManager:
         """Verify the hash of the given file against the expected hash."""
         actual_hash = self.generate_hash(file_path, algorithm)
         return actual_hash == expected_hash
+
+    def generate_hashes(self, file_path: str, algorithms: Sequence[str]) -> dict[str, str]:
+        """Digests of one file for several algorithms, from a single read of it."""
+        return dict(zip(algorithms, _digest_file(file_path, tuple(algorithms))))
+
+    @staticmethod
+    def expand_paths(paths: Iterable[str]) -> list[str]:
+        """Files named by ``paths``, in a deterministic order.
+
+        Directories are walked recursively with entries sorted by name, and
+        glob patterns (``**`` included) are expanded in sorted order unless a
+        file by that exact name exists. Other paths are kept as given, so
+        missing files are reported when hashed.
+        """
+        files: list[str] = []
+        for path in paths:
+            if glob.has_magic(path) and not os.path.lexists(path):
+                matches = sorted(glob.glob(path, recursive=True))
+            else:
+                matches = [path]
+            for match in matches:
+                if not os.path.isdir(match):
+                    files.append(match)
+                    continue
+                for root, dirs, names in os.walk(match):
+                    dirs.sort()
+                    files.extend(os.path.join(root, name) for name in sorted(names))
+        return files
+
+    def hash_files(
+        self, paths: Iterable[str], algorithm: str | Sequence[str] = 'md5', jobs: int | None = None, expand: bool = True,
+    ) -> Iterator[tuple[str, Any, str | None]]:
+        """Hash many files, yielding ``(path, digest, error)`` in input order.
+
+        Large workloads are spread over ``jobs`` worker processes (all cores
+        by default); results are still yielded as soon as they are ready.
+        With ``expand=False`` the paths are taken as a plain list of files.
+        Given a sequence of algorithms, ``digest`` is a tuple in the same
+        order, computed in one pass over each file.
+        """
+        algorithms = (algorithm,) if isinstance(algorithm, str) else tuple(algorithm)
+        for name in algorithms:
+            new_hash(name)  # Fail early on an unknown or unavailable algorithm
+        files = self.expand_paths(paths) if expand else list(paths)
+        for file_path, digests, error in self._hash_entries(files, algorithms, jobs):
+            yield file_path, digests[0] if digests and isinstance(algorithm, str) else digests, error
+
+    def _hash_entries(
+        self, files: list[str], algorithms: tuple[str, ...], jobs: int | None,
+    ) -> Iterator[tuple[str, tuple[str, ...] | None, str | None]]:
+        jobs = min(worker_count(jobs), len(files))
+        if jobs < 2 or self._total_size(files) < PARALLEL_MIN_BYTES:
+            for file_path in files:
+                yield _hash_entry((file_path, algorithms))
+            return
+        # Batch small files so the per-task IPC does not dominate
+        chunksize = max(1, min(64, len(files) // (jobs * 8)))
+        executor = process_pool(jobs)
+        try:
+            yield from executor.map(_hash_entry, ((file_path, algorithms) for file_path in files), chunksize=chunksize)
+        finally:
+            # Drop queued work when the caller stops early (e.g. a closed pipe)
+            executor.shutdown(cancel_futures=True)
+
+    def chunk_digests(
+        self, file_path: str, algorithm: str, chunk_size: int, jobs: int | None = None, prefix: bytes = b'',
+    ) -> list[bytes]:
+        """Raw digests of consecutive ``chunk_size`` slices of one file.
+
+        The slices are read with ``os.pread`` and hashed on ``jobs`` threads
+        (all cores by default); hashlib and blake3 release the GIL while
+        hashing, so one large file keeps every core busy.
+        """
+        new_hash(algorithm)
+        fd = os.open(file_path, os.O_RDONLY)
+        try:
+            size = os.fstat(fd).st_size
+            offsets = range(0, size, chunk_size)
+            jobs = min(worker_count(jobs), len(offsets))
+            if jobs < 2:
+                return [_chunk_digest(fd, offset, min(chunk_size, size - offset), algorithm, prefix) for offset in offsets]
+            with ThreadPoolExecutor(max_workers=jobs) as executor:
+                return list(executor.map(
+                    lambda offset: _chunk_digest(fd, offset, min(chunk_size, size - offset), algorithm, prefix), offsets,
+                ))
+        finally:
+            os.close(fd)
+
+    def tree_hash(
+        self, file_path: str, algorithm: str = 'sha256', chunk_size: int = TREE_CHUNK_SIZE, jobs: int | None = None,
+    ) -> str:
+        """Merkle root over ``chunk_size`` leaves of a file, hashed in parallel.
+
+        Leaves are H(0x00 || chunk) and nodes H(0x01 || left || right), with
+        an unpaired node carried up a level, which gives the same tree as
+        RFC 6962. An empty file has a single empty leaf. The root depends on
+        ``chunk_size``, so it must match when comparing digests.
+        """
+        level = self.chunk_digests(file_path, algorithm, chunk_size, jobs, prefix=b'\x00')
+        if not level:
+            level = [_digest_bytes(algorithm, b'\x00')]
+        while len(level) > 1:
+            paired = [_digest_bytes(algorithm, b'\x01' + level[i] + level[i + 1]) for i in range(0, len(level) - 1, 2)]
+            if len(level) % 2:
+                paired.append(level[-1])
+            level = paired
+        return level[0].hex()
+
+    @staticmethod
+    def s3_part_size(size: int, part_size: int = S3_PART_SIZE) -> int:
+        """Part size boto3 really uses for a ``size`` byte upload.
+
+        Like s3transfer, the requested size is clamped to S3's 5 MiB to 5 GiB
+        range and doubled until the upload fits in 10,000 parts.
+        """
+        part_size = min(max(part_size, _S3_MIN_PART_SIZE), _S3_MAX_PART_SIZE)
+        while -(-size // part_size) > _S3_MAX_PARTS:
+            part_size *= 2
+        return part_size
+
+    def s3_etag(
+        self, file_path: str, part_size: int = S3_PART_SIZE,
+        multipart_threshold: int = S3_MULTIPART_THRESHOLD, jobs: int | None = None,
+    ) -> str:
+        """ETag S3 assigns to the file when uploaded with these settings.
+
+        Smaller files are sent in one request and get their MD5. Multipart
+        uploads get the MD5 of the concatenated part MD5s plus ``-<parts>``.
+        This does not hold for objects encrypted with SSE-KMS or SSE-C.
+        """
+        size = os.stat(file_path).st_size
+        if size < multipart_threshold:
+            return _digest_file(file_path, ('md5',))[0]
+        parts = self.chunk_digests(file_path, 'md5', self.s3_part_size(size, part_size), jobs)
+        return f"{_digest_bytes('md5', b''.join(parts)).hex()}-{len(parts)}"
+
+    @staticmethod
+    def _total_size(files: list[str]) -> int:
+        total = 0
+        for file_path in files:
+            try:
+                total += os.stat(file_path).st_size
+            except OSError:
+                pass
+            if total >= PARALLEL_MIN_BYTES:
+                break
+        return total
+
+    @staticmethod
+    def checksum_line(digest: str, file_path: str) -> str:
+        """One line in the format of ``sha256sum`` and friends.
+
+        Like coreutils, names containing a backslash or newline are escaped
+        and the line is prefixed with a backslash.
+        """
+        if '\\' in file_path or '\n' in file_path:
+            escaped = file_path.replace('\\', '\\\\').replace('\n', '\\n')
+            return f"\\{digest}  {escaped}"
+        return f"{digest}  {file_path}"
+
+    @staticmethod
+    def tagged_line(algorithm: str, digest: str, file_path: str) -> str:
+        """One line in the self-describing format of ``sha256sum --tag``."""
+        tag = _TAGS.get(algorithm, algorithm.upper())
+        if '\\' in file_path or '\n' in file_path:
+            escaped = file_path.replace('\\', '\\\\').replace('\n', '\\n')
+            return f"\\{tag} ({escaped}) = {digest}"
+        return f"{tag} ({file_path}) = {digest}"
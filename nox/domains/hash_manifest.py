@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import marshal
+import os
+import re
+import time
+import zlib
+from collections.abc import Iterable
+from collections.abc import Iterator
+from dataclasses import dataclass
+from dataclasses import field
+
+from nox.domains.hash_manager import HashManager
+from nox.utils.paths import cache_dir
+
+# Bump when the layout of the digest cache changes
+_CACHE_VERSION = 1
+# Files modified this close to the scan may change again within the same mtime tick
+_RACY_NS = 2_000_000_000
+
+_TAGGED_LINE = re.compile(r'(?P<tag>[A-Za-z0-9_-]+) \((?P<path>.*)\) = (?P<digest>[0-9a-fA-F]+)')
+_PLAIN_LINE = re.compile(r'(?P<digest>[0-9a-fA-F]+) [ *](?P<path>.*)')
+# Plain sha256sum-style lines do not name the algorithm; guess it from the digest length
+_DIGEST_LENGTHS = {32: 'md5', 64: 'sha256', 128: 'sha512'}
+
+
+def _unescape(path: str) -> str:
+    return re.sub(r'\\(.)', lambda match: '\n' if match.group(1) == 'n' else match.group(1), path)
+
+
+class DigestCache:
+    """Digests of the files under one root, keyed by (device, inode, size, mtime_ns).
+
+    A file whose key is unchanged since it was last hashed is assumed to be
+    unchanged. Each save keeps only the files seen by the current scan, so
+    the cache does not grow past the size of the tree; a scan of only part
+    of the tree saves with ``prune=False`` to keep the other entries.
+    """
+
+    def __init__(self, root: str, algorithm: str, path: str | None = None) -> None:
+        self.algorithm = algorithm
+        if path is None:
+            digest = zlib.crc32(f"{os.path.abspath(root)}\0{algorithm}".encode())
+            path = os.path.join(cache_dir(), 'hashes', f"{digest:08x}.marshal")
+        self.path = path
+        self.entries: dict[tuple[int, int, int, int], str] = {}
+        self.seen: dict[tuple[int, int, int, int], str] = {}
+        self.started = time.time_ns()
+        try:
+            with open(path, 'rb') as file:
+                version, algorithm, entries = marshal.load(file)
+            if version == _CACHE_VERSION and algorithm == self.algorithm:
+                self.entries = entries
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+
+    @staticmethod
+    def key(stat: os.stat_result) -> tuple[int, int, int, int]:
+        return (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def get(self, stat: os.stat_result) -> str | None:
+        key = self.key(stat)
+        digest = self.entries.get(key)
+        if digest is not None:
+            self.seen[key] = digest
+        return digest
+
+    def put(self, stat: os.stat_result, digest: str) -> None:
+        # Like git's racy-clean check: a write in the same mtime tick would go unnoticed
+        if stat.st_mtime_ns < self.started - _RACY_NS:
+            self.seen[self.key(stat)] = digest
+
+    def save(self, prune: bool = True) -> None:
+        entries = self.seen if prune else {**self.entries, **self.seen}
+        try:
+            os.makedirs(os.path.dirname(self.path), mode=0o700, exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as file:
+                marshal.dump((_CACHE_VERSION, self.algorithm, entries), file)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+
+
+@dataclass
+class ManifestReport:
+    checked: int = 0
+    changed: list[str] = field(default_factory=list)
+    missing: list[str] = field(default_factory=list)
+    extra: list[str] = field(default_factory=list)
+    errors: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return not (self.changed or self.missing or self.extra or self.errors)
+
+    def failed(self, ignore_extra: bool = False) -> bool:
+        return bool(self.changed or self.missing or self.errors or (self.extra and not ignore_extra))
+
+    def lines(self, ignore_extra: bool = False) -> Iterator[str]:
+        """One ``sha256sum --check`` style line per problem."""
+        for name in self.changed:
+            yield f"{name}: FAILED"
+        for name in self.missing:
+            yield f"{name}: MISSING"
+        for name, error in self.errors.items():
+            yield f"{name}: FAILED open or read ({error})"
+        if not ignore_extra:
+            for name in self.extra:
+                yield f"{name}: EXTRA"
+
+    def summary(self) -> str:
+        return (
+            f"{self.checked} checked, {len(self.changed)} changed, {len(self.missing)} missing, "
+            f"{len(self.extra)} extra, {len(self.errors)} unreadable"
+        )
+
+
+class HashManifest:
+    """Checksum manifest of a directory tree.
+
+    Manifests use the tagged format of ``sha256sum --tag`` with paths
+    relative to the root, so coreutils can check them too. Digests come
+    from a ``DigestCache`` unless ``paranoid`` is set, so re-running on a
+    mostly unchanged tree only reads the files that changed.
+    """
+
+    def __init__(
+        self, root: str, algorithm: str = 'sha256', jobs: int | None = None,
+        paranoid: bool = False, cache_path: str | None = None,
+    ) -> None:
+        self.root = root
+        self.algorithm = algorithm
+        self.jobs = jobs
+        self.paranoid = paranoid
+        self.cache_path = cache_path
+        self.manager = HashManager()
+
+    def files(self, exclude: Iterable[str] = ()) -> list[str]:
+        """Paths of all files under the root, relative to it and sorted."""
+        excluded = {os.path.abspath(path) for path in exclude}
+        return [
+            os.path.relpath(path, self.root) for path in self.manager.expand_paths([self.root])
+            if os.path.abspath(path) not in excluded
+        ]
+
+    def digests(self, files: list[str], prune: bool = True) -> tuple[dict[str, str], dict[str, str]]:
+        """Digests of ``files`` (relative paths), and errors for those that failed.
+
+        The digest cache is left holding only ``files``, unless ``prune`` is
+        false because they are just part of the tree.
+        """
+        cache = DigestCache(self.root, self.algorithm, self.cache_path)
+        digests: dict[str, str] = {}
+        errors: dict[str, str] = {}
+        stats: dict[str, os.stat_result] = {}
+        for name in files:
+            try:
+                stat = os.stat(os.path.join(self.root, name))
+            except OSError as e:
+                errors[name] = e.strerror or str(e)
+                continue
+            digest = None if self.paranoid else cache.get(stat)
+            if digest is None:
+                stats[name] = stat
+            else:
+                digests[name] = digest
+        paths = [os.path.join(self.root, name) for name in stats]
+        for name, (_, digest, error) in zip(stats, self.manager.hash_files(paths, self.algorithm, self.jobs, expand=False)):
+            if error:
+                errors[name] = error
+            else:
+                digests[name] = digest
+                cache.put(stats[name], digest)
+        cache.save(prune)
+        return digests, errors
+
+    def create(self, exclude: Iterable[str] = ()) -> tuple[dict[str, str], dict[str, str]]:
+        """Digests of every file under the root, and errors for unreadable ones."""
+        files = self.files(exclude)
+        digests, errors = self.digests(files)
+        return {name: digests[name] for name in files if name in digests}, errors
+
+    def verify(self, expected: dict[str, str], exclude: Iterable[str] = ()) -> ManifestReport:
+        """Compare the tree against the ``expected`` digests."""
+        present = self.files(exclude)
+        digests, errors = self.digests(list(expected))
+        report = ManifestReport(checked=len(expected))
+        for name, digest in expected.items():
+            if name in digests:
+                if digests[name].lower() != digest.lower():
+                    report.changed.append(name)
+            elif not os.path.lexists(os.path.join(self.root, name)):
+                report.missing.append(name)
+            else:
+                report.errors[name] = errors.get(name, 'unreadable')
+        report.extra = [name for name in present if name not in expected]
+        return report
+
+    def format(self, digests: dict[str, str]) -> Iterator[str]:
+        """Manifest lines for ``digests``."""
+        for name, digest in digests.items():
+            yield self.manager.tagged_line(self.algorithm, digest, name)
+
+    @staticmethod
+    def parse(lines: Iterable[str]) -> tuple[str | None, dict[str, str]]:
+        """Read a manifest in tagged or plain ``sha256sum`` format.
+
+        Returns the algorithm (None if the lines are empty) and the digests
+        by relative path.
+        """
+        algorithm = None
+        digests: dict[str, str] = {}
+        for line_no, line in enumerate(lines, start=1):
+            line = line.rstrip('\r\n')
+            if not line.strip() or line.startswith('#'):
+                continue
+            escaped = line.startswith('\\')
+            if escaped:
+                line = line[1:]
+            match = _TAGGED_LINE.fullmatch(line) or _PLAIN_LINE.fullmatch(line)
+            if match is None:
+                raise ValueError(f"Line {line_no}: not a checksum line")
+            digest = match.group('digest')
+            tag = match.groupdict().get('tag')
+            line_algorithm = tag.lower().replace('-', '_') if tag else _DIGEST_LENGTHS.get(len(digest))
+            if line_algorithm is None:
+                raise ValueError(f"Line {line_no}: unknown digest length {len(digest)}")
+            if algorithm and line_algorithm != algorithm:
+                raise ValueError(f"Line {line_no}: mixes {line_algorithm} with {algorithm}")
+            algorithm = line_algorithm
+            path = match.group('path')
+            digests[_unescape(path) if escaped else path] = digest
+        return algorithm, digests
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import ctypes
+import datetime
+import errno
+import os
+import select
+import struct
+import time
+from collections.abc import Callable
+from typing import Any
+
+from nox.domains.hash_manifest import HashManifest
+
+# Constants from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+    IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+)
+_EVENT = struct.Struct('iIII')
+
+
+class Inotify:
+    """Minimal ctypes binding of the Linux inotify API."""
+
+    def __init__(self) -> None:
+        libc = ctypes.CDLL(None, use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError(errno.ENOSYS, 'inotify is only available on Linux')
+        self._libc = libc
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            self._raise()
+
+    def _raise(self, path: str | None = None) -> None:
+        code = ctypes.get_errno()
+        if code == errno.ENOSPC:
+            raise OSError(code, 'inotify watch limit reached, raise fs.inotify.max_user_watches', path)
+        raise OSError(code, os.strerror(code), path)
+
+    def add_watch(self, path: str, mask: int = WATCH_MASK) -> int:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), ctypes.c_uint32(mask))
+        if wd < 0:
+            self._raise(path)
+        return wd
+
+    def rm_watch(self, wd: int) -> None:
+        # Fails harmlessly when the kernel already dropped the watch
+        self._libc.inotify_rm_watch(self.fd, wd)
+
+    def read(self) -> list[tuple[int, int, str]]:
+        """Pending events as (watch descriptor, mask, name)."""
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, 64 << 10)
+            except BlockingIOError:
+                return events
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+                offset += length
+                events.append((wd, mask, name))
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class IntegrityWatcher:
+    """Report content changes under a directory as they happen.
+
+    The baseline comes from a ``HashManifest`` of the tree, so it reuses the
+    manifest's stat cache. inotify then names the files that may have
+    changed, and only those are hashed again, once writes to them have
+    been quiet for ``debounce`` seconds (or at the latest ``max_delay``
+    seconds after the first write). While nothing changes, the watcher
+    blocks in poll() and uses no CPU.
+    """
+
+    def __init__(
+        self, root: str, algorithm: str = 'sha256', debounce: float = 0.5,
+        max_delay: float = 10.0, jobs: int | None = None,
+    ) -> None:
+        self.root = root
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.manifest = HashManifest(root, algorithm, jobs)
+        self.baseline: dict[str, str] = {}
+        self.inotify: Inotify | None = None
+        self.watches: dict[int, str] = {}
+        # Relative path -> (first event, deadline)
+        self.pending: dict[str, tuple[float, float]] = {}
+        self._stop_r, self._stop_w = os.pipe()
+
+    def start(self) -> None:
+        """Watch the tree and build the baseline."""
+        self.inotify = Inotify()
+        # Watch before hashing, so changes made during the baseline are seen
+        self._watch_tree('')
+        self.baseline, _ = self.manifest.create()
+
+    def stop(self) -> None:
+        """Make ``run`` return; safe to call from another thread or a signal handler."""
+        os.write(self._stop_w, b'x')
+
+    def close(self) -> None:
+        if self.inotify:
+            self.inotify.close()
+        os.close(self._stop_r)
+        os.close(self._stop_w)
+
+    def _watch_tree(self, directory: str) -> None:
+        assert self.inotify is not None
+        for path, dirs, _ in os.walk(os.path.join(self.root, directory)):
+            dirs.sort()
+            try:
+                wd = self.inotify.add_watch(path)
+            except FileNotFoundError:
+                continue
+            self.watches[wd] = os.path.relpath(path, self.root)
+
+    def _schedule(self, name: str, now: float) -> None:
+        first = self.pending.get(name, (now, 0.0))[0]
+        self.pending[name] = (first, min(now + self.debounce, first + self.max_delay))
+
+    def _schedule_tree(self, directory: str, now: float) -> None:
+        """Check every known and current file below ``directory`` ('' is the root)."""
+        prefix = '' if directory in ('', '.') else directory + os.sep
+        for name in self.baseline:
+            if name.startswith(prefix):
+                self._schedule(name, now)
+        for path in self.manifest.manager.expand_paths([os.path.join(self.root, directory)]):
+            self._schedule(os.path.relpath(path, self.root), now)
+
+    def _unwatch_tree(self, directory: str) -> None:
+        assert self.inotify is not None
+        prefix = directory + os.sep
+        for wd, path in list(self.watches.items()):
+            if path == directory or path.startswith(prefix):
+                self.inotify.rm_watch(wd)
+                del self.watches[wd]
+
+    def _handle(self, wd: int, mask: int, name: str, now: float) -> None:
+        if mask & IN_Q_OVERFLOW:
+            # Events were lost: fall back to checking everything
+            self._schedule_tree('', now)
+            return
+        directory = self.watches.get(wd)
+        if directory is None:
+            return
+        if mask & IN_IGNORED:
+            del self.watches[wd]
+            return
+        if not name:
+            return
+        path = os.path.normpath(os.path.join(directory, name))
+        if mask & IN_ISDIR:
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                self._watch_tree(path)
+            elif mask & IN_MOVED_FROM:
+                self._unwatch_tree(path)
+            self._schedule_tree(path, now)
+        else:
+            self._schedule(path, now)
+
+    def _check(self, names: list[str], emit: Callable[[dict[str, Any]], None]) -> None:
+        present = [name for name in names if os.path.isfile(os.path.join(self.root, name))]
+        digests, _ = self.manifest.digests(present, prune=False)
+        timestamp = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        for name in names:
+            old, new = self.baseline.get(name), digests.get(name)
+            if old == new:
+                continue
+            if new is None:
+                del self.baseline[name]
+            else:
+                self.baseline[name] = new
+            event = 'created' if old is None else 'deleted' if new is None else 'modified'
+            emit({
+                'event': event, 'path': os.path.join(self.root, name),
+                'old_digest': old, 'new_digest': new, 'timestamp': timestamp,
+            })
+
+    def run(self, emit: Callable[[dict[str, Any]], None]) -> None:
+        """Call ``emit`` with one dict per change until ``stop`` is called."""
+        if self.inotify is None:
+            self.start()
+        assert self.inotify is not None
+        poller = select.poll()
+        poller.register(self.inotify.fd, select.POLLIN)
+        poller.register(self._stop_r, select.POLLIN)
+        while True:
+            timeout = None
+            if self.pending:
+                timeout = max(0, min(deadline for _, deadline in self.pending.values()) - time.monotonic()) * 1000
+            ready = poller.poll(timeout)
+            now = time.monotonic()
+            for fd, _ in ready:
+                if fd == self._stop_r:
+                    os.read(self._stop_r, 64)
+                    return
+                for wd, mask, name in self.inotify.read():
+                    self._handle(wd, mask, name, now)
+            due = sorted(name for name, (_, deadline) in self.pending.items() if deadline <= now)
+            for name in due:
+                del self.pending[name]
+            if due:
+                self._check(due, emit)
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import datetime
+import itertools
+import json
+from collections import deque
+from collections.abc import Iterable
+from collections.abc import Iterator
+from typing import Any
+
+from jwt.algorithms import get_default_algorithms
+from jwt.exceptions import InvalidKeyError
+from jwt.utils import base64url_encode
+
+from nox.utils.pool import process_pool
+from nox.utils.pool import worker_count
+
+# Signing algorithms available for minting; 'none' would produce unsigned tokens
+ALGORITHMS = tuple(name for name in get_default_algorithms() if name != 'none')
+# Claims sent to a worker per task
+BATCH_SIZE = 1000
+# Below this many tokens, starting the pool costs more than it saves
+PARALLEL_MIN_TOKENS = 5 * BATCH_SIZE
+
+# Signer of the current process, set once by _init_worker
+_signer: TokenSigner | None = None
+
+
+class TokenSigner:
+    """Sign many JWTs with a key that is parsed once.
+
+    ``jwt.encode`` parses the key and encodes the header again for every
+    token, which dominates minting with RSA and EC keys. Here both happen
+    once, in the constructor; the tokens are the same as ``jwt.encode``'s.
+    """
+
+    def __init__(self, key: str | bytes, algorithm: str = 'HS256') -> None:
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unsupported algorithm {algorithm}")
+        self.algorithm = get_default_algorithms()[algorithm]
+        try:
+            self.key = self.algorithm.prepare_key(key)
+        except (InvalidKeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Key cannot be used with {algorithm}: {e}")
+        header = json.dumps({'alg': algorithm, 'typ': 'JWT'}, separators=(',', ':'), sort_keys=True)
+        self.header = base64url_encode(header.encode()) + b'.'
+
+    def sign(self, claims: dict[str, Any]) -> str:
+        signing_input = self.header + base64url_encode(json.dumps(claims, separators=(',', ':')).encode())
+        return (signing_input + b'.' + base64url_encode(self.algorithm.sign(signing_input, self.key))).decode()
+
+
+def _init_worker(key: str | bytes, algorithm: str) -> None:
+    global _signer
+    _signer = TokenSigner(key, algorithm)
+
+
+def _sign_batch(task: tuple[list[tuple[int, str]], dict[str, Any]]) -> list[str]:
+    """Worker: tokens for numbered JSON claims lines, each updated with ``extra``."""
+    lines, extra = task
+    assert _signer is not None
+    tokens = []
+    for line_no, line in lines:
+        try:
+            claims = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"Line {line_no}: {e}")
+        if not isinstance(claims, dict):
+            raise ValueError(f"Line {line_no}: claims must be a JSON object")
+        claims.update(extra)
+        tokens.append(_signer.sign(claims))
+    return tokens
+
+
+def template_lines(template: str, count: int) -> Iterator[str]:
+    """``count`` copies of a JSON claims template, with ``{n}`` replaced by the token number (from 0)."""
+    if '{n}' not in template:
+        return itertools.repeat(template, count)
+    return (template.replace('{n}', str(n)) for n in range(count))
+
+
+class BulkMinter:
+    """Mint a JWT for each JSON claims object in a stream.
+
+    Claims are signed in batches on ``jobs`` worker processes (all cores by
+    default) that each parse the key once. Tokens come out in input order
+    while later batches are still being signed, and only a few batches per
+    worker are in flight, so input of any length streams through. Every
+    token gets ``claims`` (e.g. the environment) and an ``exp`` taken from
+    one timezone-aware clock read per batch.
+    """
+
+    def __init__(
+        self, key: str | bytes, algorithm: str = 'HS256', expires_in: int = 3600,
+        claims: dict[str, Any] | None = None, jobs: int | None = None,
+    ) -> None:
+        self.key = key
+        self.algorithm = algorithm
+        self.expires_in = expires_in
+        self.claims = claims or {}
+        self.jobs = jobs
+        # Parse the key here too, so a bad key fails before any claims are read
+        TokenSigner(key, algorithm)
+
+    def expiry(self) -> int:
+        return int(datetime.datetime.now(datetime.timezone.utc).timestamp()) + self.expires_in
+
+    def batches(self, lines: Iterable[str]) -> Iterator[tuple[list[tuple[int, str]], dict[str, Any]]]:
+        """Tasks of up to BATCH_SIZE numbered lines; blank lines are skipped."""
+        numbered = ((line_no, line) for line_no, line in enumerate(lines, start=1) if line.strip())
+        while batch := list(itertools.islice(numbered, BATCH_SIZE)):
+            yield batch, {**self.claims, 'exp': self.expiry()}
+
+    def mint(self, lines: Iterable[str]) -> Iterator[str]:
+        """Tokens for ``lines`` of JSON claims, in order.
+
+        Raises ValueError naming the line of the first invalid claims.
+        """
+        batches = self.batches(lines)
+        head = list(itertools.islice(batches, -(-PARALLEL_MIN_TOKENS // BATCH_SIZE)))
+        jobs = worker_count(self.jobs)
+        if jobs < 2 or sum(len(batch) for batch, _ in head) < PARALLEL_MIN_TOKENS:
+            _init_worker(self.key, self.algorithm)
+            for task in itertools.chain(head, batches):
+                yield from _sign_batch(task)
+            return
+        executor = process_pool(jobs, _init_worker, (self.key, self.algorithm))
+        try:
+            # Unlike executor.map, submit lazily so the input is not read all at once
+            pending: deque = deque()
+            for task in itertools.chain(head, batches):
+                pending.append(executor.submit(_sign_batch, task))
+                if len(pending) >= jobs * 4:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            # Drop queued work when the caller stops early
+            executor.shutdown(cancel_futures=True)
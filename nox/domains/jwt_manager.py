@@ -17,7 +17,7 @@ class JWTManager:
         expires_in: int = 3600,
     ) -> str:
         """Generate a JWT token."""
-        expiration = datetime.datetime.now() +\
+        expiration = datetime.datetime.now(datetime.timezone.utc) +\
             datetime.timedelta(seconds=expires_in)
         payload.update({'exp': expiration})
         token = jwt.encode(payload, self.secret, algorithm=self.algorithm)
@@ -7,13 +7,29 @@ from confluent_kafka import Producer
 from confluent_kafka.admin import AdminClient
 from confluent_kafka.admin import NewTopic
 
+from nox.utils.clients import get_client
+
 
 class KafkaManager:
     def __init__(self, bootstrap_servers: str = 'localhost:9092'):
         """Initialize the Kafka manager with the specified bootstrap servers."""
         self.bootstrap_servers = bootstrap_servers
-        self.producer = Producer({'bootstrap.servers': self.bootstrap_servers})
-        self.admin_client = AdminClient({'bootstrap.servers': self.bootstrap_servers})
+
+    @property
+    def producer(self) -> Producer:
+        """Shared Kafka producer, created on first use."""
+        return get_client(
+            'kafka-producer', lambda: Producer({'bootstrap.servers': self.bootstrap_servers}),
+            self.bootstrap_servers,
+        )
+
+    @property
+    def admin_client(self) -> AdminClient:
+        """Shared Kafka admin client, created on first use."""
+        return get_client(
+            'kafka-admin', lambda: AdminClient({'bootstrap.servers': self.bootstrap_servers}),
+            self.bootstrap_servers,
+        )
 
     def produce_message(self, topic: str, message: str) -> str:
         """Produce a message to a Kafka topic."""
@@ -59,6 +75,14 @@ class KafkaManager:
         except KafkaException as e:
             return [f"Error listing topics: {str(e)}"]
 
+    def topic_names(self, timeout: float = 5) -> list[str]:
+        """Return the topic names, or an empty list if the cluster is unreachable."""
+        try:
+            return list(self.admin_client.list_topics(timeout=timeout).topics.keys())
+        except KafkaException as e:
+            print(f"Error listing topics: {str(e)}")
+            return []
+
     def create_topic(self, topic_name: str, num_partitions: int = 1, replication_factor: int = 1) -> str:
         """Create a new Kafka topic."""
         try:
@@ -4,11 +4,23 @@ from typing import Any
 
 import redis
 
+from nox.utils.clients import get_client
+
 
 class RedisManager:
     def __init__(self, host: str = 'localhost', port: int = 6379, db: int = 0):
         """Initialize the Redis manager."""
-        self.client = redis.Redis(host=host, port=port, db=db)
+        self.host = host
+        self.port = port
+        self.db = db
+
+    @property
+    def client(self) -> redis.Redis:
+        """Shared Redis client, created on first use."""
+        return get_client(
+            'redis', lambda: redis.Redis(host=self.host, port=self.port, db=self.db),
+            self.host, self.port, self.db,
+        )
 
     def set_key(self, key: str, value: Any) -> str:
         """Set a key in Redis."""
@@ -42,6 +54,19 @@ class RedisManager:
         except Exception as e:
             return [f"Error listing keys: {str(e)}"]
 
+    def scan_keys(self, pattern: str = '*', limit: int = 1000) -> list[str]:
+        """Return up to ``limit`` keys matching a pattern using SCAN instead of KEYS."""
+        try:
+            keys = []
+            for key in self.client.scan_iter(match=pattern, count=limit):
+                keys.append(key.decode())
+                if len(keys) >= limit:
+                    break
+            return keys
+        except Exception as e:
+            print(f"Error scanning keys: {e}")
+            return []
+
     def flush_database(self) -> str:
         """Flush the current database."""
         try:
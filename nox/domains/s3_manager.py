@@ -6,23 +6,42 @@ import boto3
 from botocore.exceptions import ClientError
 from botocore.exceptions import NoCredentialsError
 
+from nox.utils.clients import aws_environment
+from nox.utils.clients import get_client
+from nox.utils.profiling import span
+
 
 class S3Manager:
     def __init__(
         self, aws_access_key_id=None, aws_secret_access_key=None,
         region_name=None,
     ):
-        self.s3 = boto3.client(
-            's3',
-            aws_access_key_id=aws_access_key_id,
-            aws_secret_access_key=aws_secret_access_key,
-            region_name=region_name,
-        )
+        with span('S3Manager.__init__', 'init'):
+            # A new session per client: the default one keeps the credentials it found first
+            self.s3 = get_client(
+                'boto3', lambda: boto3.session.Session().client(
+                    's3',
+                    aws_access_key_id=aws_access_key_id,
+                    aws_secret_access_key=aws_secret_access_key,
+                    region_name=region_name,
+                ),
+                's3', aws_access_key_id, aws_secret_access_key, region_name, *aws_environment(),
+            )
+
+    def list_buckets(self):
+        """List the names of the S3 buckets."""
+        try:
+            response = self.s3.list_buckets()
+            return [bucket['Name'] for bucket in response.get('Buckets', [])]
+        except ClientError as e:
+            print(f"Error listing buckets: {e}")
+            return []
 
     def list_objects(self, bucket_name):
         """List objects in an S3 bucket."""
         try:
-            response = self.s3.list_objects_v2(Bucket=bucket_name)
+            with span('S3Manager.list_objects', 'backend'):
+                response = self.s3.list_objects_v2(Bucket=bucket_name)
             return response.get('Contents', [])
         except ClientError as e:
             print(f"Error listing objects in bucket {bucket_name}: {e}")
@@ -33,7 +52,8 @@ class S3Manager:
         try:
             # Use the provided object_name or default to the file's base name
             object_name = object_name or os.path.basename(file_path)
-            self.s3.upload_file(file_path, bucket_name, object_name)
+            with span('S3Manager.upload_file', 'backend'):
+                self.s3.upload_file(file_path, bucket_name, object_name)
             print(f"File {file_path} uploaded to {bucket_name}/{object_name}.")
         except NoCredentialsError:
             print('AWS credentials not found.')
@@ -43,7 +63,8 @@ class S3Manager:
     def download_file(self, bucket_name, object_name, output_path):
         """Download a file from an S3 bucket."""
         try:
-            self.s3.download_file(bucket_name, object_name, output_path)
+            with span('S3Manager.download_file', 'backend'):
+                self.s3.download_file(bucket_name, object_name, output_path)
             print(
                 f"File {object_name} downloaded from {bucket_name} \
                     to {output_path}.",
@@ -53,6 +74,35 @@ class S3Manager:
         except ClientError as e:
             print(f"Error downloading file from bucket {bucket_name}: {e}")
 
+    def object_etag(self, bucket_name, object_name):
+        """ETag of an object and, for multipart uploads, the size of its first part."""
+        with span('S3Manager.object_etag', 'backend'):
+            head = self.s3.head_object(Bucket=bucket_name, Key=object_name)
+            etag = head['ETag'].strip('"')
+            part_size = None
+            if '-' in etag:
+                part_size = self.s3.head_object(Bucket=bucket_name, Key=object_name, PartNumber=1)['ContentLength']
+        return etag, part_size
+
+    def verify_upload(self, bucket_name, file_path, object_name=None, part_size=None):
+        """Compare a local file with an object through ETags, without downloading it.
+
+        Returns (matches, local ETag, remote ETag). The part size of a
+        multipart object is read from S3 unless ``part_size`` is given.
+        """
+        from nox.domains.hash_manager import HashManager
+
+        object_name = object_name or os.path.basename(file_path)
+        remote, remote_part_size = self.object_etag(bucket_name, object_name)
+        manager = HashManager()
+        if '-' in remote:
+            part_size = part_size or remote_part_size
+            # Any multipart object, even one smaller than the boto3 threshold
+            local = manager.s3_etag(file_path, part_size, multipart_threshold=0)
+        else:
+            local = manager.s3_etag(file_path, multipart_threshold=os.stat(file_path).st_size + 1)
+        return local == remote, local, remote
+
     def delete_object(self, bucket_name, object_name):
         """Delete an object from an S3 bucket."""
         try:
@@ -3,10 +3,17 @@ from __future__ import annotations
 import boto3
 from botocore.exceptions import ClientError
 
+from nox.utils.clients import aws_environment
+from nox.utils.clients import get_client
+
 
 class SecretsManager:
     def __init__(self, region_name=None):
-        self.client = boto3.client('secretsmanager', region_name=region_name)
+        # A new session per client: the default one keeps the credentials it found first
+        self.client = get_client(
+            'boto3', lambda: boto3.session.Session().client('secretsmanager', region_name=region_name),
+            'secretsmanager', None, None, region_name, *aws_environment(),
+        )
 
     def store_secret(self, name: str, value: str):
         """Store a secret in AWS Secrets Manager."""
@@ -2,43 +2,70 @@ from __future__ import annotations
 
 import click
 
-from nox.commands import datetime_commands
-from nox.commands import db_commands
-from nox.commands import docker_commands
-from nox.commands import encrypt_commands
-from nox.commands import env_commands
-from nox.commands import hash_commands
-from nox.commands import init_command
-from nox.commands import jwt_commands
-from nox.commands import net_commands
-from nox.commands import redis_commands
-from nox.commands import s3_commands
-from nox.commands import secret_commands
-from nox.commands import uuid_commands
-
-
-@click.group()
-def cli():
+from nox.plugins.manifest import PluginManifest
+from nox.utils.lazy_group import LazyGroup
+from nox.utils.profiling import profiling
+
+
+class NoxGroup(LazyGroup):
+    """Root group that runs the whole command inside a profiling session when ``--profile`` is given."""
+
+    def invoke(self, ctx: click.Context):
+        if not (ctx.params.get('profile') or ctx.params.get('profile_output')):
+            return super().invoke(ctx)
+        # Also covers resolving (and importing) the subcommand, which happens before the callback
+        with profiling(ctx.params.get('profile_output')):
+            return super().invoke(ctx)
+
+
+# Command modules pull in heavy dependencies (boto3, docker, SQLAlchemy, ...),
+# so they are only imported when the matching subcommand is invoked.
+@click.group(
+    cls=NoxGroup,
+    lazy_subcommands={
+        # Init command
+        'init': 'nox.commands.init_command.init',
+        # Built-in commands
+        'encrypt': 'nox.commands.encrypt_commands.encrypt',
+        'decrypt': 'nox.commands.encrypt_commands.decrypt',
+        'gen': 'nox.commands.uuid_commands.gen',
+        'jwt': 'nox.commands.jwt_commands.jwt',
+        'net': 'nox.commands.net_commands.net',
+        's3': 'nox.commands.s3_commands.s3',
+        'hash': 'nox.commands.hash_commands.hash',
+        'secrets': 'nox.commands.secret_commands.secrets',
+        'docker': 'nox.commands.docker_commands.docker',
+        'db': 'nox.commands.db_commands.db',
+        'env': 'nox.commands.env_commands.env',
+        'datetime': 'nox.commands.datetime_commands.datetime',
+        'redis': 'nox.commands.redis_commands.redis',
+        'kafka': 'nox.commands.kafka_commands.kafka',
+        'completion': 'nox.commands.completion_commands.completion',
+        'plugins': 'nox.commands.plugin_commands.plugins',
+        'config': 'nox.commands.config_commands.config',
+        # Batch and daemon modes
+        'batch': 'nox.commands.batch_commands.batch',
+        'daemon': 'nox.commands.daemon_commands.daemon',
+    },
+)
+@click.option(
+    '--config-profile', envvar='NOX_CONFIG_PROFILE', metavar='NAME',
+    help='Profile from the nox config files (~/.nox.toml, .nox.toml) to apply',
+)
+@click.option('--profile', is_flag=True, help='Print a per-phase timing breakdown to stderr')
+@click.option(
+    '--profile-output', type=click.Path(dir_okay=False, writable=True), metavar='FILE',
+    help='Also save the profile: a Chrome trace for *.json, cProfile stats (pstats) otherwise',
+)
+def cli(config_profile, profile, profile_output):
     """Nox CLI tool."""
+    # The config files are only read once an option default needs them
     pass
 
 
-# Register Init command
-cli.add_command(init_command.init)
-
-# Register built-in commands
-cli.add_command(encrypt_commands.encrypt)
-cli.add_command(uuid_commands.gen)
-cli.add_command(jwt_commands.jwt)
-cli.add_command(net_commands.net)
-cli.add_command(s3_commands.s3)
-cli.add_command(hash_commands.hash)
-cli.add_command(secret_commands.secrets)
-cli.add_command(docker_commands.docker)
-cli.add_command(db_commands.db)
-cli.add_command(env_commands.env)
-cli.add_command(datetime_commands.datetime)
-cli.add_command(redis_commands.redis)
+# Commands from installed plugins, read from the cached manifest
+PluginManifest().register(cli)
+
 
 if __name__ == '__main__':
     cli()
@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from abc import ABC
+from abc import abstractmethod
+from typing import Any
+
+
+class NoxPlugin(ABC):
+    """Base class for plugins that add commands to the nox CLI.
+
+    Expose an instance (or subclass) through the ``nox.plugins`` entry point
+    group; ``register_commands`` is called with the root group the first time
+    one of the plugin's commands is used. A subclass that does not implement
+    it cannot be instantiated, so the plugin manifest reports it as broken.
+    """
+
+    @abstractmethod
+    def register_commands(self, cli: Any) -> None:
+        """Add the plugin's commands to the click group ``cli``."""
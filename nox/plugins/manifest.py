@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import marshal
+import os
+import sys
+import time
+from typing import Any
+
+from nox.plugins import NoxPlugin
+from nox.utils.paths import cache_dir
+
+ENTRY_POINT_GROUP = 'nox.plugins'
+
+# Bump when the layout of the cached manifest changes
+_MANIFEST_VERSION = 1
+
+
+def _site_key() -> tuple:
+    """Cheap fingerprint of the installed packages.
+
+    Installing or removing a distribution adds or deletes its dist-info
+    directory, which changes the mtime of the sys.path entry holding it.
+    """
+    stamps = []
+    cwd = os.getcwd()
+    for entry in sys.path:
+        # `python -m` puts the working directory first, which says nothing about installs
+        if entry in ('', cwd):
+            continue
+        try:
+            stamps.append((entry, os.stat(entry).st_mtime_ns))
+        except OSError:
+            continue
+    return (_MANIFEST_VERSION, sys.version, tuple(stamps))
+
+
+def load_object(import_path: str) -> Any:
+    """Import ``module:attr`` (entry point syntax) or ``module.attr``."""
+    import importlib
+
+    if ':' in import_path:
+        module_name, attr_path = import_path.split(':', 1)
+    else:
+        module_name, attr_path = import_path.rsplit('.', 1)
+    obj: Any = importlib.import_module(module_name.strip())
+    for attr in attr_path.strip().split('.'):
+        obj = getattr(obj, attr)
+    if isinstance(obj, type) and issubclass(obj, NoxPlugin):
+        try:
+            obj = obj()
+        except TypeError as e:
+            # Typically a subclass that does not implement register_commands
+            raise TypeError(f"Cannot instantiate plugin {import_path}: {e}") from e
+    return obj
+
+
+def plugin_commands(obj: Any, name: str) -> dict[str, str]:
+    """Command names and short help provided by a loaded plugin object."""
+    import click
+
+    if isinstance(obj, click.Command):
+        return {name: obj.get_short_help_str(limit=80)}
+    if isinstance(obj, NoxPlugin):
+        scratch = click.Group(name)
+        obj.register_commands(scratch)
+        return {cmd_name: cmd.get_short_help_str(limit=80) for cmd_name, cmd in scratch.commands.items()}
+    raise TypeError(f"{type(obj).__name__} is neither a click command nor a NoxPlugin")
+
+
+class PluginManifest:
+    """Cached list of the plugins installed through ``nox.plugins`` entry points.
+
+    Scanning package metadata and importing every plugin is slow, so the
+    result is stored in a marshal file in the user cache directory and only
+    rebuilt when the sys.path directories change. Each entry records the
+    entry point and the commands it provides, which lets the root group
+    register plugin commands lazily without importing them.
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path or os.path.join(cache_dir(), 'plugins.marshal')
+
+    def _read(self, key: tuple) -> list[dict[str, Any]] | None:
+        try:
+            with open(self.path, 'rb') as file:
+                cached_key, plugins = marshal.load(file)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        return plugins if cached_key == key else None
+
+    def _write(self, key: tuple, plugins: list[dict[str, Any]]) -> None:
+        os.makedirs(os.path.dirname(self.path), mode=0o700, exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as file:
+                marshal.dump((key, plugins), file)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            # A read-only cache only costs a rescan on the next start
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+    @staticmethod
+    def scan() -> list[dict[str, Any]]:
+        """Discover plugins from package metadata, importing each one once."""
+        from importlib import metadata
+
+        plugins = []
+        for entry_point in metadata.entry_points(group=ENTRY_POINT_GROUP):
+            dist = getattr(entry_point, 'dist', None)
+            plugin: dict[str, Any] = {
+                'name': entry_point.name,
+                'value': entry_point.value,
+                'dist': dist.name if dist else '',
+                'version': dist.version if dist else '',
+                'commands': {},
+                'error': '',
+            }
+            try:
+                plugin['commands'] = plugin_commands(load_object(entry_point.value), entry_point.name)
+            except Exception as e:
+                plugin['error'] = f"{type(e).__name__}: {e}"
+            plugins.append(plugin)
+        return sorted(plugins, key=lambda plugin: plugin['name'])
+
+    def plugins(self, refresh: bool = False) -> list[dict[str, Any]]:
+        """Return the manifest, rescanning when the installed packages changed."""
+        key = _site_key()
+        plugins = None if refresh else self._read(key)
+        if plugins is None:
+            plugins = self.scan()
+            self._write(key, plugins)
+        return plugins
+
+    def register(self, cli: Any) -> None:
+        """Register the plugin commands with a LazyGroup; built-in commands take precedence."""
+        for plugin in self.plugins():
+            for cmd_name in plugin['commands']:
+                if cmd_name not in cli.lazy_subcommands and cmd_name not in cli.commands:
+                    cli.lazy_subcommands[cmd_name] = plugin['value']
+
+
+def time_plugin(plugin: dict[str, Any]) -> tuple[float, str]:
+    """Import and register a plugin, returning its load time in ms and any error."""
+    start = time.perf_counter()
+    try:
+        plugin_commands(load_object(plugin['value']), plugin['name'])
+    except Exception as e:
+        return (time.perf_counter() - start) * 1000, f"{type(e).__name__}: {e}"
+    return (time.perf_counter() - start) * 1000, ''
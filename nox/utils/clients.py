@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import os
+import threading
+from collections.abc import Callable
+from collections.abc import Hashable
+from typing import Any
+from typing import TypeVar
+
+from nox.utils.profiling import span
+
+T = TypeVar('T')
+
+# Process-wide cache of backend clients, keyed by client kind and settings
+_clients: dict[tuple[Hashable, ...], Any] = {}
+_lock = threading.Lock()
+
+# Environment variables that decide the credentials, region and endpoint of boto3 clients
+AWS_ENVIRONMENT = (
+    'AWS_PROFILE', 'AWS_DEFAULT_PROFILE', 'AWS_ACCESS_KEY_ID', 'AWS_SECRET_ACCESS_KEY', 'AWS_SESSION_TOKEN',
+    'AWS_REGION', 'AWS_DEFAULT_REGION', 'AWS_ENDPOINT_URL', 'AWS_CONFIG_FILE', 'AWS_SHARED_CREDENTIALS_FILE',
+    'AWS_ROLE_ARN', 'AWS_WEB_IDENTITY_TOKEN_FILE',
+)
+
+
+def get_client(kind: str, factory: Callable[[], T], *settings: Hashable) -> T:
+    """Return the cached client for ``kind`` and ``settings``.
+
+    The client is built with ``factory`` the first time it is requested and
+    reused for the rest of the process, so Redis connection pools, Kafka
+    producers, boto3 clients, docker clients and SQLAlchemy engines are only
+    created when a command actually needs them.
+    """
+    key = (kind, *settings)
+    try:
+        return _clients[key]
+    except KeyError:
+        pass
+    with _lock:
+        if key not in _clients:
+            with span(f"{kind} client", 'init'):
+                _clients[key] = factory()
+        return _clients[key]
+
+
+def aws_environment() -> tuple[str | None, ...]:
+    """The AWS settings of the environment, to add to the settings of boto3 clients.
+
+    The daemon runs each request with the environment of its caller, so a
+    client built for one profile, set of credentials or region must not be
+    reused for a request with another.
+    """
+    return tuple(os.environ.get(name) for name in AWS_ENVIRONMENT)
+
+
+def cached_clients() -> list[tuple[Hashable, ...]]:
+    """List the keys of the clients created so far."""
+    return list(_clients)
+
+
+def close_clients() -> None:
+    """Close and forget every cached client."""
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        # Kafka producers have no close(), flush pending messages instead
+        close = getattr(client, 'close', None) or getattr(client, 'dispose', None) or getattr(client, 'flush', None)
+        if close is None:
+            continue
+        try:
+            close()
+        except Exception as e:
+            print(f"Error closing client {client!r}: {e}")
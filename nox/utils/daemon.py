@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import io
+import json
+import os
+import signal
+import socket
+import struct
+import sys
+import threading
+import time
+
+import click
+
+from nox.client import ARGS
+from nox.client import EXIT
+from nox.client import READ
+from nox.client import recv_frame
+from nox.client import send_frame
+from nox.client import STDERR
+from nox.client import STDOUT
+from nox.utils.clients import cached_clients
+from nox.utils.clients import close_clients
+from nox.utils.invoke import run_command
+from nox.utils.paths import check_private_dir
+
+
+def _same_user(conn: socket.socket) -> bool:
+    """Whether the peer runs as the daemon's user (checked where SO_PEERCRED exists)."""
+    if not hasattr(socket, 'SO_PEERCRED'):
+        return True
+    creds = conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i'))
+    _, uid, _ = struct.unpack('3i', creds)
+    return uid == os.getuid()
+
+
+class _SocketWriter(io.RawIOBase):
+    """Binary stream that sends everything written to it as frames."""
+
+    def __init__(self, sock: socket.socket, channel: bytes) -> None:
+        self.sock = sock
+        self.channel = channel
+        self.broken = False
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        # Keep the command running if the client went away, drop its output
+        if not self.broken:
+            try:
+                send_frame(self.sock, self.channel, bytes(data))
+            except OSError:
+                self.broken = True
+        return len(data)
+
+
+class _SocketReader(io.RawIOBase):
+    """Binary stream that requests stdin from the client on demand."""
+
+    def __init__(self, sock: socket.socket) -> None:
+        self.sock = sock
+        self.eof = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self.eof:
+            return 0
+        try:
+            send_frame(self.sock, READ, struct.pack('!I', len(buffer)))
+            _, payload = recv_frame(self.sock)
+        except OSError:
+            payload = b''
+        if not payload:
+            self.eof = True
+        buffer[:len(payload)] = payload
+        return len(payload)
+
+
+class NoxDaemon:
+    """Long-lived process that runs nox commands sent over a Unix socket.
+
+    Command modules are imported once at start-up and backend clients stay
+    cached in nox.utils.clients between requests, so each call only pays
+    for the command itself. Requests are served one at a time.
+    """
+
+    def __init__(self, socket_path: str) -> None:
+        self.socket_path = socket_path
+        self.started = time.time()
+        self.requests = 0
+        self.stopping = False
+
+    def preload(self) -> None:
+        """Import every command module up front."""
+        from nox.main import cli
+
+        ctx = click.Context(cli)
+        for name in cli.list_commands(ctx):
+            try:
+                cli.get_command(ctx, name)
+            except Exception as e:
+                print(f"Error preloading command {name}: {e}", file=sys.stderr)
+
+    def status(self) -> dict:
+        """Describe the running daemon."""
+        return {
+            'pid': os.getpid(),
+            'socket': self.socket_path,
+            'uptime': round(time.time() - self.started, 3),
+            'requests': self.requests,
+            'clients': [':'.join(map(str, key[:2])) for key in cached_clients()],
+        }
+
+    def handle(self, conn: socket.socket) -> None:
+        """Serve a single client connection."""
+        channel, payload = recv_frame(conn)
+        if channel != ARGS:
+            raise ConnectionError(f"Unexpected frame {channel!r} from client")
+        message = json.loads(payload)
+        control = message.get('control')
+        if control == 'stop':
+            self.stopping = True
+            send_frame(conn, ARGS, json.dumps({'stopped': True}).encode())
+            return
+        if control == 'status':
+            send_frame(conn, ARGS, json.dumps(self.status()).encode())
+            return
+
+        if message['argv'][:1] == ['daemon']:
+            # The daemon serves one request at a time and cannot manage itself
+            send_frame(conn, STDERR, b'Use `nox daemon ...` to manage the daemon.\n')
+            send_frame(conn, EXIT, struct.pack('!i', 2))
+            return
+
+        self.requests += 1
+        stdout = io.BufferedWriter(_SocketWriter(conn, STDOUT))
+        stderr = io.BufferedWriter(_SocketWriter(conn, STDERR))
+        stdin = io.BufferedReader(_SocketReader(conn))
+        code = run_command(
+            message['argv'], stdin, stdout, stderr,
+            cwd=message.get('cwd'), env=message.get('env'),
+        )
+        send_frame(conn, EXIT, struct.pack('!i', code))
+
+    def serve(self) -> None:
+        """Listen on the socket until a stop request or SIGTERM."""
+        directory = os.path.dirname(os.path.abspath(self.socket_path))
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        check_private_dir(directory)
+        self.preload()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Nobody else can reach the socket inside the private directory,
+        # whatever its own mode is
+        server.bind(self.socket_path)
+        server.listen(64)
+        try:
+            while not self.stopping:
+                conn, _ = server.accept()
+                with conn:
+                    if not _same_user(conn):
+                        continue
+                    try:
+                        self.handle(conn)
+                    except (OSError, ValueError, KeyError) as e:
+                        print(f"Error handling request: {e}", file=sys.stderr)
+        finally:
+            server.close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            close_clients()
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import contextlib
+import os
+import secrets
+from collections.abc import Iterator
+from typing import BinaryIO
+
+
+def _create_temp(directory: str, name: str) -> tuple[int, str, int]:
+    """New private temporary file, and the mode the umask gives new files.
+
+    The mode is read back from the file as created rather than with
+    ``os.umask``, which would briefly change the umask of every thread.
+    """
+    while True:
+        tmp_path = os.path.join(directory, f".{name}.{secrets.token_hex(4)}.tmp")
+        try:
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0), 0o666)
+            break
+        except FileExistsError:
+            continue
+    new_mode = os.fstat(fd).st_mode & 0o777
+    # Still empty, so nothing was readable before this
+    os.chmod(tmp_path, 0o600)
+    return fd, tmp_path, new_mode
+
+
+def _fsync_directory(directory: str) -> None:
+    """Flush a rename in ``directory`` to disk (skipped where directories cannot be opened)."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@contextlib.contextmanager
+def atomic_write(path: str, mode: int | None = None, durable: bool = False) -> Iterator[BinaryIO]:
+    """Binary file that replaces ``path`` only if the block completes.
+
+    Data goes to a temporary file in the same directory, which is renamed
+    over ``path`` at the end, so readers never see a partial file and a
+    failure leaves the previous content in place. ``mode`` sets the
+    permissions of the new file (default: those of the replaced file, or
+    0o666 minus the umask). With ``durable`` the data and the rename are
+    synced to disk before returning, so a crash or power loss cannot leave
+    an empty or truncated file behind; use it when the old content is about
+    to become unrecoverable.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path, new_mode = _create_temp(directory, os.path.basename(path))
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            yield file
+            if durable:
+                file.flush()
+                os.fsync(file.fileno())
+        if mode is None:
+            try:
+                mode = os.stat(path).st_mode & 0o7777
+            except FileNotFoundError:
+                mode = new_mode
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp_path)
+        raise
+    if durable:
+        _fsync_directory(directory)
+
+
+@contextlib.contextmanager
+def output_stream(path: str) -> Iterator[BinaryIO]:
+    """Binary stdout for ``-``, otherwise ``atomic_write(path)``."""
+    if path == '-':
+        import click
+
+        stdout = click.get_binary_stream('stdout')
+        yield stdout
+        stdout.flush()
+    else:
+        with atomic_write(path) as file:
+            yield file
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import contextlib
+import io
+import os
+import sys
+import threading
+import traceback
+from collections.abc import Iterator
+from collections.abc import Mapping
+from collections.abc import Sequence
+from typing import Any
+from typing import BinaryIO
+
+# The working directory and os.environ are process-wide, so invocations that
+# change them must not overlap with any other invocation.
+_lock = threading.RLock()
+
+# Standard streams of the current invocation, per thread
+_local = threading.local()
+_install_lock = threading.Lock()
+_installed = 0
+
+
+class _StreamProxy:
+    """Stand-in for sys.stdin/stdout/stderr that routes to the calling thread's stream."""
+
+    def __init__(self, name: str, original: Any) -> None:
+        self._name = name
+        self._original = original
+
+    def _target(self) -> Any:
+        return getattr(_local, self._name, None) or self._original
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._target(), attr)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._target())
+
+
+@contextlib.contextmanager
+def _proxies_installed() -> Iterator[None]:
+    """Install the stream proxies for as long as any invocation is running."""
+    global _installed
+    with _install_lock:
+        if _installed == 0:
+            sys.stdin = _StreamProxy('stdin', sys.stdin)  # type: ignore[assignment]
+            sys.stdout = _StreamProxy('stdout', sys.stdout)  # type: ignore[assignment]
+            sys.stderr = _StreamProxy('stderr', sys.stderr)  # type: ignore[assignment]
+        _installed += 1
+    try:
+        yield
+    finally:
+        with _install_lock:
+            _installed -= 1
+            if _installed == 0:
+                for name in ('stdin', 'stdout', 'stderr'):
+                    stream = getattr(sys, name)
+                    if isinstance(stream, _StreamProxy):
+                        setattr(sys, name, stream._original)
+
+
+def exit_code(code: object) -> int:
+    """Translate a SystemExit code into a process exit status."""
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+@contextlib.contextmanager
+def _redirected(stdin: BinaryIO, stdout: BinaryIO, stderr: BinaryIO) -> Iterator[None]:
+    """Point this thread's sys.stdin/stdout/stderr at the given binary streams."""
+    text_in = io.TextIOWrapper(stdin, encoding='utf-8')
+    text_out = io.TextIOWrapper(stdout, encoding='utf-8', errors='backslashreplace', write_through=True)
+    text_err = io.TextIOWrapper(stderr, encoding='utf-8', errors='backslashreplace', write_through=True)
+    saved = [getattr(_local, name, None) for name in ('stdin', 'stdout', 'stderr')]
+    with _proxies_installed():
+        _local.stdin, _local.stdout, _local.stderr = text_in, text_out, text_err
+        try:
+            yield
+        finally:
+            _local.stdin, _local.stdout, _local.stderr = saved
+            for stream in (text_out, text_err):
+                stream.flush()
+            # Detach so the caller's binary streams are not closed with the wrappers
+            for stream in (text_in, text_out, text_err):
+                stream.detach()
+
+
+@contextlib.contextmanager
+def _working_dir(cwd: str | None) -> Iterator[None]:
+    """Temporarily change the working directory."""
+    if cwd is None:
+        yield
+        return
+    saved = os.getcwd()
+    os.chdir(cwd)
+    try:
+        yield
+    finally:
+        os.chdir(saved)
+
+
+@contextlib.contextmanager
+def _environ(env: Mapping[str, str] | None) -> Iterator[None]:
+    """Temporarily replace the process environment."""
+    if env is None:
+        yield
+        return
+    saved = dict(os.environ)
+    os.environ.clear()
+    os.environ.update(env)
+    try:
+        yield
+    finally:
+        os.environ.clear()
+        os.environ.update(saved)
+
+
+def run_command(
+    argv: Sequence[str], stdin: BinaryIO, stdout: BinaryIO, stderr: BinaryIO,
+    cwd: str | None = None, env: Mapping[str, str] | None = None,
+) -> int:
+    """Run a nox command line in this process and return its exit status.
+
+    Backend clients are shared through nox.utils.clients, so repeated
+    invocations reuse the connections created by earlier ones. Invocations
+    without ``cwd``/``env`` may run concurrently from several threads.
+    """
+    from nox.main import cli
+    from nox.utils.profiling import skip_startup
+
+    # The process started long before this command, so startup time is not its cost
+    skip_startup()
+    exclusive = _lock if cwd is not None or env is not None else contextlib.nullcontext()
+    with exclusive, _redirected(stdin, stdout, stderr), _working_dir(cwd), _environ(env):
+        try:
+            cli.main(args=list(argv), prog_name='nox', standalone_mode=True)
+        except SystemExit as e:
+            return exit_code(e.code)
+        except Exception:
+            traceback.print_exc()
+            return 1
+    return 0
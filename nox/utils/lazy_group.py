@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import click
+
+from nox.plugins import NoxPlugin
+from nox.plugins.manifest import load_object
+from nox.utils.profiling import span
+
+
+class LazyGroup(click.Group):
+    """A click group that imports its subcommands only when they are used.
+
+    ``lazy_subcommands`` maps a command name to the dotted import path of
+    the click command object, e.g. ``{'s3': 'nox.commands.s3_commands.s3'}``.
+    The path may also use entry point syntax (``module:attr``) and point to a
+    NoxPlugin, whose ``register_commands`` then adds its commands to the group.
+    """
+
+    def __init__(self, *args, lazy_subcommands: dict[str, str] | None = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.lazy_subcommands = dict(lazy_subcommands or {})
+
+    def list_commands(self, ctx: click.Context) -> list[str]:
+        """List eager and lazy commands without importing anything."""
+        return sorted({*super().list_commands(ctx), *self.lazy_subcommands})
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> click.Command | None:
+        """Return the command, importing its module on first use."""
+        import_path = self.lazy_subcommands.get(cmd_name)
+        if import_path is not None:
+            return self._lazy_load(cmd_name, import_path)
+        return super().get_command(ctx, cmd_name)
+
+    def _lazy_load(self, cmd_name: str, import_path: str) -> click.Command | None:
+        """Import the command object and register it as a regular command."""
+        with span(f"import {import_path.rsplit('.', 1)[0].split(':')[0]}", 'import'):
+            cmd_object = load_object(import_path)
+        if isinstance(cmd_object, NoxPlugin):
+            cmd_object.register_commands(self)
+            # A plugin may register several commands at once
+            for name, path in list(self.lazy_subcommands.items()):
+                if path == import_path and name in self.commands:
+                    self.lazy_subcommands.pop(name, None)
+            self.lazy_subcommands.pop(cmd_name, None)
+            return self.commands.get(cmd_name)
+        if not isinstance(cmd_object, click.Command):
+            raise ValueError(f"Lazy loading of {import_path} failed by returning a non-command object")
+        # Cache the loaded command so later lookups skip the import machinery
+        self.add_command(cmd_object, cmd_name)
+        self.lazy_subcommands.pop(cmd_name, None)
+        return cmd_object
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import os
+import stat
+
+
+def runtime_dir(create: bool = False) -> str:
+    """Directory for sockets and other per-session files, private to the user."""
+    base = os.environ.get('XDG_RUNTIME_DIR')
+    # Avoid tempfile here: the thin daemon client imports this module on every call
+    tmp = os.environ.get('TMPDIR') or '/tmp'
+    path = os.path.join(base, 'nox') if base else os.path.join(tmp, f"nox-{os.getuid()}")
+    if create:
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        check_private_dir(path)
+    return path
+
+
+def check_private_dir(path: str) -> None:
+    """Raise PermissionError unless ``path`` is a directory only the current user can use.
+
+    The default runtime dir sits in the shared /tmp when XDG_RUNTIME_DIR is
+    unset, where another user could have created it first, or planted a
+    symlink, to receive the environment that ``noxc`` forwards.
+    """
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode):
+        raise PermissionError(f"{path} is not a directory")
+    if info.st_uid != os.getuid():
+        raise PermissionError(f"{path} is owned by another user")
+    if stat.S_IMODE(info.st_mode) != 0o700:
+        raise PermissionError(f"{path} must have mode 0700, not {stat.S_IMODE(info.st_mode):04o}")
+
+
+def daemon_socket_path() -> str:
+    """Path of the nox daemon socket, overridable with NOX_DAEMON_SOCKET."""
+    return os.environ.get('NOX_DAEMON_SOCKET') or os.path.join(runtime_dir(), 'daemon.sock')
+
+
+def cache_dir(create: bool = False) -> str:
+    """Per-user cache directory ($XDG_CACHE_HOME/nox or ~/.cache/nox)."""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    path = os.path.join(base, 'nox')
+    if create:
+        os.makedirs(path, mode=0o700, exist_ok=True)
+    return path
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+
+def worker_count(jobs: int | None = None) -> int:
+    """Number of worker processes to use, all usable cores by default."""
+    if jobs:
+        return jobs
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def process_pool(
+    jobs: int, initializer: Callable[..., Any] | None = None, initargs: tuple = (),
+) -> ProcessPoolExecutor:
+    """Process pool that is safe to start from the daemon's worker threads.
+
+    Forking a multi-threaded process can copy locks held by other threads,
+    so workers come from a forkserver where the platform has one.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else None)
+    return ProcessPoolExecutor(max_workers=jobs, mp_context=context, initializer=initializer, initargs=initargs)
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import os
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from typing import Any
+
+# Fallback for the process start when /proc is not available
+_IMPORTED_AT = time.perf_counter()
+_startup_reported = False
+
+# Profiler of the current invocation; each daemon or batch thread has its own
+_active: contextvars.ContextVar[Profiler | None] = contextvars.ContextVar('nox_profiler', default=None)
+_NULL_SPAN = contextlib.nullcontext()
+
+PHASES = ('import', 'init', 'backend', 'render')
+
+
+class Span:
+    __slots__ = ('name', 'category', 'start', 'duration', 'depth', 'thread')
+
+    def __init__(self, name: str, category: str, start: float, duration: float = 0.0, depth: int = 0, thread: int = 0) -> None:
+        self.name = name
+        self.category = category
+        self.start = start
+        self.duration = duration
+        self.depth = depth
+        self.thread = thread
+
+
+def _process_start() -> float:
+    """perf_counter() value at which the interpreter process started."""
+    try:
+        with open('/proc/self/stat') as file:
+            # The command name may contain spaces, so count fields after it
+            start_ticks = int(file.read().rsplit(')', 1)[1].split()[19])
+        since_start = time.clock_gettime(time.CLOCK_BOOTTIME) - start_ticks / os.sysconf('SC_CLK_TCK')
+        return time.perf_counter() - since_start
+    except (OSError, ValueError, IndexError, AttributeError):
+        return _IMPORTED_AT
+
+
+class Profiler:
+    """Collect named timing spans for one nox invocation."""
+
+    def __init__(self) -> None:
+        self.origin = time.perf_counter()
+        self.spans: list[Span] = []
+        self.end: float | None = None
+        self._depth = 0
+
+    @contextlib.contextmanager
+    def span(self, name: str, category: str = 'call') -> Iterator[Span]:
+        """Time the enclosed block."""
+        record = Span(name, category, time.perf_counter(), depth=self._depth, thread=threading.get_ident())
+        self.spans.append(record)
+        self._depth += 1
+        try:
+            yield record
+        finally:
+            self._depth -= 1
+            record.duration = time.perf_counter() - record.start
+
+    def add(self, name: str, category: str, start: float, end: float) -> None:
+        """Record a span measured elsewhere."""
+        self.spans.append(Span(name, category, start, end - start, thread=threading.get_ident()))
+
+    @property
+    def wall(self) -> float:
+        return (self.end or time.perf_counter()) - self.origin
+
+    def summary(self) -> str:
+        """Table of the spans in start order plus the time spent per phase."""
+        wall = self.wall
+        rows = [f"{'phase':<8} {'span':<44} {'ms':>10} {'%':>6}"]
+        for record in sorted(self.spans, key=lambda item: item.start):
+            name = '  ' * record.depth + record.name
+            rows.append(
+                f"{record.category:<8} {name[:44]:<44} {record.duration * 1000:>10.2f} "
+                f"{record.duration / wall * 100 if wall else 0:>6.1f}",
+            )
+        rows.append('-' * len(rows[0]))
+        for phase in PHASES:
+            # Nested spans of the same phase are already part of their parent
+            total = sum(
+                record.duration for record in self.spans
+                if record.category == phase and not self._nested_in_phase(record)
+            )
+            if total:
+                rows.append(f"{phase:<8} {'(total)':<44} {total * 1000:>10.2f} {total / wall * 100 if wall else 0:>6.1f}")
+        rows.append(f"{'wall':<8} {'':<44} {wall * 1000:>10.2f} {100.0:>6.1f}")
+        return '\n'.join(rows)
+
+    def _nested_in_phase(self, record: Span) -> bool:
+        return any(
+            other is not record and other.category == record.category and other.thread == record.thread and
+            other.depth < record.depth and
+            other.start <= record.start <= record.start + record.duration <= other.start + other.duration
+            for other in self.spans
+        )
+
+    def chrome_trace(self) -> dict[str, Any]:
+        """Spans in the Chrome trace event format (chrome://tracing, Perfetto)."""
+        pid = os.getpid()
+        events = [
+            {
+                'name': record.name, 'cat': record.category, 'ph': 'X', 'pid': pid, 'tid': record.thread,
+                'ts': round((record.start - self.origin) * 1e6, 3), 'dur': round(record.duration * 1e6, 3),
+            }
+            for record in self.spans
+        ]
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def skip_startup() -> None:
+    """Leave process startup out of later profiles (daemon and batch invocations)."""
+    global _startup_reported
+    _startup_reported = True
+
+
+def span(name: str, category: str = 'call') -> contextlib.AbstractContextManager[Any]:
+    """Time a block when ``--profile`` is active; a shared no-op otherwise."""
+    profiler = _active.get()
+    if profiler is None:
+        return _NULL_SPAN
+    return profiler.span(name, category)
+
+
+@contextlib.contextmanager
+def profiling(output: str | None = None) -> Iterator[Profiler]:
+    """Profile the enclosed invocation and print the summary to stderr.
+
+    ``output`` additionally saves a Chrome trace when it ends in ``.json``
+    and cProfile statistics (readable with pstats) otherwise.
+    """
+    global _startup_reported
+    profiler = Profiler()
+    if not _startup_reported:
+        # Interpreter start and nox.main imports, only meaningful for the first command of a process
+        _startup_reported = True
+        start = min(_process_start(), profiler.origin)
+        profiler.add('interpreter and nox.main', 'import', start, profiler.origin)
+        profiler.origin = start
+    cprofile = None
+    if output and not output.endswith('.json'):
+        import cProfile
+        cprofile = cProfile.Profile()
+    token = _active.set(profiler)
+    if cprofile:
+        cprofile.enable()
+    try:
+        yield profiler
+    finally:
+        if cprofile:
+            cprofile.disable()
+        _active.reset(token)
+        profiler.end = time.perf_counter()
+        print(profiler.summary(), file=sys.stderr, flush=True)
+        if cprofile and output:
+            cprofile.dump_stats(output)
+        elif output:
+            import json
+
+            with open(output, 'w') as file:
+                json.dump(profiler.chrome_trace(), file)
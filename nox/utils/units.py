@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import re
+
+import click
+
+_SIZE = re.compile(r'(?P<number>\d+(?:\.\d+)?)\s*(?P<unit>[KMGT]?)(?P<binary>i?)B?', re.IGNORECASE)
+
+
+def parse_size(text: str) -> int:
+    """Bytes in a size such as ``8388608``, ``8MiB``, ``8M`` or ``1.5GB``.
+
+    Both ``8M`` and ``8MiB`` mean 8 * 1024**2, as in most storage tools;
+    ``MB`` with a ``B`` but no ``i`` means 8 * 1000**2.
+    """
+    match = _SIZE.fullmatch(text.strip())
+    if match is None:
+        raise ValueError(f"Invalid size: {text!r}")
+    unit = match.group('unit').upper()
+    decimal = bool(unit) and not match.group('binary') and text.strip()[-1:] in 'bB'
+    power = 'KMGT'.index(unit) + 1 if unit else 0
+    return int(float(match.group('number')) * (1000 if decimal else 1024) ** power)
+
+
+class ByteSize(click.ParamType):
+    name = 'size'
+
+    def convert(self, value, param, ctx):
+        if isinstance(value, int):
+            return value
+        try:
+            return parse_size(value)
+        except ValueError as e:
+            self.fail(str(e), param, ctx)
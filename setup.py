@@ -26,7 +26,6 @@ setup(
         'cryptography',
         'boto3',
         'SQLAlchemy',
-        'rsa',
         'requests',
         'python-whois',
         'types-requests',
@@ -41,9 +40,15 @@ setup(
         'redis',
 
     ],
+    extras_require={
+        'blake3': ['blake3'],
+        'lz4': ['lz4'],
+        'zstd': ['zstandard'],
+    },
     entry_points='''
         [console_scripts]
         nox=nox.main:cli
+        noxc=nox.client:main
     ''',
     classifiers=[
         'Programming Language :: Python :: 3',
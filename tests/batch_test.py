@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from nox.commands.batch_commands import batch
+from nox.domains.batch_runner import BatchRunner
+
+
+def test_parse_entries_formats():
+    lines = [
+        '# comment',
+        '["gen", "uuid4"]',
+        '{"id": "b64", "cmd": "encrypt base64 --text hi"}',
+        'nox datetime add --date 2024-09-10 --days 1',
+        '',
+    ]
+    entries = list(BatchRunner.parse_entries(lines))
+    assert [e.argv for e in entries] == [
+        ['gen', 'uuid4'],
+        ['encrypt', 'base64', '--text', 'hi'],
+        ['datetime', 'add', '--date', '2024-09-10', '--days', '1'],
+    ]
+    assert entries[1].id == 'b64'
+    assert [e.index for e in entries] == [0, 1, 2]
+
+
+def test_parse_entries_rejects_invalid_json():
+    with pytest.raises(ValueError):
+        list(BatchRunner.parse_entries(['{"argv": ']))
+
+
+@pytest.mark.parametrize('jobs', [1, 4])
+def test_batch_reports_results_in_order(jobs):
+    lines = [
+        json.dumps({'id': i, 'argv': ['datetime', 'add', '--date', '2024-09-10', '--days', str(i)]})
+        for i in range(12)
+    ]
+    runner = CliRunner()
+    result = runner.invoke(batch, ['--jobs', str(jobs)], input='\n'.join(lines))
+    assert result.exit_code == 0
+    results = [json.loads(line) for line in result.output.splitlines()]
+    assert [r['id'] for r in results] == list(range(12))
+    assert results[5]['stdout'] == '2024-09-15 00:00:00\n'
+    assert all(r['exit_code'] == 0 for r in results)
+
+
+def test_batch_forwards_stdin_and_failures(tmp_path):
+    batch_file = tmp_path / 'cmds.jsonl'
+    batch_file.write_text(
+        '{"argv": ["encrypt", "base64", "--input", "-"], "stdin": "hello"}\n'
+        '["no-such-command"]\n',
+    )
+    runner = CliRunner()
+    result = runner.invoke(batch, ['--file', str(batch_file)])
+    assert result.exit_code == 1
+    first, second = (json.loads(line) for line in result.output.splitlines())
+    assert 'aGVsbG8=' in first['stdout']
+    assert second['exit_code'] == 2
+    assert 'No such command' in second['stderr']
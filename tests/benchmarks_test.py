@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from benchmarks import harness
+from benchmarks.__main__ import main
+
+
+def test_measure_reports_throughput_and_percentiles():
+    result = harness.measure(lambda: sum(range(100)), bytes_per_op=1000, min_time=0.01)
+    assert result['ops_per_sec'] > 0
+    assert result['p50_us'] <= result['p90_us'] <= result['p99_us']
+    assert result['mb_per_sec'] == pytest.approx(result['ops_per_sec'] * 1000 / 1e6)
+    assert result['samples'] >= 5
+
+
+def test_compare_flags_regressions():
+    baseline = {'results': {'a': {'ops_per_sec': 100.0}, 'b': {'ops_per_sec': 100.0}}}
+    current = {'results': {'a': {'ops_per_sec': 95.0}, 'b': {'ops_per_sec': 80.0}, 'new': {'ops_per_sec': 1.0}}}
+    rows = {row['name']: row for row in harness.compare(current, baseline, threshold=0.1)}
+    assert set(rows) == {'a', 'b'}
+    assert not rows['a']['regressed']
+    assert rows['b']['regressed']
+
+
+def test_throughput_table_pivots_algorithms_by_size():
+    results = {
+        'hash.a': {'mb_per_sec': 10.0, 'algorithm': 'md5', 'size': 1024},
+        'hash.b': {'mb_per_sec': 20.0, 'algorithm': 'md5', 'size': 64},
+        'hash.c': {'mb_per_sec': 5.0, 'algorithm': 'sha256', 'size': 1024},
+        'hash.d': {'skipped': 'blake3 is not installed', 'algorithm': 'blake3', 'size': 64},
+        'uuid.e': {'mb_per_sec': 1.0, 'algorithm': 'uuid4', 'size': 64},
+    }
+    sizes, rows = harness.throughput_table(results, 'hash.')
+    assert sizes == [64, 1024]
+    assert rows == {'md5': {1024: 10.0, 64: 20.0}, 'sha256': {1024: 5.0}}
+
+
+def test_cli_saves_results_and_fails_on_regression(tmp_path):
+    runner = CliRunner()
+    output = tmp_path / 'results.json'
+    result = runner.invoke(main, ['--filter', 'uuid.generate_uuid4', '--min-time', '0.01', '--output', str(output)])
+    assert result.exit_code == 0, result.output
+    document = json.loads(output.read_text())
+    assert list(document['results']) == ['uuid.generate_uuid4']
+    assert document['meta']['python']
+
+    document['results']['uuid.generate_uuid4']['ops_per_sec'] *= 1000
+    baseline = tmp_path / 'baseline.json'
+    baseline.write_text(json.dumps(document))
+    result = runner.invoke(main, ['--filter', 'uuid.generate_uuid4', '--min-time', '0.01', '--baseline', str(baseline)])
+    assert result.exit_code == 1
+    assert 'REGRESSION' in result.output
+
+
+def test_integration_commands_run_against_stand_ins(monkeypatch):
+    from benchmarks import integration
+    from benchmarks import standins
+    from nox.utils.clients import close_clients
+
+    monkeypatch.setenv('DOCKER_HOST', '')
+
+    database = standins.sqlite_database()
+    run = integration._warm(['db', 'query', '--db', database, '--query', 'SELECT name FROM items WHERE id = 1'])
+    assert run() == b"('item-0',)\n"
+
+    standins.docker_socket()
+    output = integration._warm(['docker', 'list', '--all'])()
+    assert output.count(b'Name: bench-') == 20
+    # Drop the clients bound to the stand-ins before other tests run
+    close_clients()
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from nox.utils import clients
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    clients.close_clients()
+    yield
+    clients.close_clients()
+
+
+def test_get_client_reuses_instances():
+    factory = MagicMock(side_effect=lambda: object())
+    first = clients.get_client('test', factory, 'localhost', 1)
+    second = clients.get_client('test', factory, 'localhost', 1)
+    other = clients.get_client('test', factory, 'localhost', 2)
+    assert first is second
+    assert first is not other
+    assert factory.call_count == 2
+
+
+def test_close_clients_closes_and_forgets():
+    client = MagicMock()
+    clients.get_client('test', lambda: client)
+    clients.close_clients()
+    client.close.assert_called_once()
+    assert clients.cached_clients() == []
+
+
+def test_importing_commands_creates_no_clients():
+    import nox.commands.kafka_commands  # noqa: F401
+    import nox.commands.redis_commands  # noqa: F401
+    assert clients.cached_clients() == []
+
+
+@patch('nox.domains.redis_manager.redis.Redis')
+def test_redis_settings_come_from_options(mock_redis):
+    from nox.commands.redis_commands import redis
+    mock_redis.return_value.get.return_value = b'value'
+    runner = CliRunner()
+    result = runner.invoke(redis, ['--host', 'cache.local', '--port', '6380', 'get-key', '--key', 'k'])
+    assert result.exit_code == 0
+    assert 'value' in result.output
+    mock_redis.assert_called_once_with(host='cache.local', port=6380, db=0)
+
+
+@patch('nox.domains.kafka_manager.AdminClient')
+def test_kafka_settings_come_from_environment(mock_admin):
+    from nox.commands.kafka_commands import kafka
+    mock_admin.return_value.list_topics.return_value.topics = {'orders': None}
+    runner = CliRunner()
+    result = runner.invoke(kafka, ['list-topics'], env={'NOX_KAFKA_BOOTSTRAP_SERVERS': 'broker:9093'})
+    assert result.exit_code == 0
+    assert 'orders' in result.output
+    mock_admin.assert_called_once_with({'bootstrap.servers': 'broker:9093'})
+
+
+def test_boto3_clients_follow_the_aws_environment(monkeypatch):
+    from nox.domains.s3_manager import S3Manager
+    monkeypatch.setenv('AWS_ACCESS_KEY_ID', 'first')
+    monkeypatch.setenv('AWS_SECRET_ACCESS_KEY', 'secret')
+    monkeypatch.setenv('AWS_DEFAULT_REGION', 'us-east-1')
+    first = S3Manager().s3
+    assert S3Manager().s3 is first
+
+    # As when the daemon serves a request from a shell with other settings
+    monkeypatch.setenv('AWS_ACCESS_KEY_ID', 'second')
+    monkeypatch.setenv('AWS_DEFAULT_REGION', 'eu-west-1')
+    second = S3Manager().s3
+    assert second is not first
+    assert second.meta.region_name == 'eu-west-1'
+    assert second._request_signer._credentials.access_key == 'second'
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+import time
+
+import pytest
+from click.shell_completion import ShellComplete
+
+from nox.domains.completion_cache import CompletionCache
+from nox.domains.completion_cache import posix_cksum
+from nox.domains.completion_generator import CompletionGenerator
+from nox.main import cli
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+    return CompletionCache()
+
+
+@pytest.mark.skipif(shutil.which('cksum') is None, reason='cksum is not installed')
+@pytest.mark.parametrize('value', ['', 'my-bucket', 'postgresql://user@host:5432/db'])
+def test_posix_cksum_matches_coreutils(value):
+    result = subprocess.run(['cksum'], input=value.encode(), capture_output=True, check=True)
+    assert posix_cksum(value.encode()) == int(result.stdout.split()[0])
+
+
+def test_write_and_read(cache, tmp_path):
+    cache.write('s3-objects', 'my-bucket', ['a.txt', 'b.txt'])
+    expiry, values = cache.read('s3-objects', 'my-bucket')
+    assert values == ['a.txt', 'b.txt']
+    assert time.time() < expiry <= time.time() + 60
+    assert cache.path('s3-objects', 'my-bucket').startswith(str(tmp_path / 'nox' / 'completion'))
+    assert cache.read('s3-objects', 'other-bucket') is None
+
+
+def test_fresh_values_do_not_refresh(cache, monkeypatch):
+    cache.write('docker-containers', '', ['web', 'worker'])
+    monkeypatch.setattr(cache, 'refresh_in_background', lambda *args: pytest.fail('refreshed fresh cache'))
+    assert cache.values('docker-containers') == ['web', 'worker']
+
+
+def test_stale_values_are_served_while_refreshing(cache, monkeypatch):
+    cache.write('docker-containers', '', ['web'])
+    path = cache.path('docker-containers')
+    with open(path) as file:
+        lines = file.read().splitlines()
+    with open(path, 'w') as file:
+        file.write('\n'.join(['0', *lines[1:]]) + '\n')
+    refreshed = []
+    monkeypatch.setattr(cache, 'refresh_in_background', lambda *args: refreshed.append(args))
+    assert cache.values('docker-containers') == ['web']
+    assert refreshed == [('docker-containers', '')]
+
+
+def test_refresh_uses_source_and_caches_failures(cache, monkeypatch):
+    from nox.domains import completion_cache
+
+    monkeypatch.setitem(completion_cache.SOURCES, 'redis-keys', (30, lambda scope: [f"{scope}:key"]))
+    assert cache.refresh('redis-keys', 'cache-host') == ['cache-host:key']
+    assert cache.read('redis-keys', 'cache-host')[1] == ['cache-host:key']
+
+    def fail(scope):
+        raise ConnectionError('unreachable')
+
+    monkeypatch.setitem(completion_cache.SOURCES, 'redis-keys', (30, fail))
+    with pytest.raises(ConnectionError):
+        cache.refresh('redis-keys')
+    assert cache.read('redis-keys')[1] == []
+    assert not os.path.exists(cache.path('redis-keys') + '.lock')
+
+
+def test_click_completion_uses_cache(cache):
+    cache.write('s3-objects', 'my-bucket', ['logs/a.txt', 'data.csv'])
+    complete = ShellComplete(cli, {}, 'nox', '_NOX_COMPLETE')
+    items = complete.get_completions(['s3', 'download', '--bucket', 'my-bucket', '--file'], 'lo')
+    assert [item.value for item in items] == ['logs/a.txt']
+
+
+@pytest.mark.skipif(shutil.which('bash') is None, reason='bash is not installed')
+def test_bash_script_reads_cache_without_python(cache, tmp_path):
+    cache.write('kafka-topics', 'broker:9092', ['orders', 'payments'])
+    cache.write('docker-containers', '', ['web'])
+    docker_path = cache.path('docker-containers')
+    with open(docker_path) as file:
+        lines = file.read().splitlines()
+    with open(docker_path, 'w') as file:
+        file.write('\n'.join(['0', *lines[1:]]) + '\n')
+
+    # A fake nox records the background refresh of the stale entry
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    marker = tmp_path / 'refreshed'
+    (bin_dir / 'nox').write_text(f"#!/bin/sh\necho \"$@\" > {marker}\n")
+    (bin_dir / 'nox').chmod(0o755)
+
+    script = tmp_path / 'nox.bash'
+    script.write_text(CompletionGenerator(cli).render('bash'))
+    driver = f"""
+source {script}
+comp() {{
+    COMP_LINE="$*"; COMP_WORDS=("$@"); COMP_CWORD=$((${{#COMP_WORDS[@]}}-1)); COMPREPLY=()
+    _nox_complete; echo "${{COMPREPLY[*]}}"
+}}
+comp nox kafka --bootstrap-servers broker:9092 produce --topic o
+comp nox docker stop --name ''
+"""
+    env = {**os.environ, 'PATH': f"{bin_dir}:{os.environ['PATH']}"}
+    result = subprocess.run(['bash', '-c', driver], capture_output=True, text=True, check=True, env=env)
+    assert result.stdout.splitlines() == ['orders', 'web']
+    for _ in range(50):
+        if marker.exists() and marker.read_text():
+            break
+        time.sleep(0.05)
+    assert marker.read_text().split() == ['completion', 'refresh', 'docker-containers']
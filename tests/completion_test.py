@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import shutil
+import subprocess
+
+import pytest
+
+from nox.domains.completion_generator import CompletionGenerator
+from nox.domains.Initializer import NoxInitializer
+from nox.main import cli
+
+
+@pytest.fixture(scope='module')
+def generator():
+    return CompletionGenerator(cli)
+
+
+def test_collect_includes_commands_options_and_choices(generator):
+    nodes = {node.path: node for node in generator.nodes}
+    assert {'s3', 'redis', 'gen'} <= set(nodes[''].commands)
+    options = {name: option for option in nodes['hash generate'].options for name in option.names}
+    assert options['--algorithm'].choices[:3] == ['md5', 'sha256', 'sha512']
+    assert 'blake2b' in options['--algorithm'].choices
+
+
+@pytest.mark.parametrize('shell', ['bash', 'zsh', 'fish'])
+def test_render_contains_no_runtime_completion(generator, shell):
+    script = generator.render(shell, stamp='/installed/METADATA')
+    assert '_NOX_COMPLETE' not in script
+    assert '/installed/METADATA' in script
+    assert 'sha512' in script
+
+
+@pytest.mark.skipif(shutil.which('bash') is None, reason='bash is not installed')
+def test_bash_completion_is_served_statically(generator, tmp_path):
+    script = tmp_path / 'nox.bash'
+    script.write_text(generator.render('bash'))
+    driver = f"""
+source {script}
+comp() {{ COMP_WORDS=("$@"); COMP_CWORD=$((${{#COMP_WORDS[@]}}-1)); COMPREPLY=(); _nox_complete; echo "${{COMPREPLY[*]}}"; }}
+comp nox s
+comp nox hash generate --algorithm sha
+comp nox redis --
+"""
+    result = subprocess.run(['bash', '-c', driver], capture_output=True, text=True, check=True)
+    assert result.stdout.splitlines() == ['s3 secrets', 'sha256 sha512 sha3_256 sha3_512', '--host --port --db --help']
+
+
+def test_initializer_writes_static_script(tmp_path, monkeypatch):
+    monkeypatch.setenv('HOME', str(tmp_path))
+    initializer = NoxInitializer('bash')
+    initializer.generate_completion_script()
+    initializer.update_rc_file()
+    script = (tmp_path / '.nox-complete-bash.sh').read_text()
+    assert 'complete -o default -F _nox_complete nox noxc' in script
+    assert f"source {tmp_path / '.nox-complete-bash.sh'}" in (tmp_path / '.bashrc').read_text()
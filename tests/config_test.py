@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import os
+
+import pytest
+from click.testing import CliRunner
+
+from nox.config.loader import ConfigLoader
+from nox.main import cli
+
+
+@pytest.fixture
+def layers(tmp_path, monkeypatch):
+    home = tmp_path / 'home'
+    project = tmp_path / 'work' / 'project'
+    nested = project / 'src'
+    nested.mkdir(parents=True)
+    home.mkdir()
+    system = tmp_path / 'system.toml'
+    system.write_text('[redis]\nhost = "system-redis"\nport = 6000\n\n[aws]\nregion = "eu-west-1"\n')
+    (home / '.nox.toml').write_text(
+        '[redis]\nhost = "user-redis"\n\n[profiles.staging.redis]\nhost = "staging-redis"\n',
+    )
+    (project / '.nox.toml').write_text('[kafka]\nbootstrap_servers = "project:9092"\n')
+    monkeypatch.setenv('HOME', str(home))
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    monkeypatch.setenv('NOX_SYSTEM_CONFIG', str(system))
+    for name in ('NOX_REDIS_HOST', 'NOX_REDIS_PORT', 'NOX_CONFIG_PROFILE', 'NOX_KAFKA_BOOTSTRAP_SERVERS'):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.chdir(nested)
+    return tmp_path
+
+
+def test_layers_merge_in_order(layers):
+    config = ConfigLoader().load()
+    assert config.get('redis.host') == 'user-redis'
+    assert config.get('redis.port') == 6000
+    assert config.get('kafka.bootstrap_servers') == 'project:9092'
+    assert config.get('db.url', 'fallback') == 'fallback'
+    assert len(config.sources) == 3
+
+
+def test_profile_and_environment_override(layers, monkeypatch):
+    assert ConfigLoader().load('staging').get('redis.host') == 'staging-redis'
+    monkeypatch.setenv('NOX_REDIS_HOST', 'env-redis')
+    assert ConfigLoader().load('staging').get('redis.host') == 'env-redis'
+    with pytest.raises(ValueError, match='Unknown config profile'):
+        ConfigLoader().load('missing')
+
+
+def test_compiled_cache_tracks_mtimes(layers, monkeypatch):
+    parsed = []
+    parse = ConfigLoader.parse
+    monkeypatch.setattr(ConfigLoader, 'parse', staticmethod(lambda path: parsed.append(path) or parse(path)))
+    assert ConfigLoader().load().get('redis.host') == 'user-redis'
+    assert len(parsed) == 3
+    assert ConfigLoader().load().get('redis.host') == 'user-redis'
+    assert len(parsed) == 3
+
+    user_file = layers / 'home' / '.nox.toml'
+    user_file.write_text('[redis]\nhost = "edited-redis"\n')
+    stat = os.stat(user_file)
+    os.utime(user_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert ConfigLoader().load().get('redis.host') == 'edited-redis'
+    assert len(parsed) == 6
+
+
+def test_cli_options_use_config(layers, monkeypatch):
+    from nox.domains import redis_manager
+
+    created = []
+    monkeypatch.setattr(redis_manager.RedisManager, '__init__', lambda self, **kwargs: created.append(kwargs))
+    monkeypatch.setattr(redis_manager.RedisManager, 'get_key', lambda self, key: None, raising=False)
+    runner = CliRunner()
+    runner.invoke(cli, ['--config-profile', 'staging', 'redis', 'get-key', '--key', 'k'])
+    runner.invoke(cli, ['redis', '--host', 'cli-redis', 'get-key', '--key', 'k'])
+    assert created == [
+        {'host': 'staging-redis', 'port': 6000, 'db': 0},
+        {'host': 'cli-redis', 'port': 6000, 'db': 0},
+    ]
+
+
+def test_config_show(layers):
+    result = CliRunner().invoke(cli, ['config', 'show', '--sources'])
+    assert result.exit_code == 0
+    assert 'redis.host = "user-redis"' in result.output
+    assert 'aws.region = "eu-west-1"' in result.output
+    assert result.output.count('# ') == 3
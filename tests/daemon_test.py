@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import io
+import os
+import threading
+import time
+
+import pytest
+
+from nox.client import connect
+from nox.client import forward
+from nox.client import request
+from nox.utils.daemon import NoxDaemon
+from nox.utils.paths import check_private_dir
+
+
+@pytest.fixture
+def daemon_socket(tmp_path):
+    socket_path = str(tmp_path / 'd.sock')
+    daemon = NoxDaemon(socket_path)
+    daemon.preload = lambda: None  # importing every command is not needed here
+    thread = threading.Thread(target=daemon.serve, daemon=True)
+    thread.start()
+    for _ in range(200):
+        try:
+            connect(socket_path).close()
+            break
+        except OSError:
+            time.sleep(0.01)
+    yield socket_path
+    with connect(socket_path) as sock:
+        request(sock, {'control': 'stop'})
+    thread.join(timeout=5)
+
+
+def _run(socket_path, argv, stdin=b''):
+    stdout, stderr = io.BytesIO(), io.BytesIO()
+    with connect(socket_path) as sock:
+        code = forward(sock, argv, io.BytesIO(stdin), stdout, stderr)
+    return code, stdout.getvalue().decode(), stderr.getvalue().decode()
+
+
+def test_daemon_runs_commands(daemon_socket):
+    code, out, _ = _run(daemon_socket, ['gen', 'uuid4'])
+    assert code == 0
+    assert out.startswith('UUID4: ')
+
+
+def test_daemon_forwards_stdin(daemon_socket):
+    code, out, _ = _run(daemon_socket, ['encrypt', 'base64', '--input', '-'], stdin=b'hello')
+    assert code == 0
+    assert 'aGVsbG8=' in out
+
+
+def test_daemon_forwards_exit_status(daemon_socket):
+    code, _, err = _run(daemon_socket, ['no-such-command'])
+    assert code == 2
+    assert 'No such command' in err
+
+
+def test_daemon_status(daemon_socket):
+    _run(daemon_socket, ['gen', 'uuid4'])
+    with connect(daemon_socket) as sock:
+        info = request(sock, {'control': 'status'})
+    assert info['pid'] == os.getpid()
+    assert info['requests'] == 1
+
+
+def test_socket_directory_must_be_private(tmp_path):
+    private = tmp_path / 'private'
+    private.mkdir(mode=0o700)
+    check_private_dir(str(private))
+
+    shared = tmp_path / 'shared'
+    shared.mkdir()
+    shared.chmod(0o755)
+    link = tmp_path / 'link'
+    link.symlink_to(private)
+    for directory in (shared, link):
+        with pytest.raises(PermissionError):
+            check_private_dir(str(directory))
+        with pytest.raises(PermissionError):
+            connect(str(directory / 'd.sock'))
+        with pytest.raises(PermissionError):
+            NoxDaemon(str(directory / 'd.sock')).serve()
+
+    if os.getuid() == 0:
+        os.chown(private, 65534, -1)
+        with pytest.raises(PermissionError, match='another user'):
+            check_private_dir(str(private))
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import json
+import os
+
+import pytest
+from click.testing import CliRunner
+from cryptography.fernet import Fernet
+from cryptography.fernet import InvalidToken
+
+from nox.commands.encrypt_commands import encrypt
+from nox.domains.encrypt import fernet_decrypt
+from nox.domains.encrypt import fernet_encrypt
+from nox.domains.encrypt_rotate import KeyRotation
+
+
+@pytest.fixture
+def keys():
+    return Fernet.generate_key(), Fernet.generate_key(), Fernet.generate_key()
+
+
+@pytest.fixture
+def tree(tmp_path, keys):
+    old, older, _ = keys
+    root = tmp_path / 'secrets'
+    (root / 'sub').mkdir(parents=True)
+    (root / 'a').write_bytes(Fernet(old).encrypt_at_time(b'a', 1000) + b'\n')
+    (root / 'b').write_bytes(Fernet(older).encrypt(b'b'))
+    (root / 'sub' / 'c').write_bytes(Fernet(old).encrypt(b'c'))
+    return root
+
+
+def statuses(results):
+    return {os.path.basename(path): status for path, status, _ in results}
+
+
+def test_rotates_to_the_new_key(tmp_path, tree, keys):
+    old, older, new = keys
+    checkpoint = str(tmp_path / 'journal')
+    results = list(KeyRotation(new, [old, older], checkpoint_path=checkpoint).run([str(tree)]))
+    assert statuses(results) == {'a': 'rotated', 'b': 'rotated', 'c': 'rotated'}
+    assert not os.path.exists(checkpoint)
+
+    token = (tree / 'a').read_bytes()
+    assert token.endswith(b'\n')
+    assert Fernet(new).decrypt(token) == b'a'
+    assert Fernet(new).extract_timestamp(token) == 1000
+    with pytest.raises(InvalidToken):
+        Fernet(old).decrypt(token)
+    assert Fernet(new).decrypt((tree / 'b').read_bytes()) == b'b'
+
+    again = KeyRotation(new, [old], checkpoint_path=checkpoint).run([str(tree)])
+    assert statuses(again) == {'a': 'current', 'b': 'current', 'c': 'current'}
+
+
+def test_rotated_files_are_synced_before_the_journal(tmp_path, tree, keys, monkeypatch):
+    old, _, new = keys
+    checkpoint = tmp_path / 'journal'
+    events = []
+    fsync = os.fsync
+    monkeypatch.setattr(os, 'fsync', lambda fd: events.append('fsync') or fsync(fd))
+    for _ in KeyRotation(new, [old], checkpoint_path=str(checkpoint)).run([str(tree)]):
+        events.append(len(checkpoint.read_text().splitlines()))
+    # File and directory are synced before each rotated file is journaled; b fails
+    assert events == ['fsync', 'fsync', 1, 1, 'fsync', 'fsync', 2]
+
+
+def test_resumes_from_checkpoint(tmp_path, tree, keys):
+    old, older, new = keys
+    checkpoint = tmp_path / 'journal'
+    rotation = KeyRotation(new, [old, older], checkpoint_path=str(checkpoint))
+    first = rotation.run([str(tree)])
+    next(first)
+    first.close()
+    # Simulate a crash in the middle of writing the next entry
+    with open(checkpoint, 'a') as journal:
+        journal.write('["/trunc')
+    assert len(KeyRotation.load_checkpoint(str(checkpoint))) == 1
+
+    results = statuses(rotation.run([str(tree)]))
+    assert results == {'a': 'resumed', 'b': 'rotated', 'c': 'rotated'}
+    assert not checkpoint.exists()
+
+
+def test_failures_keep_the_journal(tmp_path, tree, keys):
+    old, older, new = keys
+    (tree / 'plain').write_bytes(b'not a token')
+    checkpoint = tmp_path / 'journal'
+    results = list(KeyRotation(new, [old], checkpoint_path=str(checkpoint)).run([str(tree)]))
+    assert statuses(results) == {'a': 'rotated', 'b': 'failed', 'c': 'rotated', 'plain': 'failed'}
+    assert (tree / 'plain').read_bytes() == b'not a token'
+    assert Fernet(older).decrypt((tree / 'b').read_bytes()) == b'b'
+    done = [json.loads(line)[0] for line in checkpoint.read_text().splitlines()]
+    assert sorted(os.path.basename(path) for path in done) == ['a', 'c']
+
+    results = statuses(KeyRotation(new, [old, older], checkpoint_path=str(checkpoint)).run([str(tree)]))
+    assert results['a'] == results['c'] == 'resumed'
+    assert results['b'] == 'rotated'
+
+
+def test_rotates_compressed_output(tmp_path, keys):
+    old, _, new = keys
+    path = tmp_path / 'logs'
+    path.write_bytes(fernet_encrypt(Fernet(old), b'log\n' * 100, 'gzip') + b'\n')
+    results = KeyRotation(new, [old], checkpoint_path=str(tmp_path / 'journal')).run([str(path)])
+    assert statuses(results) == {'logs': 'rotated'}
+    rotated = path.read_bytes()
+    assert rotated.startswith(b'NOXZ1') and rotated.endswith(b'\n')
+    assert fernet_decrypt(Fernet(new), rotated) == b'log\n' * 100
+
+
+def test_default_checkpoint_depends_on_key_and_paths(keys):
+    old, _, new = keys
+    rotation = KeyRotation(new, [old])
+    assert rotation.default_checkpoint(['x']) == rotation.default_checkpoint(['x'])
+    assert rotation.default_checkpoint(['x']) != rotation.default_checkpoint(['y'])
+    assert rotation.default_checkpoint(['x']) != KeyRotation(old, [new]).default_checkpoint(['x'])
+
+
+def test_bad_key_fails_before_any_file():
+    with pytest.raises(ValueError):
+        KeyRotation(b'short', [Fernet.generate_key()])
+
+
+def test_rotate_command(tmp_path, tree, keys):
+    paths = []
+    for name, key in zip(('old', 'older', 'new'), keys):
+        paths.append(tmp_path / f"{name}.key")
+        paths[-1].write_bytes(key)
+    old, older, new = (str(path) for path in paths)
+    checkpoint = str(tmp_path / 'journal')
+    runner = CliRunner()
+    args = ['rotate', str(tree), '--new-key', new, '--old-key', old, '--checkpoint', checkpoint]
+    result = runner.invoke(encrypt, args)
+    assert result.exit_code == 1
+    assert 'b: not a Fernet token for any of the keys' in result.output
+    assert '2 rotated, 0 already current, 0 done before, 1 failed' in result.output
+
+    result = runner.invoke(encrypt, [*args, '--old-key', older, '-j', '2'])
+    assert result.exit_code == 0, result.output
+    assert '1 rotated, 0 already current, 2 done before, 0 failed' in result.output
+
+    (tmp_path / 'bad.key').write_bytes(b'short')
+    result = runner.invoke(encrypt, ['rotate', str(tree), '--new-key', str(tmp_path / 'bad.key'), '--old-key', old])
+    assert result.exit_code == 1
+    assert 'Error' in result.output
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import pytest
+from click.testing import CliRunner
+
+from nox.commands.encrypt_commands import encrypt
+from nox.commands.hash_commands import hash
+from nox.domains.encrypt_sign import generate_signing_key
+from nox.domains.encrypt_sign import SignedManifest
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    root = tmp_path / 'release'
+    (root / 'sub').mkdir(parents=True)
+    (root / 'app.tar.gz').write_bytes(b'app' * 1000)
+    (root / 'sub' / 'notes.txt').write_bytes(b'notes')
+    return root
+
+
+@pytest.mark.parametrize('scheme', ['ed25519', 'ed448'])
+def test_sign_and_verify(tree, scheme):
+    private_pem, public_pem = generate_signing_key(scheme)
+    document, errors = SignedManifest(str(tree)).sign(private_pem)
+    assert errors == {}
+    assert document.startswith(f"# nox-signature {scheme} ".encode())
+    assert SignedManifest.open(document, public_pem)[1].keys() == {'app.tar.gz', 'sub/notes.txt'}
+    assert SignedManifest(str(tree)).verify(document, public_pem).ok
+
+    (tree / 'sub' / 'notes.txt').write_bytes(b'NOTES')
+    (tree / 'extra').write_bytes(b'')
+    report = SignedManifest(str(tree)).verify(document, public_pem)
+    assert report.changed == ['sub/notes.txt']
+    assert report.extra == ['extra']
+
+
+def test_rejects_modified_manifest_and_wrong_key(tree):
+    private_pem, public_pem = generate_signing_key()
+    document, _ = SignedManifest(str(tree), 'blake2b').sign(private_pem)
+    assert SignedManifest.open(document, public_pem)[0] == 'blake2b'
+
+    tampered = document.replace(b'BLAKE2b (app.tar.gz) = ', b'BLAKE2b (app.tar.gz) = 0')[:-2] + b'\n'
+    with pytest.raises(ValueError, match='does not match'):
+        SignedManifest.open(tampered, public_pem)
+    with pytest.raises(ValueError, match='does not match'):
+        SignedManifest.open(document, generate_signing_key()[1])
+    with pytest.raises(ValueError, match='ed448'):
+        SignedManifest.open(document, generate_signing_key('ed448')[1])
+    with pytest.raises(ValueError, match='Not a signed manifest'):
+        SignedManifest.open(document.split(b'\n', 1)[1], public_pem)
+    with pytest.raises(ValueError, match='private key'):
+        SignedManifest(str(tree)).sign(public_pem)
+
+
+def test_sign_commands(tree, tmp_path):
+    runner = CliRunner(mix_stderr=False)
+    key = tmp_path / 'release.key'
+    result = runner.invoke(encrypt, ['keygen', '--output', str(key), '--type', 'ed25519'])
+    assert result.exit_code == 0, result.output
+    assert runner.invoke(encrypt, ['keygen', '--output', str(key), '--type', 'ed25519']).exit_code == 1
+
+    signature = tree / 'SIGNED'
+    result = runner.invoke(encrypt, ['sign', str(tree), '--key', str(key), '--output', str(signature), '-j', '2'])
+    assert result.exit_code == 0, result.stderr
+    # The signed manifest is also a plain checksum manifest
+    assert runner.invoke(hash, ['manifest', 'verify', str(signature)]).exit_code == 0
+
+    result = runner.invoke(encrypt, ['verify-sig', str(signature), '--key', f"{key}.pub"])
+    assert result.exit_code == 0, result.stderr
+    assert '2 checked, 0 changed' in result.stderr
+
+    (tree / 'app.tar.gz').write_bytes(b'evil' * 750)
+    result = runner.invoke(encrypt, ['verify-sig', str(signature), '--key', f"{key}.pub"])
+    assert result.exit_code == 1
+    assert result.stdout == 'app.tar.gz: FAILED\n'
+
+    result = runner.invoke(encrypt, ['verify-sig', str(signature), '--key', str(key)])
+    assert result.exit_code == 1
+    assert 'public key' in result.stderr
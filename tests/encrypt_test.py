@@ -0,0 +1,326 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import gzip
+import io
+import os
+
+import pytest
+from click.testing import CliRunner
+from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import padding
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from nox.commands.encrypt_commands import decrypt
+from nox.commands.encrypt_commands import encrypt
+from nox.domains.encrypt import base64_decode_stream
+from nox.domains.encrypt import base64_encode_stream
+from nox.domains.encrypt import decrypt_hybrid
+from nox.domains.encrypt import decrypt_stream
+from nox.domains.encrypt import encrypt_hybrid
+from nox.domains.encrypt import encrypt_stream
+from nox.domains.encrypt import EncryptionManager
+from nox.domains.encrypt import fernet_decrypt
+from nox.domains.encrypt import load_private_key
+from nox.domains.encrypt import split_compressed
+
+KEY = os.urandom(32)
+
+
+def roundtrip(data, **kwargs):
+    encrypted = io.BytesIO()
+    assert encrypt_stream(io.BytesIO(data), encrypted, KEY, **kwargs) == len(data)
+    decrypted = io.BytesIO()
+    assert decrypt_stream(io.BytesIO(encrypted.getvalue()), decrypted, KEY) == len(data)
+    return encrypted.getvalue(), decrypted.getvalue()
+
+
+@pytest.mark.parametrize('cipher', ['aes-gcm', 'chacha20'])
+@pytest.mark.parametrize('size', [0, 1, 63, 64, 65, 64 * 5])
+def test_stream_roundtrip(cipher, size):
+    data = os.urandom(size)
+    encrypted, decrypted = roundtrip(data, cipher=cipher, chunk_size=64)
+    assert decrypted == data
+    chunks = max(1, -(-size // 64))
+    assert len(encrypted) == 28 + size + 16 * chunks
+
+
+def test_stream_uses_a_fresh_key_per_file():
+    first, _ = roundtrip(b'same')
+    second, _ = roundtrip(b'same')
+    assert first[28:] != second[28:]
+
+
+def tamper_cases(encrypted):
+    header, body = encrypted[:28], encrypted[28:]
+    chunks = [body[i:i + 80] for i in range(0, len(body), 80)]
+    yield 'truncated', header + b''.join(chunks[:-1])
+    yield 'reordered', header + chunks[1] + chunks[0] + b''.join(chunks[2:])
+    yield 'extended', encrypted + chunks[-1]
+    yield 'flipped', encrypted[:40] + bytes([encrypted[40] ^ 1]) + encrypted[41:]
+    yield 'header', encrypted[:12] + bytes([encrypted[12] ^ 1]) + encrypted[13:]
+
+
+def test_stream_detects_tampering():
+    encrypted, _ = roundtrip(os.urandom(64 * 3), chunk_size=64)
+    for _, data in tamper_cases(encrypted):
+        with pytest.raises(ValueError, match='failed authentication'):
+            decrypt_stream(io.BytesIO(data), io.BytesIO(), KEY)
+    with pytest.raises(ValueError, match='failed authentication'):
+        decrypt_stream(io.BytesIO(encrypted), io.BytesIO(), os.urandom(32))
+    with pytest.raises(ValueError, match='not a nox'):
+        decrypt_stream(io.BytesIO(b'x' * 100), io.BytesIO(), KEY)
+
+
+def test_stream_accepts_fernet_key_files(tmp_path):
+    key_file = tmp_path / 'key'
+    key_file.write_bytes(Fernet.generate_key())
+    encrypted = io.BytesIO()
+    manager = EncryptionManager(input_text='hello', output_file=encrypted, key_file=str(key_file))
+    manager.encrypt_stream()
+    decrypted = io.BytesIO()
+    EncryptionManager(input_file=io.BytesIO(encrypted.getvalue()), output_file=decrypted, key_file=str(key_file)).decrypt_stream()
+    assert decrypted.getvalue() == b'hello'
+
+
+def test_stream_commands(tmp_path):
+    runner = CliRunner()
+    key = tmp_path / 'key'
+    assert runner.invoke(encrypt, ['keygen', '--output', str(key)]).exit_code == 0
+    assert oct(key.stat().st_mode & 0o777) == '0o600'
+    plain = tmp_path / 'plain'
+    plain.write_bytes(os.urandom(200_000))
+    result = runner.invoke(
+        encrypt, ['stream', '--input', str(plain), '--output', str(tmp_path / 'enc'), '--key', str(key), '--chunk-size', '64KiB'],
+    )
+    assert result.exit_code == 0, result.output
+    result = runner.invoke(decrypt, ['stream', '--input', str(tmp_path / 'enc'), '--key', str(key)])
+    assert result.exit_code == 0
+    assert result.stdout_bytes == plain.read_bytes()
+
+    # A failed decryption leaves no output file behind
+    enc = (tmp_path / 'enc').read_bytes()
+    (tmp_path / 'enc').write_bytes(enc[:-1])
+    result = runner.invoke(decrypt, ['stream', '--input', str(tmp_path / 'enc'), '--output', str(tmp_path / 'out'), '--key', str(key)])
+    assert result.exit_code == 1
+    assert 'failed authentication' in result.output
+    assert sorted(os.listdir(tmp_path)) == ['enc', 'key', 'plain']
+
+
+@pytest.fixture(scope='module')
+def rsa_keys():
+    private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.TraditionalOpenSSL, serialization.NoEncryption(),
+    )
+    public_pem = private.public_key().public_bytes(serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo)
+    return private, public_pem, private_pem
+
+
+@pytest.mark.parametrize('size', [0, 245, 246, 100_000])
+def test_hybrid_roundtrip(rsa_keys, size):
+    _, public_pem, private_pem = rsa_keys
+    data = os.urandom(size)
+    encrypted = io.BytesIO()
+    assert encrypt_hybrid(io.BytesIO(data), encrypted, public_pem, chunk_size=4096) == size
+    decrypted = io.BytesIO()
+    assert decrypt_hybrid(io.BytesIO(encrypted.getvalue()), decrypted, private_pem) == size
+    assert decrypted.getvalue() == data
+
+
+def test_hybrid_accepts_pkcs1_public_keys(rsa_keys):
+    private, _, private_pem = rsa_keys
+    pkcs1_pem = private.public_key().public_bytes(serialization.Encoding.PEM, serialization.PublicFormat.PKCS1)
+    encrypted = io.BytesIO()
+    encrypt_hybrid(io.BytesIO(b'hello'), encrypted, pkcs1_pem)
+    decrypted = io.BytesIO()
+    decrypt_hybrid(io.BytesIO(encrypted.getvalue()), decrypted, private_pem)
+    assert decrypted.getvalue() == b'hello'
+
+
+def test_hybrid_rejects_wrong_key_and_tampering(rsa_keys):
+    _, public_pem, private_pem = rsa_keys
+    encrypted = io.BytesIO()
+    encrypt_hybrid(io.BytesIO(b'secret' * 100), encrypted, public_pem)
+    data = encrypted.getvalue()
+    other = rsa.generate_private_key(public_exponent=65537, key_size=2048).private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption(),
+    )
+    with pytest.raises(ValueError, match='unwrap'):
+        decrypt_hybrid(io.BytesIO(data), io.BytesIO(), other)
+    with pytest.raises(ValueError, match='unwrap'):
+        decrypt_hybrid(io.BytesIO(data[:20] + bytes([data[20] ^ 1]) + data[21:]), io.BytesIO(), private_pem)
+    with pytest.raises(ValueError, match='failed authentication'):
+        decrypt_hybrid(io.BytesIO(data[:-1] + bytes([data[-1] ^ 1])), io.BytesIO(), private_pem)
+    with pytest.raises(ValueError, match='public key'):
+        encrypt_hybrid(io.BytesIO(b''), io.BytesIO(), private_pem)
+
+
+def test_rsa_decrypts_legacy_single_block(rsa_keys, tmp_path):
+    private, _, private_pem = rsa_keys
+    key_file = tmp_path / 'key.pem'
+    key_file.write_bytes(private_pem)
+    legacy = private.public_key().encrypt(b'old data', padding.PKCS1v15())
+    assert EncryptionManager(input_file=io.BytesIO(legacy), key_file=str(key_file)).decrypt_rsa() == b'old data'
+
+
+def test_private_keys_are_parsed_once(rsa_keys):
+    _, _, private_pem = rsa_keys
+    assert load_private_key(private_pem) is load_private_key(private_pem)
+
+
+def test_rsa_commands(rsa_keys, tmp_path):
+    _, public_pem, private_pem = rsa_keys
+    (tmp_path / 'key.pub').write_bytes(public_pem)
+    (tmp_path / 'key.pem').write_bytes(private_pem)
+    plain = tmp_path / 'plain'
+    plain.write_bytes(os.urandom(300_000))
+    runner = CliRunner()
+    result = runner.invoke(
+        encrypt, ['rsa', '--input', str(plain), '--output', str(tmp_path / 'enc'), '--key', str(tmp_path / 'key.pub')],
+    )
+    assert result.exit_code == 0, result.output
+    result = runner.invoke(decrypt, ['rsa', '--input', str(tmp_path / 'enc'), '--key', str(tmp_path / 'key.pem')])
+    assert result.exit_code == 0
+    assert result.stdout_bytes == plain.read_bytes()
+    result = runner.invoke(decrypt, ['rsa', '--input', str(tmp_path / 'enc'), '--key', str(tmp_path / 'key.pub')])
+    assert result.exit_code == 1
+    assert 'private key' in result.output
+
+
+@pytest.mark.parametrize('size', [0, 1, 2, 3, 100, 1000])
+@pytest.mark.parametrize('block_size', [3, 6, 30])
+def test_base64_stream_matches_one_shot(size, block_size):
+    data = os.urandom(size)
+    encoded = io.BytesIO()
+    assert base64_encode_stream(io.BytesIO(data), encoded, block_size=block_size) == size
+    assert encoded.getvalue() == base64.b64encode(data)
+
+    url_safe = io.BytesIO()
+    base64_encode_stream(io.BytesIO(data), url_safe, url_safe=True, block_size=block_size)
+    assert url_safe.getvalue() == base64.urlsafe_b64encode(data)
+
+    wrapped = io.BytesIO()
+    base64_encode_stream(io.BytesIO(data), wrapped, wrap=76, block_size=block_size)
+    assert wrapped.getvalue() == base64.encodebytes(data)
+
+    for text, url in ((encoded, False), (url_safe, True), (wrapped, False)):
+        for read_size in (1, 5, 1 << 20):
+            decoded = io.BytesIO()
+            assert base64_decode_stream(io.BytesIO(text.getvalue()), decoded, url, read_size) == size
+            assert decoded.getvalue() == data
+
+
+def test_base64_decode_stream_accepts_missing_padding_and_rejects_garbage():
+    decoded = io.BytesIO()
+    base64_decode_stream(io.BytesIO(b'aGVsbG8'), decoded)
+    assert decoded.getvalue() == b'hello'
+    for bad in (b'aGV!bG8=', b'aGVsbG8=aGVs', b'a', b'aGVsbG8=\naGVsbG8='):
+        with pytest.raises(binascii.Error):
+            base64_decode_stream(io.BytesIO(bad), io.BytesIO(), block_size=4)
+
+
+def test_base64_commands(tmp_path):
+    runner = CliRunner()
+    result = runner.invoke(encrypt, ['base64', '--text', 'hello?>'])
+    assert result.output == 'Encrypted text: aGVsbG8/Pg==\n'
+    result = runner.invoke(encrypt, ['base64', '--url-safe', '--wrap', '4'], input=b'hello?>')
+    assert result.stdout_bytes == b'aGVs\nbG8_\nPg==\n'
+    result = runner.invoke(decrypt, ['base64', '--url-safe', '--output', str(tmp_path / 'out')], input=result.stdout_bytes)
+    assert result.exit_code == 0
+    assert (tmp_path / 'out').read_bytes() == b'hello?>'
+    result = runner.invoke(decrypt, ['base64', '--output', str(tmp_path / 'bad')], input=b'aGV!')
+    assert result.exit_code == 1
+    assert 'Invalid base64 input' in result.output
+    assert not (tmp_path / 'bad').exists()
+
+
+def codec_or_skip(codec):
+    if codec != 'gzip':
+        pytest.importorskip({'zstd': 'zstandard', 'lz4': 'lz4'}[codec])
+    return codec
+
+
+@pytest.mark.parametrize('codec', ['gzip', 'zstd', 'lz4'])
+def test_stream_compression_roundtrip(codec):
+    codec_or_skip(codec)
+    data = b'INSERT INTO t VALUES (1);\n' * 100_000 + os.urandom(1000)
+    encrypted = io.BytesIO()
+    assert encrypt_stream(io.BytesIO(data), encrypted, KEY, chunk_size=4096, compression=codec) == len(data)
+    assert len(encrypted.getvalue()) < len(data) // 10
+    assert encrypted.getvalue()[4] == 2
+    decrypted = io.BytesIO()
+    assert decrypt_stream(io.BytesIO(encrypted.getvalue()), decrypted, KEY) == len(data)
+    assert decrypted.getvalue() == data
+
+
+def test_stream_compression_is_authenticated(monkeypatch):
+    def missing(codec):
+        raise ValueError(f"{codec} compression needs a package")
+
+    # The codec is only set up once the header has authenticated
+    monkeypatch.setattr('nox.domains.compress._import', missing)
+    encrypted = io.BytesIO()
+    encrypt_stream(io.BytesIO(b'x' * 1000), encrypted, KEY, compression='gzip')
+    data = encrypted.getvalue()
+    # The header is authenticated, so the codec cannot be swapped
+    with pytest.raises(ValueError, match='failed authentication'):
+        decrypt_stream(io.BytesIO(data[:6] + b'\x00\x03' + data[8:]), io.BytesIO(), KEY)
+    # Nor can the stream pass as version 1, which would skip decompression
+    with pytest.raises(ValueError, match='Unsupported stream'):
+        decrypt_stream(io.BytesIO(data[:4] + b'\x01' + data[5:]), io.BytesIO(), KEY)
+
+
+def test_uncompressed_streams_keep_version_1():
+    encrypted, _ = roundtrip(b'data')
+    assert encrypted[4:8] == b'\x01\x01\x00\x00'
+
+
+def test_fernet_compression_roundtrip(tmp_path):
+    key_file = tmp_path / 'key'
+    key_file.write_bytes(Fernet.generate_key())
+    fernet = Fernet(key_file.read_bytes())
+    data = b'log line\n' * 10_000
+    output = EncryptionManager(input_file=io.BytesIO(data), key_file=str(key_file)).encrypt_fernet('gzip')
+    assert len(output) < len(data) // 10
+    assert output.startswith(b'NOXZ1gAAAAA')
+    assert gzip.decompress(fernet.decrypt(output[5:])) == data
+    assert EncryptionManager(input_file=io.BytesIO(output + b'\n'), key_file=str(key_file)).decrypt_fernet() == data
+    assert split_compressed(output)[0] == 'gzip'
+
+
+def test_uncompressed_fernet_tokens_are_plain(tmp_path):
+    key_file = tmp_path / 'key'
+    key_file.write_bytes(Fernet.generate_key())
+    fernet = Fernet(key_file.read_bytes())
+    # Plaintext that happens to start like the prefix is data like any other
+    data = b'NOXZ1not gzip'
+    token = EncryptionManager(input_text=data.decode(), key_file=str(key_file)).encrypt_fernet()
+    assert fernet.decrypt(token) == data
+    assert fernet_decrypt(fernet, token) == data
+    assert fernet_decrypt(fernet, fernet.encrypt(b'hello')) == b'hello'
+
+    with pytest.raises(ValueError, match='Unsupported compression'):
+        split_compressed(b'NOXZ9' + token)
+    with pytest.raises(ValueError, match='corrupt'):
+        fernet_decrypt(fernet, b'NOXZ1' + token)
+    result = CliRunner().invoke(decrypt, ['fernet', '--text', f"NOXZ1{token.decode()}", '--key', str(key_file)])
+    assert result.exit_code == 1
+    assert 'Decryption failed: Compressed data is corrupt' in result.output
+
+
+def test_compress_option(tmp_path):
+    key = tmp_path / 'key'
+    key.write_bytes(Fernet.generate_key())
+    plain = tmp_path / 'plain'
+    plain.write_bytes(b'2024-01-01 INFO request served\n' * 50_000)
+    runner = CliRunner()
+    result = runner.invoke(
+        encrypt, ['stream', '--input', str(plain), '--output', str(tmp_path / 'enc'), '--key', str(key), '--compress', 'gzip'],
+    )
+    assert result.exit_code == 0, result.output
+    assert (tmp_path / 'enc').stat().st_size < plain.stat().st_size // 10
+    result = runner.invoke(decrypt, ['stream', '--input', str(tmp_path / 'enc'), '--key', str(key)])
+    assert result.stdout_bytes == plain.read_bytes()
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import os
+
+import pytest
+from click.testing import CliRunner
+from cryptography.fernet import Fernet
+
+from nox.commands.encrypt_commands import decrypt
+from nox.commands.encrypt_commands import encrypt
+from nox.domains.encrypt_tree import DirectoryCipher
+
+
+@pytest.fixture
+def tree(tmp_path):
+    source = tmp_path / 'in'
+    (source / 'a' / 'b').mkdir(parents=True)
+    (source / 'top').write_bytes(os.urandom(5000))
+    (source / 'a' / 'x').write_bytes(b'x')
+    (source / 'a' / 'b' / 'empty').write_bytes(b'')
+    return source
+
+
+def contents(root):
+    return {
+        os.path.relpath(os.path.join(path, name), root): open(os.path.join(path, name), 'rb').read()
+        for path, _, files in os.walk(root) for name in files
+    }
+
+
+@pytest.mark.parametrize('method', ['stream', 'fernet', 'base64'])
+def test_roundtrip_mirrors_layout(tree, tmp_path, method):
+    key = None if method == 'base64' else Fernet.generate_key()
+    encrypted = tmp_path / 'enc'
+    results = list(DirectoryCipher(method, key).run(str(tree), str(encrypted)))
+    assert [status for _, status, _ in results] == ['written'] * 3
+    suffix = DirectoryCipher(method, key).suffix
+    assert sorted(contents(encrypted)) == sorted(name + suffix for name in contents(tree))
+
+    results = list(DirectoryCipher(method, key, decrypt=True).run(str(encrypted), str(tmp_path / 'out')))
+    assert all(error is None for _, _, error in results)
+    assert contents(tmp_path / 'out') == contents(tree)
+
+
+def test_skips_outputs_that_are_up_to_date(tree, tmp_path):
+    key = os.urandom(32)
+    encrypted = str(tmp_path / 'enc')
+    list(DirectoryCipher('stream', key).run(str(tree), encrypted))
+    assert {status for _, status, _ in DirectoryCipher('stream', key).run(str(tree), encrypted)} == {'skipped'}
+
+    os.utime(tree / 'a' / 'x', ns=(0, 1_000_000_000))
+    results = {os.path.relpath(path, tree): status for path, status, _ in DirectoryCipher('stream', key).run(str(tree), encrypted)}
+    assert results == {'a/b/empty': 'skipped', 'a/x': 'written', 'top': 'skipped'}
+    forced = DirectoryCipher('stream', key, force=True).run(str(tree), encrypted)
+    assert {status for _, status, _ in forced} == {'written'}
+
+
+def test_output_inside_source_is_not_walked(tree):
+    key = os.urandom(32)
+    list(DirectoryCipher('stream', key).run(str(tree), str(tree / 'enc')))
+    second = list(DirectoryCipher('stream', key).run(str(tree), str(tree / 'enc')))
+    assert len(second) == 3
+    with pytest.raises(ValueError, match='suffix'):
+        list(DirectoryCipher('stream', key, suffix='').run(str(tree), str(tree)))
+
+
+def test_in_place_rerun_is_up_to_date(tree):
+    key = os.urandom(32)
+    first = list(DirectoryCipher('stream', key).run(str(tree), str(tree)))
+    assert [status for _, status, _ in first] == ['written'] * 3
+    for _ in range(2):
+        again = list(DirectoryCipher('stream', key).run(str(tree), str(tree)))
+        assert [status for _, status, _ in again] == ['skipped'] * 3
+    assert len(contents(tree)) == 6
+
+    decrypted = list(DirectoryCipher('stream', key, decrypt=True).run(str(tree), str(tree) + '.out'))
+    assert sorted(os.path.basename(path) for path, _, _ in decrypted) == ['empty.noxs', 'top.noxs', 'x.noxs']
+
+
+def test_failures_leave_no_output(tree, tmp_path):
+    cipher = DirectoryCipher('stream', os.urandom(32), decrypt=True, suffix='')
+    results = list(cipher.run(str(tree), str(tmp_path / 'out')))
+    assert {status for _, status, _ in results} == {'failed'}
+    assert contents(tmp_path / 'out') == {}
+
+
+def test_compression(tree, tmp_path):
+    key = os.urandom(32)
+    (tree / 'log').write_bytes(b'GET / 200\n' * 10_000)
+    list(DirectoryCipher('stream', key, compression='gzip').run(str(tree), str(tmp_path / 'enc')))
+    assert (tmp_path / 'enc' / 'log.noxs').stat().st_size < 1000
+    list(DirectoryCipher('stream', key, decrypt=True).run(str(tmp_path / 'enc'), str(tmp_path / 'out')))
+    assert contents(tmp_path / 'out') == contents(tree)
+    with pytest.raises(ValueError, match='does not support compression'):
+        DirectoryCipher('base64', compression='gzip')
+
+
+def test_bad_key_fails_before_any_file():
+    with pytest.raises(ValueError):
+        DirectoryCipher('stream', b'short')
+
+
+def test_dir_commands(tree, tmp_path):
+    key = tmp_path / 'key'
+    key.write_bytes(Fernet.generate_key())
+    runner = CliRunner()
+    result = runner.invoke(encrypt, ['dir', str(tree), str(tmp_path / 'enc'), '--key', str(key), '-j', '2'])
+    assert result.exit_code == 0, result.output
+    assert '3 written, 0 up to date, 0 failed' in result.output
+    result = runner.invoke(decrypt, ['dir', str(tmp_path / 'enc'), str(tmp_path / 'out'), '--key', str(key)])
+    assert result.exit_code == 0, result.output
+    assert contents(tmp_path / 'out') == contents(tree)
+
+    result = runner.invoke(decrypt, ['dir', str(tree), str(tmp_path / 'bad'), '--key', str(key), '--suffix', ''])
+    assert result.exit_code == 1
+    assert '0 written, 0 up to date, 3 failed' in result.output
+    assert runner.invoke(encrypt, ['dir', str(tree), str(tmp_path / 'x'), '--method', 'rsa']).exit_code == 2
+
+
+def test_decrypt_fernet_and_base64_commands(tmp_path):
+    key = tmp_path / 'key'
+    key.write_bytes(Fernet.generate_key())
+    token = Fernet(key.read_bytes()).encrypt(b'hello').decode()
+    runner = CliRunner()
+    result = runner.invoke(decrypt, ['fernet', '--text', token, '--key', str(key)])
+    assert result.output == 'Decrypted text: hello\n'
+    result = runner.invoke(decrypt, ['fernet', '--text', token[:-2], '--key', str(key)])
+    assert result.exit_code == 1
+    result = runner.invoke(decrypt, ['base64', '--text', 'aGVsbG8=', '--output', str(tmp_path / 'out')])
+    assert result.exit_code == 0
+    assert (tmp_path / 'out').read_bytes() == b'hello'
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import os
+import stat
+
+import pytest
+
+from nox.utils.files import atomic_write
+
+
+@pytest.fixture
+def umask():
+    old = os.umask(0o027)
+    yield 0o027
+    os.umask(old)
+
+
+def mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_new_files_follow_the_umask_without_changing_it(tmp_path, umask, monkeypatch):
+    def changed(mask):
+        raise AssertionError('the process umask was changed')
+
+    monkeypatch.setattr(os, 'umask', changed)
+    with atomic_write(str(tmp_path / 'new')) as file:
+        file.write(b'data')
+        assert mode(file.name) == 0o600
+    assert (tmp_path / 'new').read_bytes() == b'data'
+    assert mode(tmp_path / 'new') == 0o640
+
+
+def test_mode_is_kept_or_given(tmp_path, umask):
+    target = tmp_path / 'existing'
+    target.write_bytes(b'old')
+    target.chmod(0o604)
+    with atomic_write(str(target)) as file:
+        file.write(b'new')
+    assert mode(target) == 0o604
+    with atomic_write(str(tmp_path / 'secret'), 0o400) as file:
+        file.write(b'key')
+    assert mode(tmp_path / 'secret') == 0o400
+
+
+def test_failure_keeps_the_old_content(tmp_path):
+    target = tmp_path / 'existing'
+    target.write_bytes(b'old')
+    with pytest.raises(RuntimeError):
+        with atomic_write(str(target)) as file:
+            file.write(b'partial')
+            raise RuntimeError
+    assert target.read_bytes() == b'old'
+    assert os.listdir(tmp_path) == ['existing']
+
+
+def test_durable_syncs_the_file_and_the_directory(tmp_path, monkeypatch):
+    synced = []
+    fsync = os.fsync
+    monkeypatch.setattr(os, 'fsync', lambda fd: synced.append(stat.S_ISDIR(os.fstat(fd).st_mode)) or fsync(fd))
+    with atomic_write(str(tmp_path / 'plain')) as file:
+        file.write(b'data')
+    assert synced == []
+    with atomic_write(str(tmp_path / 'durable'), durable=True) as file:
+        file.write(b'data')
+    assert synced == [False, True]
+    assert (tmp_path / 'durable').read_bytes() == b'data'
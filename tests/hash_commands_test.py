@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import hashlib
+
 import pytest
 
 from nox.domains.hash_manager import HashManager
@@ -38,3 +40,130 @@ def test_verify_hash(hash_manager, tmp_path):
     assert not hash_manager.verify_hash(
         str(test_file), 'wronghashvalue', 'md5',
     ), 'Hash verification should fail.'
+
+
+@pytest.fixture
+def tree(tmp_path):
+    (tmp_path / 'b').mkdir()
+    (tmp_path / 'b' / 'z.txt').write_bytes(b'z' * 5000)
+    (tmp_path / 'b' / 'a.bin').write_bytes(b'a')
+    (tmp_path / 'top.txt').write_bytes(b'top')
+    return tmp_path
+
+
+def test_expand_paths_is_sorted_and_expands_globs(hash_manager, tree):
+    assert hash_manager.expand_paths([str(tree)]) == [
+        str(tree / 'top.txt'), str(tree / 'b' / 'a.bin'), str(tree / 'b' / 'z.txt'),
+    ]
+    assert hash_manager.expand_paths([str(tree / '**' / '*.txt'), 'missing']) == [
+        str(tree / 'b' / 'z.txt'), str(tree / 'top.txt'), 'missing',
+    ]
+
+
+@pytest.mark.parametrize('parallel', [False, True])
+def test_hash_files_matches_hashlib(hash_manager, tree, monkeypatch, parallel):
+    from nox.domains import hash_manager as module
+
+    if parallel:
+        monkeypatch.setattr(module, 'PARALLEL_MIN_BYTES', 0)
+    # Also take the mmap path for the larger file
+    monkeypatch.setattr(module, 'MMAP_THRESHOLD', 4096)
+    results = list(hash_manager.hash_files([str(tree), str(tree / 'missing')], 'sha256', jobs=2))
+    files = hash_manager.expand_paths([str(tree)])
+    assert [path for path, _, _ in results] == files + [str(tree / 'missing')]
+    for path, digest, error in results[:-1]:
+        with open(path, 'rb') as f:
+            assert digest == hashlib.sha256(f.read()).hexdigest()
+        assert error is None
+    assert results[-1][1] is None and results[-1][2]
+
+
+def test_generate_command_prints_checksum_lines(tree):
+    from click.testing import CliRunner
+
+    from nox.commands.hash_commands import generate
+
+    runner = CliRunner(mix_stderr=False)
+    result = runner.invoke(generate, [str(tree), '--algorithm', 'sha256', '--jobs', '1'])
+    assert result.exit_code == 0
+    lines = result.output.splitlines()
+    assert lines[0] == f"{hashlib_hex(b'top')}  {tree / 'top.txt'}"
+    assert len(lines) == 3
+
+    result = runner.invoke(generate, ['--files-from', '-', '--algorithm', 'sha256'], input=f"{tree / 'top.txt'}\nnope\n")
+    assert result.exit_code == 1
+    assert result.output.splitlines() == [f"{hashlib_hex(b'top')}  {tree / 'top.txt'}"]
+    assert 'nope' in result.stderr
+
+
+def test_checksum_line_escapes_like_coreutils(hash_manager):
+    assert hash_manager.checksum_line('ab', 'plain') == 'ab  plain'
+    assert hash_manager.checksum_line('ab', 'new\nline\\x') == '\\ab  new\\nline\\\\x'
+
+
+def hashlib_hex(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def test_generate_hashes_single_pass_matches_hashlib(hash_manager, tree):
+    path = str(tree / 'b' / 'z.txt')
+    algorithms = ['md5', 'blake2b', 'blake2s', 'sha3_256', 'sha3_512']
+    digests = hash_manager.generate_hashes(path, algorithms)
+    with open(path, 'rb') as f:
+        data = f.read()
+    assert digests == {algorithm: hashlib.new(algorithm, data).hexdigest() for algorithm in algorithms}
+
+
+def test_blake3_is_optional(hash_manager, tree):
+    try:
+        import blake3
+    except ImportError:
+        with pytest.raises(ValueError, match='blake3 is not installed'):
+            list(hash_manager.hash_files([str(tree)], 'blake3'))
+    else:
+        [(_, digest, _)] = hash_manager.hash_files([str(tree / 'top.txt')], 'blake3')
+        assert digest == blake3.blake3(b'top').hexdigest()
+
+
+def test_generate_command_with_several_algorithms(tree):
+    from click.testing import CliRunner
+
+    from nox.commands.hash_commands import generate
+
+    runner = CliRunner()
+    result = runner.invoke(generate, [str(tree / 'top.txt'), '--algorithm', 'sha256', '--algorithm', 'blake2b'])
+    assert result.exit_code == 0
+    assert result.output.splitlines() == [
+        f"SHA256 ({tree / 'top.txt'}) = {hashlib_hex(b'top')}",
+        f"BLAKE2b ({tree / 'top.txt'}) = {hashlib.blake2b(b'top').hexdigest()}",
+    ]
+
+
+def test_tree_hash_matches_reference(hash_manager, tmp_path):
+    data = bytes(range(256)) * 5
+    path = tmp_path / 'data.bin'
+    path.write_bytes(data)
+
+    def h(payload):
+        return hashlib.sha256(payload).digest()
+
+    leaves = [h(b'\x00' + data[i:i + 256]) for i in range(0, len(data), 256)]
+    # Five leaves: ((0 1) (2 3)) 4
+    root = h(b'\x01' + h(b'\x01' + h(b'\x01' + leaves[0] + leaves[1]) + h(b'\x01' + leaves[2] + leaves[3])) + leaves[4])
+    assert hash_manager.tree_hash(str(path), 'sha256', 256, jobs=1) == root.hex()
+    assert hash_manager.tree_hash(str(path), 'sha256', 256, jobs=4) == root.hex()
+    (tmp_path / 'empty').write_bytes(b'')
+    assert hash_manager.tree_hash(str(tmp_path / 'empty')) == h(b'\x00').hex()
+
+
+def test_s3_etag(hash_manager, tmp_path):
+    path = tmp_path / 'data.bin'
+    path.write_bytes(b'x' * (12 << 20))
+    assert hash_manager.s3_etag(str(path), multipart_threshold=16 << 20) == hashlib.md5(b'x' * (12 << 20)).hexdigest()
+    parts = hashlib.md5(b'x' * (8 << 20)).digest() + hashlib.md5(b'x' * (4 << 20)).digest()
+    assert hash_manager.s3_etag(str(path), jobs=2) == f"{hashlib.md5(parts).hexdigest()}-2"
+
+
+def test_s3_part_size_follows_boto3():
+    assert HashManager.s3_part_size(100, 1 << 20) == 5 << 20
+    assert HashManager.s3_part_size(100 << 30, 8 << 20) == 16 << 20
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import json
+import os
+
+import pytest
+from click.testing import CliRunner
+
+from nox.commands.hash_commands import hash
+from nox.domains import hash_dedupe
+from nox.domains.hash_dedupe import DuplicateFinder
+
+
+@pytest.fixture
+def tree(tmp_path):
+    big = os.urandom(64 << 10)
+    (tmp_path / 'a').mkdir()
+    (tmp_path / 'a' / 'big1').write_bytes(big)
+    (tmp_path / 'big2').write_bytes(big)
+    # Same size, start and end as big1: only the full hash tells them apart
+    middle = len(big) // 2
+    (tmp_path / 'a' / 'big3').write_bytes(big[:middle] + bytes([big[middle] ^ 1]) + big[middle + 1:])
+    (tmp_path / 'small1').write_bytes(b'same')
+    (tmp_path / 'small2').write_bytes(b'same')
+    (tmp_path / 'other').write_bytes(b'diff')
+    (tmp_path / 'empty1').write_bytes(b'')
+    (tmp_path / 'empty2').write_bytes(b'')
+    os.link(tmp_path / 'small1', tmp_path / 'small1-link')
+    return tmp_path
+
+
+def test_find_groups_identical_files(tree, monkeypatch):
+    hashed = []
+    original = hash_dedupe.HashManager.hash_files
+
+    def spy(self, paths, *args, **kwargs):
+        paths = list(paths)
+        hashed.extend(paths)
+        return original(self, paths, *args, **kwargs)
+
+    monkeypatch.setattr(hash_dedupe.HashManager, 'hash_files', spy)
+    finder = DuplicateFinder(jobs=2)
+    groups = finder.find([str(tree)])
+    assert [group['paths'] for group in groups] == [
+        [str(tree / 'a' / 'big1'), str(tree / 'big2')],
+        [str(tree / 'small1'), str(tree / 'small2')],
+    ]
+    assert groups[0]['wasted'] == 64 << 10
+    # Small files are settled by the partial hash, empty files and hard links are skipped
+    assert sorted(hashed) == sorted(str(tree / name) for name in ('a/big1', 'a/big3', 'big2'))
+    assert finder.scanned == 6
+
+
+def test_hardlink_replaces_copies(tree):
+    finder = DuplicateFinder()
+    groups = finder.find([str(tree)])
+    linked, errors = finder.hardlink(groups[0])
+    assert linked == [str(tree / 'big2')] and errors == {}
+    assert os.path.samefile(tree / 'a' / 'big1', tree / 'big2')
+
+    (tree / 'small2').write_bytes(b'SAME')
+    linked, errors = finder.hardlink(groups[1])
+    assert linked == [] and 'changed' in errors[str(tree / 'small2')]
+
+
+def test_dedupe_command_prints_json(tree):
+    result = CliRunner().invoke(hash, ['dedupe', str(tree), '--jobs', '1'])
+    assert result.exit_code == 0, result.output
+    document = json.loads(result.output)
+    assert document['wasted'] == (64 << 10) + 4
+    assert len(document['groups']) == 2 and document['errors'] == {}
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import os
+
+import pytest
+from click.testing import CliRunner
+
+from nox.commands.hash_commands import hash
+from nox.domains.hash_manifest import HashManifest
+
+OLD = 1_600_000_000
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    root = tmp_path / 'tree'
+    (root / 'sub').mkdir(parents=True)
+    for name, data in (('a.txt', b'alpha'), ('sub/b.txt', b'bravo'), ('sub/c.txt', b'charlie')):
+        (root / name).write_bytes(data)
+        # Old enough to be cached
+        os.utime(root / name, (OLD, OLD))
+    return root
+
+
+def test_create_and_parse_round_trip(tree):
+    checksums = HashManifest(str(tree))
+    digests, errors = checksums.create()
+    assert errors == {}
+    assert list(digests) == ['a.txt', 'sub/b.txt', 'sub/c.txt']
+    lines = list(checksums.format(digests))
+    assert lines[0].startswith('SHA256 (a.txt) = ')
+    assert HashManifest.parse(lines) == ('sha256', digests)
+    plain = [f"{digest}  {name}" for name, digest in digests.items()]
+    assert HashManifest.parse(plain) == ('sha256', digests)
+
+
+def test_parse_rejects_garbage_and_unescapes():
+    with pytest.raises(ValueError, match='Line 1'):
+        HashManifest.parse(['not a checksum'])
+    assert HashManifest.parse(['\\MD5 (a\\nb\\\\c) = ' + '0' * 32]) == ('md5', {'a\nb\\c': '0' * 32})
+
+
+def test_verify_reports_changed_missing_and_extra(tree):
+    checksums = HashManifest(str(tree))
+    expected, _ = checksums.create()
+    (tree / 'a.txt').write_bytes(b'ALPHA!')
+    (tree / 'sub' / 'b.txt').unlink()
+    (tree / 'new.txt').write_bytes(b'new')
+    report = checksums.verify(expected)
+    assert report.changed == ['a.txt']
+    assert report.missing == ['sub/b.txt']
+    assert report.extra == ['new.txt']
+    assert report.checked == 3 and not report.ok
+
+
+def test_cache_skips_unchanged_files_unless_paranoid(tree, monkeypatch):
+    expected, _ = HashManifest(str(tree)).create()
+    # Same size and mtime: the cache cannot tell the file changed
+    (tree / 'a.txt').write_bytes(b'ALPHA')
+    os.utime(tree / 'a.txt', (OLD, OLD))
+
+    hashed = []
+    original = HashManifest(str(tree)).manager.hash_files
+
+    def spy(self, paths, *args, **kwargs):
+        paths = list(paths)
+        hashed.extend(paths)
+        return original(paths, *args, **kwargs)
+
+    monkeypatch.setattr('nox.domains.hash_manager.HashManager.hash_files', spy)
+    assert HashManifest(str(tree)).verify(expected).ok
+    assert hashed == []
+    assert HashManifest(str(tree), paranoid=True).verify(expected).changed == ['a.txt']
+    assert len(hashed) == 3
+
+
+def test_manifest_commands(tree):
+    runner = CliRunner(mix_stderr=False)
+    manifest = tree / 'SHA256SUMS'
+    result = runner.invoke(hash, ['manifest', 'create', str(tree), '--output', str(manifest), '--jobs', '1'])
+    assert result.exit_code == 0, result.stderr
+    assert 'SHA256SUMS' not in manifest.read_text()
+
+    result = runner.invoke(hash, ['manifest', 'verify', str(manifest)])
+    assert result.exit_code == 0, result.output
+    assert result.stderr.startswith('3 checked, 0 changed')
+
+    (tree / 'sub' / 'c.txt').write_bytes(b'changed')
+    result = runner.invoke(hash, ['manifest', 'verify', str(manifest)])
+    assert result.exit_code == 1
+    assert result.output == 'sub/c.txt: FAILED\n'
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import queue
+import sys
+import threading
+
+import pytest
+
+from nox.domains.hash_manifest import DigestCache
+from nox.domains.hash_watch import IntegrityWatcher
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith('linux'), reason='inotify is Linux only')
+
+
+@pytest.fixture
+def watcher(tmp_path, monkeypatch):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    root = tmp_path / 'tree'
+    (root / 'sub').mkdir(parents=True)
+    (root / 'a.txt').write_bytes(b'alpha')
+    (root / 'sub' / 'b.txt').write_bytes(b'bravo')
+    watcher = IntegrityWatcher(str(root), debounce=0.05, jobs=1)
+    watcher.start()
+    events: queue.Queue = queue.Queue()
+    thread = threading.Thread(target=watcher.run, args=(events.put,))
+    thread.start()
+    yield root, watcher, events
+    watcher.stop()
+    thread.join(timeout=5)
+    watcher.close()
+
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def test_baseline_and_change_events(watcher):
+    root, watcher, events = watcher
+    assert watcher.baseline == {'a.txt': sha256(b'alpha'), 'sub/b.txt': sha256(b'bravo')}
+
+    # Several quick writes are reported once, with the final content
+    with open(root / 'a.txt', 'wb') as f:
+        for chunk in (b'one', b'two', b'three'):
+            f.write(chunk)
+            f.flush()
+    event = events.get(timeout=5)
+    assert event['event'] == 'modified'
+    assert event['path'] == str(root / 'a.txt')
+    assert (event['old_digest'], event['new_digest']) == (sha256(b'alpha'), sha256(b'onetwothree'))
+    assert event['timestamp'].endswith('+00:00')
+
+    (root / 'sub' / 'b.txt').unlink()
+    assert events.get(timeout=5)['event'] == 'deleted'
+
+    (root / 'new').mkdir()
+    (root / 'new' / 'c.txt').write_bytes(b'charlie')
+    event = events.get(timeout=5)
+    assert (event['event'], event['path'], event['new_digest']) == ('created', str(root / 'new' / 'c.txt'), sha256(b'charlie'))
+
+    # Rewriting the same content is not a change
+    (root / 'new' / 'c.txt').write_bytes(b'charlie')
+    with pytest.raises(queue.Empty):
+        events.get(timeout=0.3)
+
+
+def test_events_keep_the_digest_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    root = tmp_path / 'tree'
+    root.mkdir()
+    for n in range(10):
+        (root / f"{n}.txt").write_bytes(b'%d' % n)
+        # Old enough to be cached
+        os.utime(root / f"{n}.txt", (1_600_000_000, 1_600_000_000))
+    watcher = IntegrityWatcher(str(root), debounce=0.05, jobs=1)
+    watcher.start()
+    assert len(DigestCache(str(root), 'sha256').entries) == 10
+    events: queue.Queue = queue.Queue()
+    thread = threading.Thread(target=watcher.run, args=(events.put,))
+    thread.start()
+    try:
+        (root / '0.txt').write_bytes(b'changed')
+        assert events.get(timeout=5)['event'] == 'modified'
+    finally:
+        watcher.stop()
+        thread.join(timeout=5)
+        watcher.close()
+    assert len(DigestCache(str(root), 'sha256').entries) >= 9
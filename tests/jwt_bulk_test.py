@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import json
+import time
+
+import jwt as pyjwt
+import pytest
+from click.testing import CliRunner
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from nox.commands.jwt_commands import bulk
+from nox.domains.jwt_bulk import BulkMinter
+from nox.domains.jwt_bulk import template_lines
+from nox.domains.jwt_bulk import TokenSigner
+
+
+def decode(token, key='s3cret', algorithm='HS256'):
+    return pyjwt.decode(token, key, algorithms=[algorithm])
+
+
+def test_signer_matches_jwt_encode():
+    claims = {'sub': 'user-1', 'scope': ['read'], 'exp': 2_000_000_000}
+    assert TokenSigner('s3cret').sign(claims) == pyjwt.encode(claims, 's3cret', algorithm='HS256')
+
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    pem = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption(),
+    )
+    token = TokenSigner(pem, 'ES256').sign(claims)
+    assert decode(token, private_key.public_key(), 'ES256') == claims
+    with pytest.raises(ValueError, match='HS256'):
+        TokenSigner(pem, 'HS256')
+    with pytest.raises(ValueError, match='Unsupported'):
+        TokenSigner('s3cret', 'none')
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_mint_keeps_input_order(monkeypatch, jobs):
+    monkeypatch.setattr('nox.domains.jwt_bulk.BATCH_SIZE', 7)
+    monkeypatch.setattr('nox.domains.jwt_bulk.PARALLEL_MIN_TOKENS', 20)
+    lines = [json.dumps({'sub': f"user-{n}"}) for n in range(100)]
+    lines.insert(50, '\n')
+    before = int(time.time())
+    tokens = list(BulkMinter('s3cret', claims={'env': 'dev'}, expires_in=60, jobs=jobs).mint(lines))
+    assert len(tokens) == 100
+    for n, token in enumerate(tokens):
+        claims = decode(token)
+        assert claims['sub'] == f"user-{n}"
+        assert claims['env'] == 'dev'
+        assert before + 60 <= claims['exp'] <= int(time.time()) + 60
+
+
+def test_mint_reports_bad_lines():
+    with pytest.raises(ValueError, match='Line 2'):
+        list(BulkMinter('s3cret').mint(['{}', '{"sub":']))
+    with pytest.raises(ValueError, match='Line 1: claims must be a JSON object'):
+        list(BulkMinter('s3cret').mint(['[1]']))
+
+
+def test_template_lines():
+    assert list(template_lines('{"id": "{n}"}', 3)) == ['{"id": "0"}', '{"id": "1"}', '{"id": "2"}']
+    assert list(template_lines('{}', 2)) == ['{}', '{}']
+
+
+def test_bulk_command(tmp_path):
+    key = tmp_path / 'key'
+    key.write_text('s3cret\n')
+    template = tmp_path / 'claims.json'
+    template.write_text('{\n  "sub": "user-{n}",\n  "role": "tester"\n}\n')
+    runner = CliRunner(mix_stderr=False)
+
+    result = runner.invoke(bulk, ['--env', 'load', '--key', str(key), '--template', str(template), '--count', '3'])
+    assert result.exit_code == 0, result.stderr
+    tokens = result.stdout.splitlines()
+    assert [decode(token)['sub'] for token in tokens] == ['user-0', 'user-1', 'user-2']
+    assert decode(tokens[0])['env'] == 'load'
+
+    claims = tmp_path / 'claims.jsonl'
+    claims.write_text('{"sub": "a"}\n{"sub": "b"}\n')
+    output = tmp_path / 'tokens'
+    result = runner.invoke(bulk, ['--env', 'load', '--key', str(key), '--claims', str(claims), '-o', str(output)])
+    assert result.exit_code == 0, result.stderr
+    assert [decode(token)['sub'] for token in output.read_text().splitlines()] == ['a', 'b']
+
+    result = runner.invoke(bulk, ['--env', 'load', '--key', str(key), '--claims', '-'], input='{"sub": "c"}\n')
+    assert decode(result.stdout.strip())['sub'] == 'c'
+
+    assert runner.invoke(bulk, ['--env', 'load', '--key', str(key)]).exit_code == 2
+    assert runner.invoke(bulk, ['--env', 'load', '--key', str(key), '--template', str(template)]).exit_code == 2
+    claims.write_text('{"sub": "a"}\nnot json\n')
+    result = runner.invoke(bulk, ['--env', 'load', '--key', str(key), '--claims', str(claims), '-o', str(output)])
+    assert result.exit_code == 1
+    assert 'Line 2' in result.stderr
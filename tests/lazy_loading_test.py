@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+
+from click.testing import CliRunner
+
+from nox.main import cli
+
+HEAVY_MODULES = {
+    'boto3', 'botocore', 'docker', 'sqlalchemy', 'redis', 'speedtest',
+    'whois', 'tqdm', 'cryptography', 'confluent_kafka', 'jwt', 'rsa',
+}
+
+# Generous budget for importing nox itself; the heavy command modules
+# alone used to cost several hundred milliseconds.
+IMPORT_BUDGET_US = 250_000
+
+
+def _importtime(*args: str) -> dict[str, int]:
+    """Run nox under ``-X importtime`` and return cumulative times per module."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-m', 'nox.main', *args],
+        capture_output=True, text=True, check=True,
+    )
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, module = line.split('|')
+        # Keep the indentation so callers can tell top-level imports apart
+        timings[module.rstrip()[1:]] = int(cumulative)
+    return timings
+
+
+def test_lightweight_command_skips_heavy_imports() -> None:
+    timings = _importtime('gen', 'uuid4')
+    imported = {name.strip().split('.')[0] for name in timings}
+    assert not imported & HEAVY_MODULES, f"Unexpected heavy imports: {imported & HEAVY_MODULES}"
+    modules = {name.strip() for name in timings}
+    assert 'nox.domains.uuid_generator' in modules
+    assert 'nox.domains.s3_manager' not in modules
+
+
+def test_lightweight_command_import_budget() -> None:
+    timings = _importtime('gen', 'uuid4')
+    # Lazily loaded modules are imported through importlib, which
+    # importtime does not log, so sum every top-level nox.* entry instead.
+    nox_total = sum(
+        cumulative for module, cumulative in timings.items()
+        if module.startswith('nox')
+    )
+    assert nox_total < IMPORT_BUDGET_US, f"nox imports took {nox_total}us"
+
+
+def test_lazy_group_lists_and_resolves_commands() -> None:
+    runner = CliRunner()
+    result = runner.invoke(cli, ['--help'])
+    assert result.exit_code == 0
+    for name in ('gen', 's3', 'redis', 'datetime'):
+        assert name in result.output
+
+    result = runner.invoke(cli, ['gen', 'uuid4'])
+    assert result.exit_code == 0
+    assert 'UUID4:' in result.output
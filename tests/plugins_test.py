@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import os
+import sys
+
+import click
+import pytest
+from click.testing import CliRunner
+
+from nox.commands.plugin_commands import plugins
+from nox.plugins.manifest import PluginManifest
+from nox.utils.lazy_group import LazyGroup
+
+PLUGIN_MODULE = '''
+import click
+
+from nox.plugins import NoxPlugin
+
+
+@click.command()
+def hello():
+    """Say hello."""
+    click.echo('hello from a plugin')
+
+
+class Tools(NoxPlugin):
+    def register_commands(self, cli):
+        @cli.command()
+        def ping():
+            """Ping."""
+            click.echo('pong')
+
+        @cli.command()
+        def pong():
+            """Pong."""
+            click.echo('ping')
+
+
+class Broken(NoxPlugin):
+    pass
+'''
+
+
+@pytest.fixture
+def site(tmp_path, monkeypatch):
+    site_dir = tmp_path / 'site'
+    dist_info = site_dir / 'noxplug-1.0.dist-info'
+    dist_info.mkdir(parents=True)
+    (dist_info / 'METADATA').write_text('Metadata-Version: 2.1\nName: noxplug\nVersion: 1.0\n')
+    (dist_info / 'entry_points.txt').write_text(
+        '[nox.plugins]\nhello = noxplug_mod:hello\ntools = noxplug_mod:Tools\n',
+    )
+    (site_dir / 'noxplug_mod.py').write_text(PLUGIN_MODULE)
+    monkeypatch.syspath_prepend(str(site_dir))
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    yield site_dir
+    sys.modules.pop('noxplug_mod', None)
+
+
+def test_scan_discovers_commands(site):
+    manifest = {plugin['name']: plugin for plugin in PluginManifest().plugins()}
+    assert manifest['hello']['commands'] == {'hello': 'Say hello.'}
+    assert manifest['tools']['commands'] == {'ping': 'Ping.', 'pong': 'Pong.'}
+    assert manifest['tools']['dist'] == 'noxplug'
+
+
+def test_manifest_is_cached_until_site_changes(site, monkeypatch):
+    manifest = PluginManifest()
+    manifest.plugins()
+    scans = []
+    monkeypatch.setattr(PluginManifest, 'scan', staticmethod(lambda: scans.append(1) or []))
+    assert len(manifest.plugins()) == 2
+    assert scans == []
+
+    stat = os.stat(site)
+    os.utime(site, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert manifest.plugins() == []
+    assert scans == [1]
+
+
+def test_plugin_without_register_commands_is_reported(site):
+    with open(site / 'noxplug-1.0.dist-info' / 'entry_points.txt', 'a') as file:
+        file.write('broken = noxplug_mod:Broken\n')
+    manifest = {plugin['name']: plugin for plugin in PluginManifest().plugins(refresh=True)}
+    assert manifest['broken']['commands'] == {}
+    assert manifest['broken']['error'].startswith('TypeError: Cannot instantiate plugin noxplug_mod:Broken')
+    assert 'register_commands' in manifest['broken']['error']
+    assert manifest['tools']['commands'] == {'ping': 'Ping.', 'pong': 'Pong.'}
+
+    result = CliRunner(mix_stderr=False).invoke(plugins, ['list'])
+    assert result.exit_code == 0
+    assert 'error: TypeError: Cannot instantiate plugin' in result.stderr
+
+
+def test_plugin_commands_load_lazily(site):
+    @click.group(cls=LazyGroup)
+    def root():
+        pass
+
+    PluginManifest().plugins()
+    sys.modules.pop('noxplug_mod', None)
+    PluginManifest().register(root)
+    assert 'noxplug_mod' not in sys.modules
+    assert {'hello', 'ping', 'pong'} <= set(root.list_commands(click.Context(root)))
+
+    runner = CliRunner()
+    assert runner.invoke(root, ['ping']).output == 'pong\n'
+    assert runner.invoke(root, ['pong']).output == 'ping\n'
+    assert runner.invoke(root, ['hello']).output == 'hello from a plugin\n'
+
+
+def test_builtin_commands_take_precedence(site):
+    @click.group(cls=LazyGroup, lazy_subcommands={'hello': 'nox.commands.uuid_commands.gen'})
+    def root():
+        pass
+
+    PluginManifest().register(root)
+    assert root.lazy_subcommands['hello'] == 'nox.commands.uuid_commands.gen'
+
+
+def test_plugins_list_with_timings(site):
+    result = CliRunner().invoke(plugins, ['list', '--timings'])
+    assert result.exit_code == 0
+    lines = result.output.splitlines()
+    assert lines[0].startswith('hello') and 'noxplug 1.0' in lines[0] and lines[0].endswith('ms')
+    assert 'ping, pong' in lines[1]
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import json
+import pstats
+
+import pytest
+from click.testing import CliRunner
+
+from nox.main import cli
+from nox.utils import profiling
+from nox.utils.profiling import Profiler
+from nox.utils.profiling import span
+
+
+@pytest.fixture
+def runner(monkeypatch):
+    monkeypatch.setattr(profiling, '_startup_reported', True)
+    return CliRunner(mix_stderr=False)
+
+
+def test_span_is_a_no_op_without_profile():
+    with span('anything', 'backend') as record:
+        assert record is None
+
+
+def test_summary_totals_per_phase():
+    profiler = Profiler()
+    with profiler.span('outer', 'backend'):
+        with profiler.span('inner', 'backend'):
+            pass
+    with profiler.span('render', 'render'):
+        pass
+    summary = profiler.summary()
+    assert 'outer' in summary and '  inner' in summary
+    totals = [line for line in summary.splitlines() if '(total)' in line]
+    assert [line.split()[0] for line in totals] == ['backend', 'render']
+    outer = profiler.spans[0].duration * 1000
+    assert float(totals[0].split()[2]) == pytest.approx(outer, abs=0.01)
+
+
+def test_profile_db_query(runner, tmp_path):
+    result = runner.invoke(cli, ['--profile', 'db', 'query', '--db', f"sqlite:///{tmp_path / 'p.db'}", '--query', 'select 1'])
+    assert result.exit_code == 0
+    assert result.stdout == '(1,)\n'
+    for name in ('DBManager.__init__', 'sqlalchemy client', 'DBManager.run_query', 'render'):
+        assert name in result.stderr
+    assert result.stderr.splitlines()[-1].startswith('wall')
+
+
+def test_profile_chrome_trace(runner, tmp_path):
+    trace_path = tmp_path / 'trace.json'
+    result = runner.invoke(cli, ['--profile-output', str(trace_path), 'gen', 'uuid4'])
+    assert result.exit_code == 0
+    events = json.loads(trace_path.read_text())['traceEvents']
+    assert all(event['ph'] == 'X' and event['dur'] >= 0 for event in events)
+
+
+def test_profile_pstats(runner, tmp_path):
+    stats_path = tmp_path / 'nox.pstats'
+    result = runner.invoke(cli, ['--profile', '--profile-output', str(stats_path), 'gen', 'uuid4'])
+    assert result.exit_code == 0
+    assert pstats.Stats(str(stats_path)).total_calls > 0
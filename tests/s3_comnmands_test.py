@@ -68,3 +68,17 @@ def test_delete_object(s3_client):
     objects = s3_client.list_objects('test-bucket')
     assert len(objects) == 0, \
         'Expected no objects in the bucket after deletion.'
+
+
+@pytest.mark.parametrize('size', [1024, 12 << 20])
+def test_verify_upload_compares_etags(s3_client, tmp_path, size):
+    """Single-part and multipart uploads can be checked without a download."""
+    test_file = tmp_path / 'data.bin'
+    test_file.write_bytes(b'y' * size)
+    s3_client.upload_file('test-bucket', str(test_file))
+    matches, local, remote = s3_client.verify_upload('test-bucket', str(test_file))
+    assert matches and local == remote
+    assert ('-' in remote) == (size > 8 << 20)
+
+    test_file.write_bytes(b'z' * size)
+    assert not s3_client.verify_upload('test-bucket', str(test_file))[0]